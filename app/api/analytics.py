@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
-from app.models.user import User
+from app.models.user import User, EmployeeProfile, ManagerProfile
 from app.api.deps import get_current_user
 from app.services.scoring_service import scoring_service
 
@@ -10,7 +12,7 @@ router = APIRouter()
 @router.get("/leaderboard")
 async def get_leaderboard(
     limit: int = 10,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get employee leaderboard (Manager only)"""
@@ -20,12 +22,47 @@ async def get_leaderboard(
             detail="Only managers can view the leaderboard"
         )
     
-    leaderboard = scoring_service.get_leaderboard(db, limit)
+    leaderboard = await scoring_service.get_leaderboard(db, limit)
     return {"leaderboard": leaderboard}
 
+@router.get("/leaderboard/page")
+async def get_leaderboard_page(
+    cursor: Optional[str] = None,
+    limit: int = 10,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a page of the leaderboard after a cursor (Manager only)"""
+    if current_user.role != "manager":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only managers can view the leaderboard"
+        )
+    
+    try:
+        return await scoring_service.get_leaderboard_page(db, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/leaderboard/rank")
+async def get_leaderboard_rank(
+    user_id: Optional[int] = None,
+    radius: int = 2,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get an employee's rank and the entries around it (employees: own rank only)"""
+    target_user_id = user_id if user_id and current_user.role == "manager" else current_user.id
+    
+    neighbors = await scoring_service.get_leaderboard_neighbors(db, target_user_id, radius)
+    if neighbors is None:
+        raise HTTPException(status_code=404, detail="Employee profile not found")
+    
+    return {"user_id": target_user_id, **neighbors}
+
 @router.get("/team-stats")
 async def get_team_stats(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get team statistics (Manager only)"""
@@ -35,12 +72,14 @@ async def get_team_stats(
             detail="Only managers can view team statistics"
         )
     
-    stats = scoring_service.calculate_team_stats(db)
+    stats = await scoring_service.calculate_team_stats(db)
     return stats
 
 @router.post("/recalculate-scores")
 async def recalculate_scores(
-    db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
+    background: bool = False,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Recalculate all employee scores (Manager only)"""
@@ -50,88 +89,81 @@ async def recalculate_scores(
             detail="Only managers can recalculate scores"
         )
     
-    # Get all employees
-    employees = db.query(User).filter(User.role == "employee").all()
-    updated_scores = {}
+    if background:
+        job = scoring_service.start_recalculation_job()
+        background_tasks.add_task(scoring_service.run_recalculation_job, job["job_id"])
+        return job
+    
+    employee_count = await scoring_service.recalculate_all_scores(db)
     
-    for employee in employees:
-        new_score = scoring_service.calculate_employee_score(db, employee.id)
-        updated_scores[employee.email] = new_score
+    result = await db.execute(
+        select(User.email, EmployeeProfile.score)
+        .join(EmployeeProfile, EmployeeProfile.user_id == User.id)
+        .filter(User.role == "employee")
+    )
+    updated_scores = {email: score for email, score in result.all()}
     
     return {
-        "message": f"Recalculated scores for {len(employees)} employees",
+        "message": f"Recalculated scores for {employee_count} employees",
         "updated_scores": updated_scores
     }
 
+@router.get("/recalculate-scores/{job_id}")
+async def get_recalculation_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Get progress of a background score recalculation (Manager only)"""
+    if current_user.role != "manager":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only managers can view recalculation jobs"
+        )
+    
+    job = scoring_service.recalculation_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Recalculation job not found")
+    
+    return job
+
 @router.get("/dashboard")
 async def get_dashboard_data(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get dashboard analytics data"""
-    from app.models.task import Task
-    from sqlalchemy import func
-    
     if current_user.role == "manager":
-        # Manager dashboard - all tasks
-        total_tasks = db.query(Task).count()
-        completed_tasks = db.query(Task).filter(Task.status == "completed").count()
-        in_progress_tasks = db.query(Task).filter(Task.status == "in_progress").count()
-        pending_tasks = db.query(Task).filter(Task.status == "pending").count()
-        overdue_tasks = db.query(Task).filter(
-            Task.status != "completed",
-            Task.due_date < func.now()
-        ).count()
-        
-        # Team stats
-        team_stats = scoring_service.calculate_team_stats(db)
+        # Manager dashboard - all tasks plus team stats in a single query
+        summary = await scoring_service.get_task_summary(db, include_team=True)
         
         return {
-            "totalTasks": total_tasks,
-            "completedTasks": completed_tasks,
-            "inProgressTasks": in_progress_tasks,
-            "pendingTasks": pending_tasks,
-            "overdueTasks": overdue_tasks,
-            "teamStats": team_stats
+            "totalTasks": summary["total_tasks"],
+            "completedTasks": summary["completed_tasks"],
+            "inProgressTasks": summary["in_progress_tasks"],
+            "pendingTasks": summary["pending_tasks"],
+            "overdueTasks": summary["overdue_tasks"],
+            "teamStats": scoring_service.team_stats_from_summary(summary)
         }
     else:
         # Employee dashboard - only their tasks
-        total_tasks = db.query(Task).filter(Task.assigned_to == current_user.id).count()
-        completed_tasks = db.query(Task).filter(
-            Task.assigned_to == current_user.id,
-            Task.status == "completed"
-        ).count()
-        in_progress_tasks = db.query(Task).filter(
-            Task.assigned_to == current_user.id,
-            Task.status == "in_progress"
-        ).count()
-        pending_tasks = db.query(Task).filter(
-            Task.assigned_to == current_user.id,
-            Task.status == "pending"
-        ).count()
-        overdue_tasks = db.query(Task).filter(
-            Task.assigned_to == current_user.id,
-            Task.status != "completed",
-            Task.due_date < func.now()
-        ).count()
+        summary = await scoring_service.get_task_summary(db, assigned_to=current_user.id)
         
         return {
-            "totalTasks": total_tasks,
-            "completedTasks": completed_tasks,
-            "inProgressTasks": in_progress_tasks,
-            "pendingTasks": pending_tasks,
-            "overdueTasks": overdue_tasks
+            "totalTasks": summary["total_tasks"],
+            "completedTasks": summary["completed_tasks"],
+            "inProgressTasks": summary["in_progress_tasks"],
+            "pendingTasks": summary["pending_tasks"],
+            "overdueTasks": summary["overdue_tasks"]
         }
 
 @router.get("/user-performance")
 async def get_user_performance(
     user_id: int = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get user performance metrics"""
     from app.models.task import Task
-    from sqlalchemy import func
     from datetime import datetime, timedelta
     
     # Determine which user's performance to get
@@ -140,10 +172,11 @@ async def get_user_performance(
     # Get tasks for the user
     thirty_days_ago = datetime.now() - timedelta(days=30)
     
-    recent_tasks = db.query(Task).filter(
+    result = await db.execute(select(Task).filter(
         Task.assigned_to == target_user_id,
         Task.created_at >= thirty_days_ago
-    ).all()
+    ))
+    recent_tasks = result.scalars().all()
     
     total_tasks = len(recent_tasks)
     completed_tasks = len([t for t in recent_tasks if t.status == "completed"])
@@ -154,11 +187,13 @@ async def get_user_performance(
     avg_completion_time = 0  # You could calculate this based on task creation and completion dates
     
     # Get user profile
-    user = db.query(User).filter(User.id == target_user_id).first()
+    user = await db.get(User, target_user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    profile = user.employee_profile if user.role == "employee" else user.manager_profile
+    profile_model = EmployeeProfile if user.role == "employee" else ManagerProfile
+    result = await db.execute(select(profile_model).filter(profile_model.user_id == user.id))
+    profile = result.scalars().first()
     
     return {
         "userId": target_user_id,
@@ -173,15 +208,14 @@ async def get_user_performance(
 
 @router.get("/my-stats")
 async def get_my_stats(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get current user's statistics"""
     if current_user.role == "employee":
-        # Recalculate and return employee stats
-        scoring_service.calculate_employee_score(db, current_user.id)
-        
-        profile = current_user.employee_profile
+        # Scores are kept current as tasks change, so reading never writes
+        result = await db.execute(select(EmployeeProfile).filter(EmployeeProfile.user_id == current_user.id))
+        profile = result.scalars().first()
         if not profile:
             raise HTTPException(status_code=404, detail="Employee profile not found")
         
@@ -196,11 +230,12 @@ async def get_my_stats(
         }
     
     elif current_user.role == "manager":
-        profile = current_user.manager_profile
+        result = await db.execute(select(ManagerProfile).filter(ManagerProfile.user_id == current_user.id))
+        profile = result.scalars().first()
         if not profile:
             raise HTTPException(status_code=404, detail="Manager profile not found")
         
-        team_stats = scoring_service.calculate_team_stats(db)
+        team_stats = await scoring_service.calculate_team_stats(db)
         
         return {
             "name": profile.name,
@@ -1,13 +1,15 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.core.auth import verify_token
+from app.core.principal_cache import principal_cache
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/token")
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -22,8 +24,18 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     if email is None:
         raise credentials_exception
     
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
+    # Hot path: serve the principal from the cache without touching the database
+    user = principal_cache.get(email)
+    if user is not None:
+        return user
+    
+    result = await db.execute(select(User).filter(User.email == email))
+    user = result.scalars().first()
+    if user is None or user.is_active is False:
         raise credentials_exception
     
-    return user
\ No newline at end of file
+    # Detach so the cached instance is never flushed by another request's session
+    db.expunge(user)
+    principal_cache.set(email, user, payload.get("exp"))
+    
+    return user
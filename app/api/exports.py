@@ -0,0 +1,117 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import datetime
+from app.core.database import get_db
+from app.api.deps import get_current_user
+from app.models.task import Task, TaskStatusReport, LeaveRequest
+from app.models.user import User, EmployeeProfile
+from app.schemas.task import FileFormat, TaskStatus as TaskStatusEnum, TaskPriority, LeaveStatusFilter
+from app.services.export_service import export_service
+
+router = APIRouter()
+
+MEDIA_TYPES = {
+    FileFormat.NDJSON: "application/x-ndjson",
+    FileFormat.CSV: "text/csv"
+}
+
+def _export_response(statement, export_format: FileFormat, name: str) -> StreamingResponse:
+    return StreamingResponse(
+        export_service.stream(statement, export_format.value),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}.{export_format.value}"',
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+@router.get("/tasks")
+async def export_tasks(
+    export_format: FileFormat = Query(FileFormat.NDJSON, alias="format"),
+    task_status: Optional[TaskStatusEnum] = Query(None, alias="status"),
+    priority: Optional[TaskPriority] = None,
+    assigned_to: Optional[int] = None,
+    updated_since: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream tasks in id order (Employee: own tasks, Manager: all tasks)"""
+    query = select(
+        Task.id, Task.title, Task.description, Task.assigned_to, Task.created_by,
+        Task.status, Task.priority, Task.score_value, Task.risk_factor,
+        Task.estimated_hours, Task.actual_hours, Task.due_date,
+        Task.created_at, Task.updated_at, Task.completed_at
+    )
+    if current_user.role == "employee":
+        query = query.filter(Task.assigned_to == current_user.id)
+    elif assigned_to is not None:
+        query = query.filter(Task.assigned_to == assigned_to)
+
+    if task_status is not None:
+        query = query.filter(Task.status == task_status.value)
+    if priority is not None:
+        query = query.filter(Task.priority == priority.value)
+    if updated_since is not None:
+        query = query.filter(Task.updated_at >= updated_since)
+
+    return _export_response(query.order_by(Task.id), export_format, "tasks")
+
+@router.get("/status-reports")
+async def export_status_reports(
+    export_format: FileFormat = Query(FileFormat.NDJSON, alias="format"),
+    task_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream task status reports in id order (Employee: own reports, Manager: all reports)"""
+    query = select(
+        TaskStatusReport.id, TaskStatusReport.task_id, TaskStatusReport.employee_id,
+        TaskStatusReport.report_text, TaskStatusReport.progress_percentage,
+        TaskStatusReport.ai_feedback, TaskStatusReport.created_at
+    )
+    if current_user.role == "employee":
+        query = query.filter(TaskStatusReport.employee_id == current_user.id)
+
+    if task_id is not None:
+        query = query.filter(TaskStatusReport.task_id == task_id)
+    if since is not None:
+        query = query.filter(TaskStatusReport.created_at >= since)
+
+    return _export_response(query.order_by(TaskStatusReport.id), export_format, "status_reports")
+
+@router.get("/leave-requests")
+async def export_leave_requests(
+    export_format: FileFormat = Query(FileFormat.NDJSON, alias="format"),
+    leave_status: LeaveStatusFilter = Query(LeaveStatusFilter.ALL, alias="status"),
+    employee_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream leave requests in id order (Employee: own requests, Manager: all requests)"""
+    if current_user.role == "employee":
+        result = await db.execute(select(EmployeeProfile.id).filter(
+            EmployeeProfile.user_id == current_user.id
+        ))
+        employee_id = result.scalar()
+
+        if employee_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Employee profile not found"
+            )
+
+    query = select(
+        LeaveRequest.id, LeaveRequest.employee_id, LeaveRequest.start_date,
+        LeaveRequest.end_date, LeaveRequest.reason, LeaveRequest.status,
+        LeaveRequest.approved_by, LeaveRequest.approval_date,
+        LeaveRequest.tasks_transferred, LeaveRequest.transfer_successful,
+        LeaveRequest.created_at
+    )
+    if employee_id is not None:
+        query = query.filter(LeaveRequest.employee_id == employee_id)
+    if leave_status != LeaveStatusFilter.ALL:
+        query = query.filter(LeaveRequest.status == leave_status.value)
+
+    return _export_response(query.order_by(LeaveRequest.id), export_format, "leave_requests")
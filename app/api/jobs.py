@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db
+from app.models.job import BackgroundJob, JobKind
+from app.models.task import Task, TaskStatusReport
+from app.models.user import User
+from app.api.deps import get_current_user
+from app.services.job_queue import job_queue
+
+router = APIRouter()
+
+def _job_dict(job: BackgroundJob) -> dict:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "entity_id": job.entity_id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "run_at": job.run_at,
+        "last_error": job.last_error,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at
+    }
+
+async def _check_access(db: AsyncSession, current_user: User, kind: str, entity_id: int):
+    """Managers see every job; employees only jobs for their own tasks and reports"""
+    if current_user.role == "manager":
+        return
+    owner = None
+    if kind == JobKind.ENRICH_TASK.value:
+        task = await db.get(Task, entity_id)
+        owner = task.assigned_to if task else None
+    elif kind == JobKind.ENRICH_REPORT.value:
+        report = await db.get(TaskStatusReport, entity_id)
+        owner = report.employee_id if report else None
+    if owner != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only view jobs for your own tasks"
+        )
+
+@router.get("/{job_id}")
+async def get_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Status of a background job"""
+    job = await job_queue.get(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    await _check_access(db, current_user, job.kind, job.entity_id)
+    return _job_dict(job)
+
+@router.get("/")
+async def get_jobs_for_entity(
+    kind: JobKind,
+    entity_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Most recent jobs for a task (enrich_task) or status report (enrich_report)"""
+    await _check_access(db, current_user, kind.value, entity_id)
+    jobs = await job_queue.for_entity(db, kind.value, entity_id)
+    return {"jobs": [_job_dict(job) for job in jobs]}
@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from app.core.database import get_db
-from app.api.tasks import get_current_user  # Import from tasks.py instead
+from app.core.pagination import encode_cursor, decode_cursor
+from app.api.deps import get_current_user
 from app.models.user import User, EmployeeProfile
-from app.models.task import LeaveRequest, Task, TaskStatus
-from app.schemas.task import LeaveRequestCreate, LeaveRequest as LeaveRequestSchema
+from app.models.task import LeaveRequest, Task
+from app.schemas.task import LeaveRequestCreate, LeaveRequest as LeaveRequestSchema, LeaveStatusFilter
+from app.services.assignment_service import OPEN_STATUSES
+from app.services.leave_index import leave_index, naive_utc
 from app.services.scoring_service import scoring_service
+from app.services.transfer_service import transfer_service
 from datetime import datetime
 
 router = APIRouter()
@@ -14,7 +19,7 @@ router = APIRouter()
 @router.post("/leave-requests", response_model=LeaveRequestSchema)
 async def create_leave_request(
     leave_request: LeaveRequestCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new leave request (Employee only)"""
@@ -25,9 +30,10 @@ async def create_leave_request(
         )
     
     # Get employee profile
-    employee_profile = db.query(EmployeeProfile).filter(
+    result = await db.execute(select(EmployeeProfile).filter(
         EmployeeProfile.user_id == current_user.id
-    ).first()
+    ))
+    employee_profile = result.scalars().first()
     
     if not employee_profile:
         raise HTTPException(
@@ -35,24 +41,46 @@ async def create_leave_request(
             detail="Employee profile not found"
         )
     
+    start_date = naive_utc(leave_request.start_date)
+    end_date = naive_utc(leave_request.end_date)
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date"
+        )
+    
+    conflicts = await leave_index.employee_conflicts(
+        db, employee_profile.id, start_date, end_date
+    )
+    if conflicts:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": "Leave overlaps an existing approved or pending request",
+                "conflicting_requests": [conflict.leave_request_id for conflict in conflicts]
+            }
+        )
+    
     # Create leave request
     db_leave_request = LeaveRequest(
         employee_id=employee_profile.id,
-        start_date=leave_request.start_date,
-        end_date=leave_request.end_date,
+        start_date=start_date,
+        end_date=end_date,
         reason=leave_request.reason,
         status="pending"
     )
     
     db.add(db_leave_request)
-    db.commit()
-    db.refresh(db_leave_request)
+    await db.commit()
+    await db.refresh(db_leave_request)
+    leave_index.invalidate()
     
     # Check if employee has active tasks that need transfer
-    active_tasks = db.query(Task).filter(
+    result = await db.execute(select(Task).filter(
         Task.assigned_to == current_user.id,
-        Task.status.in_([TaskStatus.PENDING.value, TaskStatus.IN_PROGRESS.value])
-    ).all()
+        Task.status.in_(OPEN_STATUSES)
+    ))
+    active_tasks = result.scalars().all()
     
     if active_tasks:
         # Mark that tasks need transfer
@@ -62,33 +90,45 @@ async def create_leave_request(
         db_leave_request.tasks_transferred = True
         db_leave_request.transfer_successful = True
     
-    db.commit()
-    db.refresh(db_leave_request)
+    await db.commit()
+    await db.refresh(db_leave_request)
     
     return db_leave_request
 
 @router.get("/leave-requests", response_model=List[LeaveRequestSchema])
 async def get_leave_requests(
-    db: Session = Depends(get_db),
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    leave_status: Optional[LeaveStatusFilter] = Query(None, alias="status"),
+    employee_id: Optional[int] = None,
+    start_from: Optional[datetime] = None,
+    start_to: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get leave requests (Employee: own requests, Manager: all requests)"""
+    """Get leave requests (Employee: own requests, Manager: all requests)
+    
+    Managers get the pending queue by default (an employee's full history
+    with ``employee_id``). A single-status view without
+    ``employee_id`` is ordered by start date (ix_leave_requests_status_start_date).
+    Every other view is newest first, served by ix_leave_requests_employee_id
+    or ix_leave_requests_created_at_id. Pass the ``X-Next-Cursor`` response
+    header back as ``cursor`` to fetch the next page.
+    """
     if current_user.role == "employee":
         # Get employee's own leave requests
-        employee_profile = db.query(EmployeeProfile).filter(
+        result = await db.execute(select(EmployeeProfile.id).filter(
             EmployeeProfile.user_id == current_user.id
-        ).first()
+        ))
+        employee_id = result.scalar()
         
-        if not employee_profile:
+        if employee_id is None:
             return []
-        
-        leave_requests = db.query(LeaveRequest).filter(
-            LeaveRequest.employee_id == employee_profile.id
-        ).all()
+        leave_status = leave_status or LeaveStatusFilter.ALL
     
     elif current_user.role == "manager":
-        # Get all leave requests for manager
-        leave_requests = db.query(LeaveRequest).all()
+        leave_status = leave_status or (LeaveStatusFilter.ALL if employee_id is not None else LeaveStatusFilter.PENDING)
     
     else:
         raise HTTPException(
@@ -96,13 +136,107 @@ async def get_leave_requests(
             detail="Access denied"
         )
     
+    query = select(LeaveRequest)
+    if employee_id is not None:
+        query = query.filter(LeaveRequest.employee_id == employee_id)
+    if leave_status != LeaveStatusFilter.ALL:
+        query = query.filter(LeaveRequest.status == leave_status.value)
+    if start_from is not None:
+        query = query.filter(LeaveRequest.start_date >= naive_utc(start_from))
+    if start_to is not None:
+        query = query.filter(LeaveRequest.start_date < naive_utc(start_to))
+    
+    # The pending (or approved/rejected) queue reads by start date; history reads newest first
+    queue = employee_id is None and leave_status != LeaveStatusFilter.ALL
+    order = "start_date" if queue else "created_at"
+    sort_column = LeaveRequest.start_date if queue else LeaveRequest.created_at
+    if queue:
+        query = query.order_by(sort_column.asc(), LeaveRequest.id.asc())
+    else:
+        query = query.order_by(sort_column.desc(), LeaveRequest.id.desc())
+    
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+            last_value, last_id = position["v"], int(position["id"])
+            if position.get("o") != order or not isinstance(last_value, datetime):
+                raise ValueError("Cursor was issued for a different view")
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        
+        if queue:
+            query = query.filter(tuple_(sort_column, LeaveRequest.id) > tuple_(last_value, last_id))
+        else:
+            query = query.filter(tuple_(sort_column, LeaveRequest.id) < tuple_(last_value, last_id))
+    
+    result = await db.execute(query.limit(limit + 1))
+    leave_requests = result.scalars().all()
+    
+    if len(leave_requests) > limit:
+        leave_requests = leave_requests[:limit]
+        last = leave_requests[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor({
+            "o": order,
+            "v": getattr(last, sort_column.key),
+            "id": last.id
+        })
     return leave_requests
 
+@router.get("/availability")
+async def get_availability(
+    start: datetime,
+    end: datetime,
+    include_pending: bool = True,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Who is out between start and end (Manager only)"""
+    if current_user.role != "manager":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only managers can view team availability"
+        )
+    start, end = naive_utc(start), naive_utc(end)
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    
+    statuses = ("approved", "pending") if include_pending else ("approved",)
+    intervals = await leave_index.overlapping(db, start, end, statuses)
+    
+    names = {}
+    if intervals:
+        result = await db.execute(select(EmployeeProfile.id, EmployeeProfile.name).filter(
+            EmployeeProfile.id.in_({interval.employee_id for interval in intervals})
+        ))
+        names = dict(result.all())
+    total = await db.scalar(select(func.count(EmployeeProfile.id)))
+    out_count = len({interval.employee_id for interval in intervals})
+    
+    return {
+        "start": start,
+        "end": end,
+        "total_employees": total,
+        "out_count": out_count,
+        "available_count": total - out_count,
+        "out": [
+            {
+                "leave_request_id": interval.leave_request_id,
+                "employee_id": interval.employee_id,
+                "user_id": interval.user_id,
+                "name": names.get(interval.employee_id),
+                "status": interval.status,
+                "start_date": interval.start,
+                "end_date": interval.end
+            }
+            for interval in intervals
+        ]
+    }
+
 @router.put("/leave-requests/{leave_request_id}/approve")
 async def approve_leave_request(
     leave_request_id: int,
     approved: bool,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Approve or reject a leave request (Manager only)"""
@@ -112,9 +246,10 @@ async def approve_leave_request(
             detail="Only managers can approve leave requests"
         )
     
-    leave_request = db.query(LeaveRequest).filter(
+    result = await db.execute(select(LeaveRequest).filter(
         LeaveRequest.id == leave_request_id
-    ).first()
+    ))
+    leave_request = result.scalars().first()
     
     if not leave_request:
         raise HTTPException(
@@ -129,20 +264,22 @@ async def approve_leave_request(
     
     # If approved and tasks weren't transferred, update leave score
     if approved and not leave_request.transfer_successful:
-        employee_profile = db.query(EmployeeProfile).filter(
+        result = await db.execute(select(EmployeeProfile).filter(
             EmployeeProfile.id == leave_request.employee_id
-        ).first()
+        ))
+        employee_profile = result.scalars().first()
         
         if employee_profile:
             # Update leave score based on task transfer success
-            scoring_service.update_leave_score(
+            await scoring_service.update_leave_score(
                 db, 
                 employee_profile.user_id, 
                 leave_request.transfer_successful
             )
     
-    db.commit()
-    db.refresh(leave_request)
+    await db.commit()
+    await db.refresh(leave_request)
+    leave_index.invalidate()
     
     return {
         "message": f"Leave request {'approved' if approved else 'rejected'}",
@@ -152,20 +289,29 @@ async def approve_leave_request(
 @router.post("/leave-requests/{leave_request_id}/transfer-tasks")
 async def transfer_tasks_for_leave(
     leave_request_id: int,
-    target_employee_id: int,
-    db: Session = Depends(get_db),
+    target_employee_id: Optional[int] = None,
+    recipient_ids: Optional[List[int]] = Query(None),
+    max_recipients: Optional[int] = Query(None, ge=1, le=50),
+    dry_run: bool = False,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Transfer tasks for a leave request (Manager only)"""
+    """Transfer tasks for a leave request (Manager only)
+    
+    Open tasks are spread over the least-loaded colleagues available during
+    the leave, or over ``recipient_ids`` (``target_employee_id`` for a single
+    recipient). ``dry_run`` returns the plan without moving anything.
+    """
     if current_user.role != "manager":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only managers can transfer tasks"
         )
     
-    leave_request = db.query(LeaveRequest).filter(
+    result = await db.execute(select(LeaveRequest).filter(
         LeaveRequest.id == leave_request_id
-    ).first()
+    ))
+    leave_request = result.scalars().first()
     
     if not leave_request:
         raise HTTPException(
@@ -173,10 +319,10 @@ async def transfer_tasks_for_leave(
             detail="Leave request not found"
         )
     
-    # Get employee's active tasks
-    employee_profile = db.query(EmployeeProfile).filter(
+    result = await db.execute(select(EmployeeProfile).filter(
         EmployeeProfile.id == leave_request.employee_id
-    ).first()
+    ))
+    employee_profile = result.scalars().first()
     
     if not employee_profile:
         raise HTTPException(
@@ -184,24 +330,24 @@ async def transfer_tasks_for_leave(
             detail="Employee profile not found"
         )
     
-    active_tasks = db.query(Task).filter(
-        Task.assigned_to == employee_profile.user_id,
-        Task.status.in_([TaskStatus.PENDING.value, TaskStatus.IN_PROGRESS.value])
-    ).all()
-    
-    # Transfer tasks to target employee
-    transferred_count = 0
-    for task in active_tasks:
-        task.assigned_to = target_employee_id
-        transferred_count += 1
+    if target_employee_id is not None:
+        recipient_ids = [target_employee_id]
     
-    # Update leave request
-    leave_request.tasks_transferred = True
-    leave_request.transfer_successful = transferred_count > 0
-    
-    db.commit()
+    plan = await transfer_service.transfer_for_leave(
+        db, leave_request, employee_profile.user_id, recipient_ids, max_recipients, dry_run
+    )
+    if "error" in plan:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"message": plan["error"], "unavailable": plan["unavailable"]}
+        )
     
+    if dry_run:
+        message = f"Would transfer {plan['planned']} tasks to {len(plan['recipients'])} employees"
+    else:
+        message = f"Transferred {plan['transferred']} tasks to {len(plan['recipients'])} employees"
     return {
-        "message": f"Transferred {transferred_count} tasks successfully",
-        "transferred_tasks": transferred_count
-    }
\ No newline at end of file
+        "message": message,
+        "transferred_tasks": plan["transferred"],
+        **plan
+    }
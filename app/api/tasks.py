@@ -1,19 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+import json
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, and_, or_, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from datetime import datetime
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.pagination import encode_cursor, decode_cursor
 from app.models.task import Task, TaskStatusReport
 from app.models.user import User
 from app.schemas.task import TaskCreate, TaskUpdate, Task as TaskSchema, TaskStatusReportCreate, TaskStatusReport as TaskStatusReportSchema
+from app.schemas.task import TaskSortField, TaskStatus as TaskStatusEnum, TaskPriority, TaskBatchAssign, TaskBulkCreate, TaskBulkStatus, FileFormat
 from app.api.deps import get_current_user
+from app.services.scoring_service import scoring_service
+from app.services.ai_service import ai_service
+from app.services.async_ai_service import async_ai_service
+from app.services.assignment_service import assignment_service
+from app.services.enrichment_service import enrichment_service
+from app.services.task_bulk_service import task_bulk_service
+from app.services.task_import_service import task_import_service, ImportFileError
 
 router = APIRouter()
 
 @router.post("/", response_model=TaskSchema)
 async def create_task(
     task: TaskCreate,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new task (Manager only)"""
@@ -34,34 +48,172 @@ async def create_task(
         due_date=task.due_date
     )
     db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    await db.flush()
+    job = await enrichment_service.enqueue_task(db, db_task.id)
+    await db.commit()
+    await db.refresh(db_task)
+    if job is not None:
+        response.headers["X-Enrichment-Job"] = str(job.id)
     return db_task
 
+@router.post("/bulk")
+async def create_tasks_bulk(
+    bulk: TaskBulkCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Create many tasks in one transaction (Manager only)
+    
+    Each item is validated like POST /; invalid items are reported in
+    ``results`` and the rest are inserted with one multi-row INSERT.
+    """
+    if current_user.role != "manager":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only managers can create tasks"
+        )
+    if not 1 <= len(bulk.tasks) <= settings.bulk_max_items:
+        raise HTTPException(status_code=400, detail=f"tasks must contain 1-{settings.bulk_max_items} items")
+    
+    return await task_bulk_service.create_tasks(db, bulk.tasks, current_user.id, bulk.enrich)
+
+@router.post("/bulk-status")
+async def update_task_statuses_bulk(
+    bulk: TaskBulkStatus,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Change the status of many tasks in one transaction
+    
+    Same rules as POST /{task_id}/status, applied per item: employees can
+    only update their own tasks.
+    """
+    if not 1 <= len(bulk.updates) <= settings.bulk_max_items:
+        raise HTTPException(status_code=400, detail=f"updates must contain 1-{settings.bulk_max_items} items")
+    
+    return await task_bulk_service.update_statuses(db, bulk.updates, current_user)
+
+@router.post("/import")
+async def import_tasks(
+    file: UploadFile = File(...),
+    import_format: Optional[FileFormat] = Query(None, alias="format"),
+    enrich: bool = True,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Import tasks from a CSV or NDJSON file (Manager only)
+    
+    Rows use the POST / fields; ``assignee_email`` may name the assignee
+    instead of ``assigned_to``. The file is processed in batches of
+    IMPORT_BATCH_SIZE rows, each committed on its own, and the response
+    lists the rejected rows by line number.
+    """
+    if current_user.role != "manager":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only managers can create tasks"
+        )
+    
+    if import_format is None:
+        name = (file.filename or "").lower()
+        if name.endswith(".csv"):
+            import_format = FileFormat.CSV
+        elif name.endswith((".ndjson", ".jsonl")):
+            import_format = FileFormat.NDJSON
+        else:
+            raise HTTPException(status_code=400, detail="Pass format=csv or format=ndjson")
+    
+    try:
+        return await task_import_service.import_tasks(
+            db, file.file, import_format.value, current_user.id, enrich
+        )
+    except ImportFileError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/", response_model=List[TaskSchema])
 async def get_tasks(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    sort_by: TaskSortField = TaskSortField.CREATED_AT,
+    task_status: Optional[TaskStatusEnum] = Query(None, alias="status"),
+    priority: Optional[TaskPriority] = None,
+    assigned_to: Optional[int] = None,
+    due_after: Optional[datetime] = None,
+    due_before: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get tasks based on user role"""
+    """Get tasks based on user role
+    
+    Results are ordered by ``sort_by`` then id. Pass the ``X-Next-Cursor``
+    response header back as ``cursor`` to fetch the next page; ``skip`` is
+    kept for older clients but costs a scan of every skipped row.
+    """
     if current_user.role == "employee":
         # Employees see only their assigned tasks
-        tasks = db.query(Task).filter(Task.assigned_to == current_user.id).offset(skip).limit(limit).all()
+        query = select(Task).filter(Task.assigned_to == current_user.id)
     else:
         # Managers see all tasks
-        tasks = db.query(Task).offset(skip).limit(limit).all()
+        query = select(Task)
+        if assigned_to is not None:
+            query = query.filter(Task.assigned_to == assigned_to)
+    
+    if task_status is not None:
+        query = query.filter(Task.status == task_status.value)
+    if priority is not None:
+        query = query.filter(Task.priority == priority.value)
+    if due_after is not None:
+        query = query.filter(Task.due_date >= due_after)
+    if due_before is not None:
+        query = query.filter(Task.due_date < due_before)
+    
+    sort_column = Task.due_date if sort_by == TaskSortField.DUE_DATE else Task.created_at
+    query = query.order_by(sort_column.asc().nulls_first(), Task.id.asc())
+    
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+            last_value, last_id = position["v"], int(position["id"])
+            if position.get("s") != sort_by.value:
+                raise ValueError("Cursor was issued for a different sort")
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        
+        if last_value is None:
+            # Still inside the leading NULL block
+            query = query.filter(or_(
+                and_(sort_column.is_(None), Task.id > last_id),
+                sort_column.is_not(None)
+            ))
+        else:
+            query = query.filter(tuple_(sort_column, Task.id) > tuple_(last_value, last_id))
+    elif skip:
+        query = query.offset(skip)
+    
+    result = await db.execute(query.limit(limit + 1))
+    tasks = result.scalars().all()
+    
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        last = tasks[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor({
+            "s": sort_by.value,
+            "v": getattr(last, sort_column.key),
+            "id": last.id
+        })
     return tasks
 
 @router.get("/{task_id}", response_model=TaskSchema)
 async def get_task(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific task"""
-    task = db.query(Task).filter(Task.id == task_id).first()
+    result = await db.execute(select(Task).filter(Task.id == task_id))
+    task = result.scalars().first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
@@ -78,11 +230,12 @@ async def get_task(
 async def update_task(
     task_id: int,
     task_update: TaskUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update a task"""
-    task = db.query(Task).filter(Task.id == task_id).first()
+    result = await db.execute(select(Task).filter(Task.id == task_id))
+    task = result.scalars().first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
@@ -94,18 +247,22 @@ async def update_task(
         )
     
     # Update fields
+    before = scoring_service.task_snapshot(task)
     for field, value in task_update.dict(exclude_unset=True).items():
         if hasattr(task, field):
             setattr(task, field, value.value if hasattr(value, 'value') else value)
     
-    db.commit()
-    db.refresh(task)
+    await scoring_service.apply_task_change(db, before, scoring_service.task_snapshot(task))
+    if {"title", "description"} & task_update.dict(exclude_unset=True).keys():
+        await enrichment_service.enqueue_task(db, task.id)
+    await db.commit()
+    await db.refresh(task)
     return task
 
 @router.delete("/{task_id}")
 async def delete_task(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a task (Manager only)"""
@@ -115,23 +272,27 @@ async def delete_task(
             detail="Only managers can delete tasks"
         )
     
-    task = db.query(Task).filter(Task.id == task_id).first()
+    result = await db.execute(select(Task).filter(Task.id == task_id))
+    task = result.scalars().first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    db.delete(task)
-    db.commit()
+    await scoring_service.apply_task_change(db, scoring_service.task_snapshot(task), None)
+    await db.delete(task)
+    await db.commit()
     return {"message": "Task deleted successfully"}
 
 @router.post("/{task_id}/reports", response_model=TaskStatusReportSchema)
 async def create_status_report(
     task_id: int,
     report: TaskStatusReportCreate,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a status report for a task"""
-    task = db.query(Task).filter(Task.id == task_id).first()
+    result = await db.execute(select(Task).filter(Task.id == task_id))
+    task = result.scalars().first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
@@ -148,19 +309,24 @@ async def create_status_report(
         progress_percentage=report.progress_percentage
     )
     db.add(db_report)
-    db.commit()
-    db.refresh(db_report)
+    await db.flush()
+    job = await enrichment_service.enqueue_report(db, db_report.id)
+    await db.commit()
+    await db.refresh(db_report)
+    if job is not None:
+        response.headers["X-Enrichment-Job"] = str(job.id)
     return db_report
 
 @router.post("/{task_id}/status")
 async def update_task_status(
     task_id: int,
     status_data: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update task status"""
-    task = db.query(Task).filter(Task.id == task_id).first()
+    result = await db.execute(select(Task).filter(Task.id == task_id))
+    task = result.scalars().first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
@@ -174,53 +340,141 @@ async def update_task_status(
     # Update status
     new_status = status_data.get("status")
     if new_status:
+        before = scoring_service.task_snapshot(task)
         task.status = new_status
         
         # Update completion date if completed
         if new_status == "completed":
             task.completed_at = datetime.now()
+        
+        await scoring_service.apply_task_change(db, before, scoring_service.task_snapshot(task))
     
-    db.commit()
-    db.refresh(task)
+    await db.commit()
+    await db.refresh(task)
     return {"message": "Task status updated successfully", "task": task}
 
+def _canned_chat_reply(message: str, role: str) -> str:
+    """Keyword replies used when no model is configured or the model call fails"""
+    message = message.lower()
+    if "task" in message:
+        return "I can help you with task management! You can create, update, or check the status of tasks. What would you like to do?"
+    elif "deadline" in message or "due" in message:
+        return "I can help you track deadlines. Would you like me to show you upcoming deadlines or help extend a deadline?"
+    elif "progress" in message:
+        return "I can help you track progress on your tasks. Would you like to see your progress overview?"
+    elif "team" in message:
+        if role == "manager":
+            return "I can help you manage your team! You can view team performance, assign tasks, or check team statistics."
+        return "I can help you coordinate with your team. You can check team updates or communicate progress."
+    return "Hello! I'm your AI assistant. I can help you with task management, deadlines, progress tracking, and team coordination. What can I help you with today?"
+
 @router.post("/ai/chat")
 async def ai_chat(
     chat_data: dict,
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """AI Chat functionality"""
     message = chat_data.get("message", "")
     
-    # Simple AI response for now - you can integrate with actual AI later
-    if "task" in message.lower():
-        response = "I can help you with task management! You can create, update, or check the status of tasks. What would you like to do?"
-    elif "deadline" in message.lower() or "due" in message.lower():
-        response = "I can help you track deadlines. Would you like me to show you upcoming deadlines or help extend a deadline?"
-    elif "progress" in message.lower():
-        response = "I can help you track progress on your tasks. Would you like to see your progress overview?"
-    elif "team" in message.lower():
-        if current_user.role == "manager":
-            response = "I can help you manage your team! You can view team performance, assign tasks, or check team statistics."
-        else:
-            response = "I can help you coordinate with your team. You can check team updates or communicate progress."
-    else:
-        response = "Hello! I'm your AI assistant. I can help you with task management, deadlines, progress tracking, and team coordination. What can I help you with today?"
+    response = None
+    if ai_service.configured():
+        result = await async_ai_service.chat_assistant(message, current_user.role)
+        response = result.get("ai_response")
     
     return {
-        "response": response,
-        "timestamp": "2024-01-01T00:00:00Z"  # You can use actual timestamp
+        "response": response or _canned_chat_reply(message, current_user.role),
+        "timestamp": datetime.utcnow().isoformat() + "Z"
     }
 
+@router.post("/ai/chat/stream")
+async def ai_chat_stream(
+    chat_data: dict,
+    current_user: User = Depends(get_current_user)
+):
+    """AI chat streamed as server-sent events
+    
+    Emits ``chunk`` events ({"text": ...}) as the model produces them and
+    ends with a ``done`` ({"cached": bool}) or ``error`` ({"reason", "error"})
+    event. Disconnecting stops the generation.
+    """
+    message = chat_data.get("message", "")
+    if not message.strip():
+        raise HTTPException(status_code=400, detail="Message is required")
+    role = current_user.role
+    
+    async def events():
+        if not ai_service.configured():
+            yield _sse("chunk", {"text": _canned_chat_reply(message, role)})
+            yield _sse("done", {"cached": False})
+            return
+        stream = async_ai_service.stream_chat(message, role)
+        try:
+            async for event, data in stream:
+                yield _sse(event, data)
+        finally:
+            await stream.aclose()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/{task_id}/ai/assign")
+async def ai_assign_task(
+    task_id: int,
+    k: Optional[int] = Query(None, ge=1, le=50),
+    apply: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """AI assignment recommendation for one task from a top-k candidate shortlist"""
+    if current_user.role != "manager":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only managers can assign tasks"
+        )
+    if not ai_service.configured():
+        raise HTTPException(status_code=503, detail="AI assignment is not configured")
+    
+    result = await assignment_service.recommend(db, task_id, k, apply)
+    if result.get("error") == "Task not found":
+        raise HTTPException(status_code=404, detail="Task not found")
+    return result
+
+@router.post("/ai/assign-batch")
+async def ai_assign_batch(
+    batch: TaskBatchAssign,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Assign many tasks with the AI, sending one candidate shortlist per chunk of tasks"""
+    if current_user.role != "manager":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only managers can assign tasks"
+        )
+    if not ai_service.configured():
+        raise HTTPException(status_code=503, detail="AI assignment is not configured")
+    if not batch.task_ids or len(batch.task_ids) > 500:
+        raise HTTPException(status_code=400, detail="task_ids must contain 1-500 ids")
+    if batch.chunk_size is not None and not 1 <= batch.chunk_size <= 50:
+        raise HTTPException(status_code=400, detail="chunk_size must be between 1 and 50")
+    
+    return await assignment_service.assign_batch(db, batch.task_ids, batch.chunk_size, batch.reassign)
+
 @router.get("/{task_id}/reports", response_model=List[TaskStatusReportSchema])
 async def get_task_reports(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all status reports for a task"""
-    task = db.query(Task).filter(Task.id == task_id).first()
+    result = await db.execute(select(Task).filter(Task.id == task_id))
+    task = result.scalars().first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
@@ -231,5 +485,5 @@ async def get_task_reports(
             detail="You can only view reports for your own tasks"
         )
     
-    reports = db.query(TaskStatusReport).filter(TaskStatusReport.task_id == task_id).all()
-    return reports
\ No newline at end of file
+    result = await db.execute(select(TaskStatusReport).filter(TaskStatusReport.task_id == task_id))
+    return result.scalars().all()
\ No newline at end of file
@@ -0,0 +1,67 @@
+import threading
+import time
+from typing import Dict
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    Closed: calls go through and failures are counted. After
+    ``failure_threshold`` consecutive failures the circuit opens and calls
+    fail fast for ``reset_seconds``. It then goes half-open and lets a single
+    probe through: success closes it, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.rejections = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejections += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def abandon(self):
+        """Give up a call without a verdict, freeing the half-open probe slot"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "rejections": self.rejections
+            }
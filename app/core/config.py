@@ -11,8 +11,75 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     
+    # Authenticated user cache (per worker process). Changes made in one worker
+    # only evict its own cache, so other workers may serve a changed or
+    # deactivated user for up to the TTL
+    principal_cache_ttl_seconds: int = 30
+    principal_cache_max_entries: int = 10000
+    
+    # Seconds before the in-memory leaderboard index is rebuilt from the database
+    leaderboard_refresh_seconds: int = 60
+    
+    # Model backend: "gemini" (hosted, needs GEMINI_API_KEY) or "local", a
+    # deterministic stand-in for load tests and offline development
+    ai_backend: str = "gemini"
+    ai_local_latency_seconds: float = 0.2  # before the first chunk
+    ai_local_chunk_delay_seconds: float = 0.02
+    ai_local_chunk_chars: int = 40
+    ai_local_error_rate: float = 0.0
+    ai_local_seed: int = 0
+    
     # Google Gemini AI
     gemini_api_key: Optional[str] = None
+    gemini_base_url: Optional[str] = None  # e.g. a local fake model server in tests
+    
+    # Async AI execution: deadline per call, concurrent calls per model and
+    # consecutive upstream failures before the circuit opens
+    ai_timeout_seconds: float = 30.0
+    ai_max_concurrency: int = 4
+    ai_circuit_failure_threshold: int = 5
+    ai_circuit_reset_seconds: float = 30.0
+    
+    # Items accepted per bulk task create / status request
+    bulk_max_items: int = 10000
+    # Rows fetched per server-side batch by the streaming exports
+    export_batch_size: int = 1000
+    # Rows validated and committed per transaction by POST /api/tasks/import
+    import_batch_size: int = 1000
+    import_max_reported_rejections: int = 1000
+    
+    # Tasks per model call in batch assignment (the roster is sent once per call)
+    ai_assignment_chunk_size: int = 10
+    # Candidates (top-k by workload, success rate, position match) sent to the model per task
+    ai_assignment_shortlist_size: int = 8
+    
+    # In-memory leave interval index: rebuild interval (picks up other workers'
+    # writes) and how far back ended leave is kept; older windows query SQL
+    leave_index_refresh_seconds: int = 60
+    leave_index_lookback_days: int = 90
+    
+    # Colleagues a leave's open tasks are spread over by default
+    leave_transfer_max_recipients: int = 5
+    
+    # Background AI enrichment of new tasks and status reports (python -m app.worker)
+    ai_enrichment_enabled: bool = True
+    job_worker_concurrency: int = 4
+    job_max_attempts: int = 5
+    job_retry_base_seconds: float = 10.0
+    job_lease_seconds: int = 300
+    job_poll_seconds: float = 1.0
+    
+    # Persistent AI response cache (local SQLite file shared by workers)
+    ai_cache_path: str = "./ai_cache.db"
+    ai_cache_max_entries: int = 5000
+    ai_cache_default_ttl_seconds: int = 86400
+    ai_cache_ttl_seconds: dict = {
+        "chat_assistant": 600,
+        "generate_task_assignment": 3600,
+        "generate_batch_assignment": 3600,
+        "assess_task_risk": 86400,
+        "provide_status_feedback": 86400
+    }
     
     # Environment
     environment: str = "development"
@@ -33,6 +100,12 @@ class Settings(BaseSettings):
     
     def get_database_url(self):
         """Get database URL - using SQLite for this deployment"""
+        if not self.database_url.startswith("sqlite:"):
+            raise ValueError(f"Unsupported DATABASE_URL {self.database_url.split(':', 1)[0]!r}: only SQLite is supported")
         return self.database_url
 
+    def get_async_database_url(self):
+        """Get database URL with the aiosqlite driver - SQLite is the only supported database"""
+        return self.get_database_url().replace("sqlite:", "sqlite+aiosqlite:", 1)
+
 settings = Settings()
\ No newline at end of file
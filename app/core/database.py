@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
@@ -7,19 +8,42 @@ from app.core.config import settings
 Base = declarative_base()
 
 # Create database engine with proper URL handling for Heroku
+# The sync engine is only used for schema management and offline scripts
 engine = create_engine(
     settings.get_database_url(),
     connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {},
     echo=settings.debug
 )
 
+def _enable_wal(dbapi_connection, connection_record):
+    # WAL lets readers and one writer run side by side: a long read (e.g. a
+    # streaming export) no longer blocks writes. The mode is stored in the file.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine used by the API so queries never block the event loop
+async_engine = create_async_engine(
+    settings.get_async_database_url(),
+    echo=settings.debug
+)
+
+if async_engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", _enable_wal)
+    event.listen(async_engine.sync_engine, "connect", _enable_wal)
+
+# Objects stay usable after commit so routes can return them directly
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Dependency to get database session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
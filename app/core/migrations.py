@@ -0,0 +1,253 @@
+"""
+Versioned schema migrations.
+
+Run as a deploy step, once per release, before the web workers start:
+
+    python -m app.core.migrations upgrade   # apply pending migrations
+    python -m app.core.migrations current   # print the applied version
+    python -m app.core.migrations check     # fail unless every hot query is an index search
+
+Each migration runs in its own transaction and is recorded in
+``schema_migrations``. Migrations are written to be idempotent because the
+baseline creates any missing tables from the current models.
+"""
+import sys
+from datetime import datetime
+from typing import Callable, List, Tuple
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = []
+
+def migration(version: int, name: str):
+    """Register a migration function under a version number"""
+    def register(func):
+        MIGRATIONS.append((version, name, func))
+        MIGRATIONS.sort(key=lambda entry: entry[0])
+        return func
+    return register
+
+def _add_column_if_missing(conn: Connection, table: str, column: str, ddl: str):
+    columns = {col["name"] for col in inspect(conn).get_columns(table)}
+    if column not in columns:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+def _create_index(conn: Connection, name: str, table: str, columns: str, where: str = None):
+    statement = f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"
+    if where:
+        statement += f" WHERE {where}"
+    conn.execute(text(statement))
+
+@migration(1, "baseline")
+def _baseline(conn: Connection):
+    from app.core.database import Base
+    import app.models.user  # noqa: F401 - register models
+    import app.models.task  # noqa: F401
+    Base.metadata.create_all(bind=conn)
+
+def _backfill_employee_scores(conn: Connection):
+    # Same per-assignee totals as ScoringService.recalculate_all_scores
+    conn.execute(text("""
+        UPDATE employee_profiles
+        SET net_score = 0, score = 0, tasks_completed = 0, tasks_failed = 0, success_rate = 0.0
+    """))
+    conn.execute(text("""
+        UPDATE employee_profiles SET
+            net_score = totals.net,
+            score = CASE WHEN totals.net > 0 THEN totals.net ELSE 0 END,
+            tasks_completed = totals.completed,
+            tasks_failed = totals.failed,
+            success_rate = totals.completed * 100.0 / (totals.completed + totals.failed)
+        FROM (
+            SELECT assigned_to AS user_id,
+                   SUM(CASE WHEN status = 'completed' THEN COALESCE(score_value, 0)
+                            ELSE -2 * COALESCE(score_value, 0) END) AS net,
+                   SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) AS completed,
+                   SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END) AS failed
+            FROM tasks
+            WHERE assigned_to IS NOT NULL AND status IN ('completed', 'failed')
+            GROUP BY assigned_to
+        ) AS totals
+        WHERE employee_profiles.user_id = totals.user_id
+    """))
+
+@migration(2, "employee_net_score")
+def _employee_net_score(conn: Connection):
+    _add_column_if_missing(conn, "employee_profiles", "net_score", "INTEGER DEFAULT 0")
+    _backfill_employee_scores(conn)
+
+@migration(3, "task_pagination_indexes")
+def _task_pagination_indexes(conn: Connection):
+    _create_index(conn, "ix_tasks_created_at_id", "tasks", "created_at, id")
+    _create_index(conn, "ix_tasks_due_date_id", "tasks", "due_date, id")
+    for column in ("assigned_to", "status", "priority"):
+        _create_index(conn, f"ix_tasks_{column}_created_at_id", "tasks", f"{column}, created_at, id")
+        _create_index(conn, f"ix_tasks_{column}_due_date_id", "tasks", f"{column}, due_date, id")
+
+@migration(4, "hot_query_indexes")
+def _hot_query_indexes(conn: Connection):
+    # Partial: unassigned tasks never match an assigned_to = ? lookup
+    _create_index(conn, "ix_tasks_assigned_to_status", "tasks", "assigned_to, status", where="assigned_to IS NOT NULL")
+    _create_index(conn, "ix_task_status_reports_task_id", "task_status_reports", "task_id, created_at")
+    _create_index(conn, "ix_leave_requests_employee_id", "leave_requests", "employee_id, created_at")
+
+@migration(5, "background_jobs")
+def _background_jobs(conn: Connection):
+    from app.models.job import BackgroundJob
+    BackgroundJob.__table__.create(bind=conn, checkfirst=True)
+
+@migration(6, "leave_overlap_index")
+def _leave_overlap_index(conn: Connection):
+    _create_index(conn, "ix_leave_requests_status_end_date", "leave_requests", "status, end_date, start_date")
+
+@migration(7, "leave_listing_indexes")
+def _leave_listing_indexes(conn: Connection):
+    _create_index(conn, "ix_leave_requests_status_start_date", "leave_requests", "status, start_date, id")
+    _create_index(conn, "ix_leave_requests_created_at_id", "leave_requests", "created_at, id")
+
+@migration(8, "backfill_employee_scores")
+def _rebuild_employee_scores(conn: Connection):
+    # Re-runs the full backfill: databases upgraded by an earlier version 2,
+    # which filled in net_score only, still have stale score and task counts
+    _backfill_employee_scores(conn)
+
+@migration(9, "background_job_lease_owner")
+def _background_job_lease_owner(conn: Connection):
+    _add_column_if_missing(conn, "background_jobs", "locked_by", "VARCHAR(64)")
+
+def _ensure_version_table(conn: Connection):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at DATETIME NOT NULL
+        )
+    """))
+
+def current_version(engine) -> int:
+    with engine.begin() as conn:
+        _ensure_version_table(conn)
+        return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")).scalar()
+
+def upgrade(engine) -> List[int]:
+    """Apply every pending migration, returning the versions applied"""
+    applied = []
+    for version, name, func in MIGRATIONS:
+        if version <= current_version(engine):
+            continue
+        with engine.begin() as conn:
+            func(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:version, :name, :applied_at)"),
+                {"version": version, "name": name, "applied_at": datetime.utcnow()}
+            )
+        applied.append(version)
+    return applied
+
+# Tables small enough that a full scan of a covering index is acceptable in a
+# hot query plan; every other step must be a SEARCH
+COVERING_SCAN_TABLES: Tuple[str, ...] = ()
+
+def _plan_step_ok(step: str) -> bool:
+    if step.startswith("SEARCH "):
+        return True
+    parts = step.split()
+    # "SCAN <table> USING COVERING INDEX <index>" reads the whole index
+    return parts[0] == "SCAN" and " USING COVERING INDEX " in step and parts[1] in COVERING_SCAN_TABLES
+
+def hot_queries():
+    """(label, statement) pairs that must be served by an index"""
+    from sqlalchemy import select, func, tuple_
+    from app.models.user import User, EmployeeProfile
+    from app.models.task import Task, TaskStatusReport, LeaveRequest
+    from app.models.job import BackgroundJob
+
+    now = datetime.utcnow()
+    return [
+        ("user by email", select(User).filter(User.email == "user@example.com")),
+        ("profile by user", select(EmployeeProfile).filter(EmployeeProfile.user_id == 1)),
+        ("active tasks by assignee", select(Task).filter(
+            Task.assigned_to == 1, Task.status.in_(["pending", "in_progress"])
+        )),
+        ("score totals by assignee", select(func.count(Task.id)).filter(
+            Task.assigned_to == 1, Task.status == "completed"
+        )),
+        ("tasks by status and due date", select(Task).filter(
+            Task.status == "pending", Task.due_date < now
+        )),
+        ("task page", select(Task).filter(
+            tuple_(Task.created_at, Task.id) > tuple_(now, 1)
+        ).order_by(Task.created_at, Task.id).limit(100)),
+        ("reports by task", select(TaskStatusReport).filter(TaskStatusReport.task_id == 1)),
+        ("leave requests by employee", select(LeaveRequest).filter(LeaveRequest.employee_id == 1)),
+        ("leave overlapping a window", select(LeaveRequest.id).filter(
+            LeaveRequest.status.in_(["approved", "pending"]),
+            LeaveRequest.end_date >= now, LeaveRequest.start_date <= now
+        )),
+        ("pending leave queue page", select(LeaveRequest).filter(
+            LeaveRequest.status == "pending",
+            tuple_(LeaveRequest.start_date, LeaveRequest.id) > tuple_(now, 1)
+        ).order_by(LeaveRequest.start_date, LeaveRequest.id).limit(50)),
+        ("leave history page", select(LeaveRequest).filter(
+            tuple_(LeaveRequest.created_at, LeaveRequest.id) < tuple_(now, 1)
+        ).order_by(LeaveRequest.created_at.desc(), LeaveRequest.id.desc()).limit(50)),
+        ("employee leave history page", select(LeaveRequest).filter(
+            LeaveRequest.employee_id == 1
+        ).order_by(LeaveRequest.created_at.desc(), LeaveRequest.id.desc()).limit(50)),
+        ("next due job", select(BackgroundJob.id).filter(
+            BackgroundJob.status == "queued", BackgroundJob.run_at <= now
+        ).order_by(BackgroundJob.run_at).limit(1)),
+        ("queued job for entity", select(BackgroundJob).filter(
+            BackgroundJob.kind == "enrich_task", BackgroundJob.entity_id == 1, BackgroundJob.status == "queued"
+        )),
+    ]
+
+def check_query_plans(engine) -> List[str]:
+    """EXPLAIN QUERY PLAN each hot query; return failures for any step that is not an index search
+
+    A "SCAN ... USING INDEX" step walks the whole index and fails too, as
+    does a temporary B-tree for sorting. Only covering-index scans of
+    COVERING_SCAN_TABLES are allowed.
+    """
+    failures = []
+    with engine.connect() as conn:
+        for label, statement in hot_queries():
+            compiled = statement.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+            params = compiled.construct_params()
+            if conn.dialect.positional:
+                params = tuple(params[name] for name in compiled.positiontup)
+            plan = [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params)]
+            bad_steps = [step for step in plan if not _plan_step_ok(step)]
+            if bad_steps:
+                failures.append(f"{label}: {'; '.join(bad_steps)}")
+    return failures
+
+def main(argv: List[str]) -> int:
+    from app.core.database import engine
+
+    command = argv[0] if argv else "upgrade"
+    if command == "upgrade":
+        applied = upgrade(engine)
+        print(f"Applied migrations: {applied}" if applied else "Schema is up to date")
+    elif command == "current":
+        print(current_version(engine))
+    elif command == "check":
+        if engine.dialect.name != "sqlite":
+            print("Query plan check only supports SQLite")
+            return 0
+        if current_version(engine) < MIGRATIONS[-1][0]:
+            print("Schema is behind; run `python -m app.core.migrations upgrade` first")
+            return 1
+        failures = check_query_plans(engine)
+        for failure in failures:
+            print(f"NOT AN INDEX SEARCH {failure}")
+        if failures:
+            return 1
+        print("All hot queries are index searches")
+    else:
+        print(f"Unknown command: {command}")
+        return 2
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,27 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """Encode keyset position values as an opaque URL-safe cursor"""
+    payload = {
+        key: {"dt": value.isoformat()} if isinstance(value, datetime) else value
+        for key, value in values.items()
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a cursor produced by encode_cursor, raising ValueError if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid cursor")
+    return {
+        key: datetime.fromisoformat(value["dt"]) if isinstance(value, dict) and "dt" in value else value
+        for key, value in payload.items()
+    }
@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.config import settings
+
+class PrincipalCache:
+    """In-process LRU cache of authenticated users keyed by token subject.
+
+    Entries expire at the earlier of the configured TTL and the token's
+    ``exp`` claim. Cached users are detached from any session, so routes may
+    only read their column attributes.
+
+    Flushes that change a user or profile evict it only in the process that
+    flushed. Other workers keep serving the old row (including a user since
+    deactivated) until their entry expires, so ``principal_cache_ttl_seconds``
+    is the accepted bound on that staleness.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._subjects_by_user_id: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, subject: str):
+        """Return the cached user for a subject, or None on miss/expiry"""
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None:
+                self.misses += 1
+                return None
+            user, expires_at = entry
+            if expires_at <= time.time():
+                self._remove(subject)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(subject)
+            self.hits += 1
+            return user
+
+    def set(self, subject: str, user, token_exp: Optional[float] = None):
+        """Cache a detached user until the TTL or the token expiry, whichever is first"""
+        expires_at = time.time() + self.ttl_seconds
+        if token_exp is not None:
+            expires_at = min(expires_at, float(token_exp))
+        with self._lock:
+            if subject in self._entries:
+                self._remove(subject)
+            self._entries[subject] = (user, expires_at)
+            self._subjects_by_user_id[user.id] = subject
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: int):
+        """Drop the cached principal for a user id"""
+        with self._lock:
+            subject = self._subjects_by_user_id.get(user_id)
+            if subject is not None:
+                self._remove(subject)
+                self.invalidations += 1
+
+    def invalidate_subject(self, subject: str):
+        """Drop the cached principal for a token subject"""
+        with self._lock:
+            if subject in self._entries:
+                self._remove(subject)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._subjects_by_user_id.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+    def _remove(self, subject: str):
+        entry = self._entries.pop(subject, None)
+        if entry is not None and self._subjects_by_user_id.get(entry[0].id) == subject:
+            del self._subjects_by_user_id[entry[0].id]
+
+# Global principal cache instance
+principal_cache = PrincipalCache(
+    max_entries=settings.principal_cache_max_entries,
+    ttl_seconds=settings.principal_cache_ttl_seconds
+)
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_changed_principals(session, flush_context):
+    """Evict cached users whose user row or profile was changed in this flush"""
+    from app.models.user import User, EmployeeProfile, ManagerProfile
+
+    changed = [obj for obj in session.dirty if session.is_modified(obj)]
+    for obj in changed + list(session.deleted):
+        if isinstance(obj, User):
+            principal_cache.invalidate_user(obj.id)
+        elif isinstance(obj, (EmployeeProfile, ManagerProfile)):
+            principal_cache.invalidate_user(obj.user_id)
@@ -0,0 +1,48 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+class SingleFlight:
+    """Coalesces concurrent async calls that share a key into one execution.
+
+    The first caller for a key starts the call as its own task; callers that
+    arrive while it is running await the same task instead of starting
+    another. The task is cancelled only when every waiter has gone away, so
+    one client disconnecting does not fail the others. Works across tasks on
+    one event loop (i.e. within a worker process).
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, Tuple[asyncio.Task, list]] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Run func once per key at a time; returns (result, shared)"""
+        entry = self._calls.get(key)
+        shared = entry is not None
+        if shared:
+            self.coalesced += 1
+        else:
+            self.executions += 1
+            task = asyncio.ensure_future(func())
+            entry = (task, [0])
+            self._calls[key] = entry
+            task.add_done_callback(lambda _: self._calls.pop(key, None) if self._calls.get(key) is entry else None)
+
+        task, waiters = entry
+        waiters[0] += 1
+        try:
+            return await asyncio.shield(task), shared
+        except asyncio.CancelledError:
+            if not task.done() and waiters[0] == 1:
+                task.cancel()
+            raise
+        finally:
+            waiters[0] -= 1
+
+    def stats(self):
+        return {
+            "in_flight": len(self._calls),
+            "executions": self.executions,
+            "coalesced": self.coalesced
+        }
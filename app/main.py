@@ -1,31 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.principal_cache import principal_cache
+from app.services.ai_cache import ai_cache
+from app.services.async_ai_service import async_ai_service
 
-# Import models to ensure they are registered with SQLAlchemy
-from app.models.user import User, EmployeeProfile, ManagerProfile
-from app.models.task import Task, TaskStatusReport, LeaveRequest
+# Tables and indexes are created by `python -m app.core.migrations upgrade`,
+# models are registered through the routers that use them
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(
-    title="AI-Powered Project Management System",
-    description="Backend API for project management with AI features",
-    version="1.0.0",
-)
-
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"] if settings.debug else settings.allowed_hosts,  # Configure for production
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
-    allow_headers=["*"],
-)
-
-@app.get("/")
 async def root():
     return {
         "message": "AI-Powered Project Management System API",
@@ -33,18 +15,56 @@ async def root():
         "status": "running"
     }
 
-@app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "principal_cache": principal_cache.stats(),
+        "ai_cache": await ai_cache.astats(),
+        "ai": async_ai_service.stats()
+    }
 
-# Include API routers
-from app.api import auth, tasks, analytics, leave
+def create_app() -> FastAPI:
+    """Build the ASGI application
+    
+    Safe to call in a gunicorn master with --preload: nothing here opens a
+    database connection or network client, so forked workers start with
+    every module already imported.
+    """
+    app = FastAPI(
+        title="AI-Powered Project Management System",
+        description="Backend API for project management with AI features",
+        version="1.0.0",
+    )
+    
+    # Configure CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"] if settings.debug else settings.allowed_hosts,  # Configure for production
+        allow_credentials=True,
+        allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
+        allow_headers=["*"],
+    )
+    
+    app.add_api_route("/", root, methods=["GET"])
+    app.add_api_route("/health", health_check, methods=["GET"])
+    
+    # Include API routers
+    from app.api import auth, tasks, analytics, leave, jobs, exports
+    
+    app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
+    app.include_router(tasks.router, prefix="/api/tasks", tags=["tasks"])
+    app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
+    app.include_router(leave.router, prefix="/api/leave", tags=["leave"])
+    app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
+    app.include_router(exports.router, prefix="/api/exports", tags=["exports"])
+    
+    return app
 
-app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
-app.include_router(tasks.router, prefix="/api/tasks", tags=["tasks"])
-app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
-app.include_router(leave.router, prefix="/api/leave", tags=["leave"])
+app = create_app()
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    from app.core.database import engine
+    from app.core.migrations import upgrade
+    upgrade(engine)
+    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
+from app.core.database import Base
+from datetime import datetime
+from enum import Enum as PyEnum
+
+class JobStatus(PyEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class JobKind(PyEnum):
+    ENRICH_TASK = "enrich_task"
+    ENRICH_REPORT = "enrich_report"
+
+class BackgroundJob(Base):
+    __tablename__ = "background_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    status = Column(String(20), nullable=False, default=JobStatus.QUEUED.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_until = Column(DateTime)  # lease of a running job; expired leases are reclaimed
+    locked_by = Column(String(64))  # token of the current lease; results from older leases are dropped
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        # Worker claim: next due job by status
+        Index("ix_background_jobs_status_run_at", "status", "run_at"),
+        # Enqueue dedup and status lookups per entity
+        Index("ix_background_jobs_kind_entity_id", "kind", "entity_id", "status"),
+    )
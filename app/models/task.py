@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Float, Text, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Float, Text, Enum, Index, text
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from datetime import datetime
@@ -47,6 +47,24 @@ class Task(Base):
     assignee = relationship("User", foreign_keys=[assigned_to], back_populates="assigned_tasks")
     creator = relationship("User", foreign_keys=[created_by], back_populates="created_tasks")
     status_reports = relationship("TaskStatusReport", back_populates="task")
+    
+    # Keyset pagination: one index per (equality filter, sort key) shape of GET /api/tasks/
+    __table_args__ = (
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+        Index("ix_tasks_due_date_id", "due_date", "id"),
+        Index("ix_tasks_assigned_to_created_at_id", "assigned_to", "created_at", "id"),
+        Index("ix_tasks_assigned_to_due_date_id", "assigned_to", "due_date", "id"),
+        Index("ix_tasks_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_tasks_status_due_date_id", "status", "due_date", "id"),
+        Index("ix_tasks_priority_created_at_id", "priority", "created_at", "id"),
+        Index("ix_tasks_priority_due_date_id", "priority", "due_date", "id"),
+        # Per-assignee status lookups (scoring, leave transfers); unassigned rows are left out.
+        # Only sqlite_where here: a postgresql_* kwarg imports that dialect at startup.
+        Index(
+            "ix_tasks_assigned_to_status", "assigned_to", "status",
+            sqlite_where=text("assigned_to IS NOT NULL")
+        ),
+    )
 
 class TaskStatusReport(Base):
     __tablename__ = "task_status_reports"
@@ -62,6 +80,10 @@ class TaskStatusReport(Base):
     # Relationships
     task = relationship("Task", back_populates="status_reports")
     employee = relationship("User")
+    
+    __table_args__ = (
+        Index("ix_task_status_reports_task_id", "task_id", "created_at"),
+    )
 
 class LeaveRequest(Base):
     __tablename__ = "leave_requests"
@@ -82,4 +104,13 @@ class LeaveRequest(Base):
     
     # Relationships
     employee = relationship("EmployeeProfile", back_populates="leave_requests")
-    approver = relationship("User", foreign_keys=[approved_by])
\ No newline at end of file
+    approver = relationship("User", foreign_keys=[approved_by])
+    
+    __table_args__ = (
+        Index("ix_leave_requests_employee_id", "employee_id", "created_at"),
+        # Overlap lookups: status = ? AND end_date >= ? AND start_date <= ?
+        Index("ix_leave_requests_status_end_date", "status", "end_date", "start_date"),
+        # GET /api/leave/leave-requests: status queues by start date, unfiltered history newest first
+        Index("ix_leave_requests_status_start_date", "status", "start_date", "id"),
+        Index("ix_leave_requests_created_at_id", "created_at", "id"),
+    )
\ No newline at end of file
@@ -28,6 +28,7 @@ class EmployeeProfile(Base):
     name = Column(String(255), nullable=False)
     position = Column(String(255))
     score = Column(Integer, default=0)
+    net_score = Column(Integer, default=0)  # Unclamped running total, score = max(0, net_score)
     leave_score = Column(Integer, default=100)
     success_rate = Column(Float, default=0.0)
     tasks_completed = Column(Integer, default=0)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Any, Optional, List
 from datetime import datetime
 from enum import Enum
 
@@ -16,6 +16,20 @@ class TaskPriority(str, Enum):
     HIGH = "high"
     CRITICAL = "critical"
 
+class LeaveStatusFilter(str, Enum):
+    PENDING = "pending"
+    APPROVED = "approved"
+    REJECTED = "rejected"
+    ALL = "all"
+
+class FileFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+class TaskSortField(str, Enum):
+    CREATED_AT = "created_at"
+    DUE_DATE = "due_date"
+
 # Task schemas
 class TaskBase(BaseModel):
     title: str
@@ -28,6 +42,18 @@ class TaskBase(BaseModel):
 class TaskCreate(TaskBase):
     assigned_to: Optional[int] = None
 
+class TaskBulkCreate(BaseModel):
+    tasks: List[Any]  # each validated as a TaskCreate, with per-item errors
+    enrich: bool = True
+
+class TaskBulkStatus(BaseModel):
+    updates: List[Any]  # {"task_id": int, "status": TaskStatus}
+
+class TaskBatchAssign(BaseModel):
+    task_ids: List[int]
+    chunk_size: Optional[int] = None  # defaults to settings.ai_assignment_chunk_size
+    reassign: bool = False
+
 class TaskUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -0,0 +1,238 @@
+"""
+Model backends for AIService.
+
+A backend turns a prompt into a stream of text chunks. ``settings.ai_backend``
+picks one of ``BACKENDS``:
+
+- ``gemini``: the hosted model (needs ``GEMINI_API_KEY``)
+- ``local``: a deterministic in-process stand-in for load tests, CI and
+  offline development. It answers every AIService prompt type with JSON in
+  the shape that prompt asks for. Latency, chunk cadence and error rate come
+  from the ``ai_local_*`` settings.
+"""
+import json
+import random
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, Optional, Type
+from app.core.config import settings
+
+class AIBackend(ABC):
+    """Interface AIService sends prompts through"""
+    name = ""
+    model = ""
+
+    def configured(self) -> bool:
+        """Whether the backend can take calls (e.g. has credentials)"""
+        return True
+
+    @abstractmethod
+    def stream(self, prompt: str, cancel: Optional[threading.Event] = None) -> Iterator[str]:
+        """Yield text chunks for the prompt; stop early once cancel is set"""
+
+class GeminiBackend(AIBackend):
+    name = "gemini"
+
+    def __init__(self, model: str = "gemma-3-27b-it"):
+        # The SDK import and client construction are deferred to first use
+        # so importing this module stays cheap for every worker
+        self._client = None
+        self.model = model
+
+    def configured(self) -> bool:
+        return bool(settings.gemini_api_key)
+
+    @property
+    def client(self):
+        if self._client is None:
+            from google import genai
+            from google.genai import types
+            # base_url lets tests and local runs point at a fake model server
+            self._client = genai.Client(
+                api_key=settings.gemini_api_key,
+                http_options=types.HttpOptions(
+                    base_url=settings.gemini_base_url,
+                    timeout=int(settings.ai_timeout_seconds * 1000)
+                )
+            )
+        return self._client
+
+    def stream(self, prompt: str, cancel: Optional[threading.Event] = None) -> Iterator[str]:
+        from google.genai import types
+        contents = [types.Content(
+            role="user",
+            parts=[types.Part.from_text(text=prompt)]
+        )]
+
+        chunks = self.client.models.generate_content_stream(
+            model=self.model,
+            contents=contents,
+            config=types.GenerateContentConfig()
+        )
+        try:
+            for chunk in chunks:
+                if cancel is not None and cancel.is_set():
+                    break
+                if chunk.text:  # Check if chunk.text is not None
+                    yield chunk.text
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+
+class LocalModelError(Exception):
+    """Injected failure from the local backend; looks like a 503 to the AI execution layer"""
+    code = 503
+
+_ASSIGNEE_LINE = re.compile(r"^\s*- (.+?) \(id (-?\d+)\): .*Success Rate: ([\d.]+)%", re.M)
+_ROSTER_LINE = re.compile(r"^\s*- id (\d+): .*Success Rate: ([\d.]+)%, Open Tasks: (\d+)", re.M)
+_BATCH_TASK_LINE = re.compile(r"^\s*- task_id (\d+):", re.M)
+_SUCCESS_RATE = re.compile(r"Success Rate: ([\d.]+)%")
+_PROGRESS = re.compile(r"Progress: (\d+)%")
+_QUESTION = re.compile(r"User Question: (.*)", re.S)
+
+class LocalBackend(AIBackend):
+    """Deterministic stand-in model.
+
+    The same prompt always gets the same reply, so caching, coalescing and
+    batching behave as they would against the real model and runs are
+    reproducible. The reply is split into ``chunk_chars`` pieces. The first
+    piece comes after ``latency`` seconds, and each later one after
+    ``chunk_delay`` seconds. A ``error_rate`` fraction of calls fail before
+    the first chunk. Which calls fail comes from a generator seeded with
+    ``seed``, so a run with the same call order fails the same calls.
+    """
+    name = "local"
+    model = "local-standin"
+
+    def __init__(self, latency: Optional[float] = None, chunk_delay: Optional[float] = None,
+                 chunk_chars: Optional[int] = None, error_rate: Optional[float] = None,
+                 seed: Optional[int] = None):
+        self.latency = settings.ai_local_latency_seconds if latency is None else latency
+        self.chunk_delay = settings.ai_local_chunk_delay_seconds if chunk_delay is None else chunk_delay
+        self.chunk_chars = max(settings.ai_local_chunk_chars if chunk_chars is None else chunk_chars, 1)
+        self.error_rate = settings.ai_local_error_rate if error_rate is None else error_rate
+        self._errors = random.Random(settings.ai_local_seed if seed is None else seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def stream(self, prompt: str, cancel: Optional[threading.Event] = None) -> Iterator[str]:
+        with self._lock:
+            self.calls += 1
+            failed = self._errors.random() < self.error_rate
+        if not self._wait(self.latency, cancel):
+            return
+        if failed:
+            raise LocalModelError("Local model stand-in: injected upstream failure")
+
+        text = self.reply(prompt)
+        for start in range(0, len(text), self.chunk_chars):
+            if start and not self._wait(self.chunk_delay, cancel):
+                return
+            yield text[start:start + self.chunk_chars]
+
+    def _wait(self, seconds: float, cancel: Optional[threading.Event]) -> bool:
+        """Sleep, returning False as soon as cancel is set"""
+        if cancel is not None:
+            return not cancel.wait(seconds) if seconds > 0 else not cancel.is_set()
+        if seconds > 0:
+            time.sleep(seconds)
+        return True
+
+    def reply(self, prompt: str) -> str:
+        """Full reply text for a prompt, by the AIService prompt it came from"""
+        rng = random.Random(prompt)
+        if "Assign each of the following tasks" in prompt:
+            return self._fenced(self._batch_assignment(prompt, rng))
+        if "Assign the following task" in prompt:
+            return self._fenced(self._task_assignment(prompt, rng))
+        if "Analyze the risk factors" in prompt:
+            return self._fenced(self._task_risk(prompt, rng))
+        if "Review this task status report" in prompt:
+            return self._fenced(self._status_feedback(prompt, rng))
+        question = _QUESTION.search(prompt)
+        topic = " ".join((question.group(1) if question else prompt).split()[:12])
+        return (f"Here is a suggestion for \"{topic}\": break the work into small tasks, "
+                f"agree on owners and due dates, and review progress in the next stand-up.")
+
+    def _fenced(self, payload) -> str:
+        # Hosted models usually wrap JSON in a code fence, so parse_json_response sees the same shape
+        return "```json\n" + json.dumps(payload, indent=2) + "\n```"
+
+    def _assessment(self, rng: random.Random, success_rate: float) -> Dict:
+        risk = round(min(max((100 - success_rate) / 100 * 0.7 + rng.uniform(0.0, 0.3), 0.0), 1.0), 2)
+        return {
+            "difficulty_level": "easy" if risk < 0.3 else "medium" if risk < 0.6 else "hard",
+            "estimated_hours": rng.choice([2, 4, 6, 8, 12, 16]),
+            "risk_factors": rng.sample(["tight deadline", "unclear requirements", "external dependency",
+                                        "new technology", "high workload"], 2),
+            "success_probability": round((1 - risk) * 100)
+        }
+
+    def _task_assignment(self, prompt: str, rng: random.Random) -> Dict:
+        candidates = [(name, int(emp_id), float(rate)) for name, emp_id, rate in _ASSIGNEE_LINE.findall(prompt)]
+        if not candidates:
+            return {"recommended_employee": None, "recommended_employee_id": None,
+                    "reasoning": "No employees were listed", **self._assessment(rng, 0)}
+        name, emp_id, rate = max(candidates, key=lambda c: c[2])
+        return {
+            "recommended_employee": name,
+            "recommended_employee_id": emp_id,
+            "reasoning": f"{name} has the best success rate ({rate:g}%) among the candidates",
+            **self._assessment(rng, rate)
+        }
+
+    def _batch_assignment(self, prompt: str, rng: random.Random) -> list:
+        # Spread tasks over the roster by open workload, counting the ones assigned here
+        roster = [[int(open_tasks), -float(rate), int(emp_id)] for emp_id, rate, open_tasks in _ROSTER_LINE.findall(prompt)]
+        assignments = []
+        for task_id in _BATCH_TASK_LINE.findall(prompt):
+            if not roster:
+                break
+            emp = min(roster)
+            emp[0] += 1
+            assignments.append({
+                "task_id": int(task_id),
+                "employee_id": emp[2],
+                "reasoning": f"Lowest open workload with a {-emp[1]:g}% success rate",
+                **self._assessment(rng, -emp[1])
+            })
+        return assignments
+
+    def _task_risk(self, prompt: str, rng: random.Random) -> Dict:
+        rate = _SUCCESS_RATE.search(prompt)
+        assessment = self._assessment(rng, float(rate.group(1)) if rate else 50.0)
+        return {
+            "risk_score": round(1 - assessment["success_probability"] / 100, 2),
+            "difficulty_level": assessment["difficulty_level"],
+            "risk_factors": assessment["risk_factors"],
+            "recommendations": ["Agree on acceptance criteria early", "Schedule a mid-point review"],
+            "monitoring_points": ["Progress against estimate", "Blocked dependencies"]
+        }
+
+    def _status_feedback(self, prompt: str, rng: random.Random) -> Dict:
+        match = _PROGRESS.search(prompt)
+        progress = int(match.group(1)) if match else 0
+        return {
+            "feedback": f"Progress is at {progress}%. " + rng.choice(
+                ["Keep the report focused on outcomes.", "Good level of detail.", "Call out blockers explicitly."]
+            ),
+            "suggestions": ["Break the remaining work into daily goals", "Share a short demo"],
+            "concerns": [] if progress >= 50 else ["Less than half done"],
+            "next_steps": ["Finish the current milestone", "Update the estimate"],
+            "risk_level": "low" if progress >= 70 else "medium" if progress >= 30 else "high"
+        }
+
+BACKENDS: Dict[str, Type[AIBackend]] = {
+    GeminiBackend.name: GeminiBackend,
+    LocalBackend.name: LocalBackend
+}
+
+def create_backend(name: str) -> AIBackend:
+    """Backend instance for a ``settings.ai_backend`` value"""
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown AI backend {name!r}; expected one of {sorted(BACKENDS)}") from None
@@ -0,0 +1,237 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.config import settings
+
+logger = logging.getLogger("app.ai_cache")
+
+class AIResponseCache:
+    """Persistent cache of model responses in a local SQLite file.
+
+    Entries are content-addressed by a hash of (model, method, normalized
+    prompt), expire after a per-method TTL, and are evicted least recently
+    used once ``max_entries`` is exceeded. Entries can carry tags such as
+    ``task:12`` or ``employee:3`` so they can be dropped when the underlying
+    record changes.
+    The file is shared by every worker on the machine.
+
+    The methods are blocking: a write may wait up to busy_timeout for
+    another process. Async code uses the ``a*`` variants and
+    ``invalidate_soon``, which run on one cache thread in submission order.
+    """
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: Dict[str, int], default_ttl_seconds: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.default_ttl_seconds = default_ttl_seconds
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # Opened on first use so importing the service stays free of I/O
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS ai_response_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    method TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_accessed_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_ai_response_cache_last_accessed_at
+                    ON ai_response_cache (last_accessed_at);
+                CREATE TABLE IF NOT EXISTS ai_response_cache_tags (
+                    tag TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    PRIMARY KEY (tag, key)
+                );
+                CREATE INDEX IF NOT EXISTS ix_ai_response_cache_tags_key
+                    ON ai_response_cache_tags (key);
+            """)
+            self._conn = conn
+        return self._conn
+
+    def _thread(self) -> ThreadPoolExecutor:
+        # Started on first use so a preloading master never starts threads. A
+        # separate lock: the event loop must not wait on a slow write holding _lock.
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai-cache")
+            return self._executor
+
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        """Collapse whitespace so indentation changes do not bust the cache"""
+        return re.sub(r"\s+", " ", prompt).strip()
+
+    def make_key(self, model: str, method: str, prompt: str) -> str:
+        payload = "\x1f".join((model, method, self.normalize_prompt(prompt)))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT response, expires_at FROM ai_response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                if row is not None:
+                    self._delete_keys([key])
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE ai_response_cache SET last_accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, model: str, method: str, response: str, tags: Iterable[str] = ()):
+        now = time.time()
+        ttl = self.ttl_seconds.get(method, self.default_ttl_seconds)
+        with self._lock:
+            conn = self.conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO ai_response_cache "
+                    "(key, model, method, response, created_at, expires_at, last_accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, model, method, response, now, now + ttl, now)
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO ai_response_cache_tags (tag, key) VALUES (?, ?)",
+                    [(tag, key) for tag in tags]
+                )
+                self._evict()
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def invalidate(self, *tags: str) -> int:
+        """Drop every entry carrying any of the tags, returning how many went"""
+        if not tags or (self._conn is None and not os.path.exists(self.path)):
+            return 0
+        with self._lock:
+            placeholders = ",".join("?" * len(tags))
+            keys = [row[0] for row in self.conn.execute(
+                f"SELECT DISTINCT key FROM ai_response_cache_tags WHERE tag IN ({placeholders})", tags
+            )]
+            self._delete_keys(keys)
+            return len(keys)
+
+    async def aget(self, key: str) -> Optional[str]:
+        return await asyncio.get_running_loop().run_in_executor(self._thread(), self.get, key)
+
+    async def aset(self, key: str, model: str, method: str, response: str, tags: Iterable[str] = ()):
+        await asyncio.get_running_loop().run_in_executor(
+            self._thread(), self.set, key, model, method, response, tuple(tags)
+        )
+
+    async def astats(self) -> Dict:
+        return await asyncio.get_running_loop().run_in_executor(self._thread(), self.stats)
+
+    def invalidate_soon(self, *tags: str) -> Future:
+        """Queue invalidate() on the cache thread without waiting for it
+
+        For sync code running on the event loop, such as flush listeners.
+        Lookups made through aget afterwards run after it.
+        """
+        future = self._thread().submit(self.invalidate, *tags)
+        future.add_done_callback(_log_invalidation_failure)
+        return future
+
+    def clear(self):
+        with self._lock:
+            self.conn.execute("DELETE FROM ai_response_cache")
+            self.conn.execute("DELETE FROM ai_response_cache_tags")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            size = self.conn.execute("SELECT COUNT(*) FROM ai_response_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "size": size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def _evict(self):
+        """Trim to max_entries, least recently used first (caller holds the lock)"""
+        overflow = self.conn.execute("SELECT COUNT(*) FROM ai_response_cache").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            keys = [row[0] for row in self.conn.execute(
+                "SELECT key FROM ai_response_cache ORDER BY last_accessed_at LIMIT ?", (overflow,)
+            )]
+            self._delete_keys(keys)
+
+    def _delete_keys(self, keys):
+        if not keys:
+            return
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            self.conn.execute(f"DELETE FROM ai_response_cache WHERE key IN ({placeholders})", chunk)
+            self.conn.execute(f"DELETE FROM ai_response_cache_tags WHERE key IN ({placeholders})", chunk)
+
+def _log_invalidation_failure(future: Future):
+    if future.exception() is not None:
+        logger.warning("AI cache invalidation failed: %s", future.exception())
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+# Global AI response cache instance
+ai_cache = AIResponseCache(
+    path=settings.ai_cache_path,
+    max_entries=settings.ai_cache_max_entries,
+    ttl_seconds=settings.ai_cache_ttl_seconds,
+    default_ttl_seconds=settings.ai_cache_default_ttl_seconds
+)
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_changed_ai_inputs(session, flush_context):
+    """Drop cached responses tagged with a task or employee changed in this flush"""
+    from app.models.user import User, EmployeeProfile
+    from app.models.task import Task
+
+    tags = set()
+    changed = [obj for obj in session.dirty if session.is_modified(obj)]
+    for obj in changed + list(session.deleted):
+        if isinstance(obj, Task):
+            tags.add(f"task:{obj.id}")
+        elif isinstance(obj, User):
+            tags.add(f"employee:{obj.id}")
+        elif isinstance(obj, EmployeeProfile):
+            tags.add(f"employee:{obj.user_id}")
+    if not tags:
+        return
+    # AsyncSession flushes run on the event loop thread
+    if _on_event_loop():
+        ai_cache.invalidate_soon(*tags)
+    else:
+        ai_cache.invalidate(*tags)
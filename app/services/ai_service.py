@@ -1,17 +1,68 @@
-import os
-from google import genai
-from google.genai import types
+import json
+import re
+import threading
 from app.core.config import settings
-from typing import Optional
+from typing import Iterable, Iterator, Optional
+from app.services.ai_cache import ai_cache
+from app.services.ai_backends import AIBackend, create_backend
+
+def parse_json_response(text: str):
+    """Parse the JSON a model replied with, tolerating code fences and surrounding prose"""
+    cleaned = text.strip()
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", cleaned, re.S)
+    if fenced:
+        cleaned = fenced.group(1).strip()
+    try:
+        return json.loads(cleaned)
+    except ValueError:
+        pass
+    
+    # Fall back to the outermost array or object in the text
+    openers = [i for i in (cleaned.find("["), cleaned.find("{")) if i >= 0]
+    if openers:
+        start = min(openers)
+        end = cleaned.rfind("]" if cleaned[start] == "[" else "}")
+        if end > start:
+            return json.loads(cleaned[start:end + 1])
+    raise ValueError("No JSON found in model response")
 
 class AIService:
-    def __init__(self):
-        self.client = genai.Client(api_key=settings.gemini_api_key)
-        self.model = "gemma-3-27b-it"
+    """Builds the prompts and sends them through a model backend (see ai_backends)"""
     
-    def generate_task_assignment(self, task_description: str, employees: list) -> dict:
-        """AI-powered task assignment based on employee skills and workload"""
-        employee_info = "\n".join([f"- {emp['name']}: {emp['position']}, Score: {emp['score']}, Success Rate: {emp['success_rate']}%" for emp in employees])
+    def __init__(self, backend: Optional[AIBackend] = None):
+        self.backend = backend or create_backend(settings.ai_backend)
+    
+    @property
+    def model(self) -> str:
+        return self.backend.model
+    
+    def configured(self) -> bool:
+        """Whether AI calls can be made (hosted model with a key, or the local stand-in)"""
+        return self.backend.configured()
+    
+    def stream(self, prompt: str, cancel: Optional[threading.Event] = None) -> Iterator[str]:
+        """Yield text chunks from the model; stops early once cancel is set"""
+        return self.backend.stream(prompt, cancel)
+    
+    def _generate(self, method: str, prompt: str, cache_tags: Iterable[str] = ()) -> dict:
+        """Stream a completion for the prompt, serving repeats from the response cache"""
+        key = ai_cache.make_key(self.model, method, prompt)
+        cached = ai_cache.get(key)
+        if cached is not None:
+            return {"ai_response": cached, "status": "success", "cached": True}
+        
+        try:
+            response = "".join(self.stream(prompt))
+        except Exception as e:
+            return {"error": str(e), "status": "error"}
+        
+        # Only successful responses are cached so errors are retried
+        ai_cache.set(key, self.model, method, response, cache_tags)
+        return {"ai_response": response, "status": "success", "cached": False}
+    
+    def task_assignment_prompt(self, task_description: str, employees: list) -> str:
+        """Build the generate_task_assignment prompt"""
+        employee_info = "\n".join([f"- {emp['name']} (id {emp.get('user_id', '-')}): {emp['position']}, Score: {emp['score']}, Success Rate: {emp['success_rate']}%" for emp in employees])
         
         prompt = f"""
         You are an AI project manager. Assign the following task to the most suitable employee:
@@ -30,6 +81,7 @@ class AIService:
         Respond in JSON format:
         {{
             "recommended_employee": "employee_name",
+            "recommended_employee_id": number,
             "reasoning": "explanation",
             "difficulty_level": "easy|medium|hard",
             "estimated_hours": number,
@@ -37,28 +89,53 @@ class AIService:
             "success_probability": percentage
         }}
         """
+        return prompt
+    
+    def generate_task_assignment(self, task_description: str, employees: list, cache_tags: Iterable[str] = ()) -> dict:
+        """AI-powered task assignment based on employee skills and workload"""
+        return self._generate("generate_task_assignment", self.task_assignment_prompt(task_description, employees), cache_tags)
+    
+    def batch_assignment_prompt(self, tasks: list, employees: list) -> str:
+        """Build the generate_batch_assignment prompt"""
+        employee_info = "\n".join([f"- id {emp['user_id']}: {emp['name']}, {emp['position']}, Score: {emp['score']}, Success Rate: {emp['success_rate']}%, Open Tasks: {emp['open_tasks']}" for emp in employees])
+        task_info = "\n".join([f"- task_id {task['id']}: {task['title']} (priority: {task['priority']}) {task['description'] or ''}" for task in tasks])
         
-        try:
-            contents = [types.Content(
-                role="user",
-                parts=[types.Part.from_text(text=prompt)]
-            )]
-            
-            response = ""
-            for chunk in self.client.models.generate_content_stream(
-                model=self.model,
-                contents=contents,
-                config=types.GenerateContentConfig()
-            ):
-                if chunk.text:  # Check if chunk.text is not None
-                    response += chunk.text
-            
-            return {"ai_response": response, "status": "success"}
-        except Exception as e:
-            return {"error": str(e), "status": "error"}
+        prompt = f"""
+        You are an AI project manager. Assign each of the following tasks to the most suitable employee:
+        
+        Tasks:
+        {task_info}
+        
+        Available Employees:
+        {employee_info}
+        
+        Consider:
+        1. Employee skills and experience
+        2. Current workload (open tasks, including the ones you assign in this answer)
+        3. Success rate history
+        4. Task complexity
+        
+        Respond with a JSON array containing one object per task and nothing else:
+        [
+            {{
+                "task_id": number,
+                "employee_id": number,
+                "reasoning": "explanation",
+                "difficulty_level": "easy|medium|hard",
+                "estimated_hours": number,
+                "risk_factors": ["factor1", "factor2"],
+                "success_probability": percentage
+            }}
+        ]
+        """
+        return prompt
     
-    def assess_task_risk(self, task_title: str, task_description: str, employee_profile: dict) -> dict:
-        """Assess risk factors for a task assignment"""
+    def generate_batch_assignment(self, tasks: list, employees: list, cache_tags: Iterable[str] = ()) -> dict:
+        """AI-powered assignment of several tasks against one employee roster"""
+        return self._generate("generate_batch_assignment", self.batch_assignment_prompt(tasks, employees), cache_tags)
+    
+    def task_risk_prompt(self, task_title: str, task_description: str, employee_profile: dict) -> str:
+        """Build the assess_task_risk prompt"""
         prompt = f"""
         Analyze the risk factors for this task assignment:
         
@@ -74,33 +151,20 @@ class AIService:
         Provide risk assessment (0.0 to 1.0) and recommendations:
         {{
             "risk_score": 0.0-1.0,
+            "difficulty_level": "easy|medium|hard",
             "risk_factors": ["factor1", "factor2"],
             "recommendations": ["rec1", "rec2"],
             "monitoring_points": ["point1", "point2"]
         }}
         """
-        
-        try:
-            contents = [types.Content(
-                role="user",
-                parts=[types.Part.from_text(text=prompt)]
-            )]
-            
-            response = ""
-            for chunk in self.client.models.generate_content_stream(
-                model=self.model,
-                contents=contents,
-                config=types.GenerateContentConfig()
-            ):
-                if chunk.text:  # Check if chunk.text is not None
-                    response += chunk.text
-            
-            return {"ai_response": response, "status": "success"}
-        except Exception as e:
-            return {"error": str(e), "status": "error"}
+        return prompt
     
-    def provide_status_feedback(self, task_title: str, status_report: str, progress: int) -> dict:
-        """Provide AI feedback on task status reports"""
+    def assess_task_risk(self, task_title: str, task_description: str, employee_profile: dict, cache_tags: Iterable[str] = ()) -> dict:
+        """Assess risk factors for a task assignment"""
+        return self._generate("assess_task_risk", self.task_risk_prompt(task_title, task_description, employee_profile), cache_tags)
+    
+    def status_feedback_prompt(self, task_title: str, status_report: str, progress: int) -> str:
+        """Build the provide_status_feedback prompt"""
         prompt = f"""
         Review this task status report and provide constructive feedback:
         
@@ -117,28 +181,14 @@ class AIService:
             "risk_level": "low|medium|high"
         }}
         """
-        
-        try:
-            contents = [types.Content(
-                role="user",
-                parts=[types.Part.from_text(text=prompt)]
-            )]
-            
-            response = ""
-            for chunk in self.client.models.generate_content_stream(
-                model=self.model,
-                contents=contents,
-                config=types.GenerateContentConfig()
-            ):
-                if chunk.text:  # Check if chunk.text is not None
-                    response += chunk.text
-            
-            return {"ai_response": response, "status": "success"}
-        except Exception as e:
-            return {"error": str(e), "status": "error"}
+        return prompt
     
-    def chat_assistant(self, user_message: str, user_role: str) -> dict:
-        """AI chat assistant for work-related queries"""
+    def provide_status_feedback(self, task_title: str, status_report: str, progress: int, cache_tags: Iterable[str] = ()) -> dict:
+        """Provide AI feedback on task status reports"""
+        return self._generate("provide_status_feedback", self.status_feedback_prompt(task_title, status_report, progress), cache_tags)
+    
+    def chat_prompt(self, user_message: str, user_role: str) -> str:
+        """Build the chat_assistant prompt"""
         context = f"""
         You are a helpful AI assistant for a project management system.
         User role: {user_role}
@@ -151,25 +201,11 @@ class AIService:
         
         User Question: {user_message}
         """
-        
-        try:
-            contents = [types.Content(
-                role="user",
-                parts=[types.Part.from_text(text=context)]
-            )]
-            
-            response = ""
-            for chunk in self.client.models.generate_content_stream(
-                model=self.model,
-                contents=contents,
-                config=types.GenerateContentConfig()
-            ):
-                if chunk.text:  # Check if chunk.text is not None
-                    response += chunk.text
-            
-            return {"ai_response": response, "status": "success"}
-        except Exception as e:
-            return {"error": str(e), "status": "error"}
+        return context
+    
+    def chat_assistant(self, user_message: str, user_role: str, cache_tags: Iterable[str] = ()) -> dict:
+        """AI chat assistant for work-related queries"""
+        return self._generate("chat_assistant", self.chat_prompt(user_message, user_role), cache_tags)
 
 # Global AI service instance
 ai_service = AIService()
\ No newline at end of file
@@ -0,0 +1,335 @@
+import asyncio
+import json
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import select, update, func, case, and_, literal, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.task import Task, TaskStatus, LeaveRequest
+from app.models.user import User, EmployeeProfile
+from app.services.ai_service import parse_json_response
+from app.services.async_ai_service import async_ai_service
+
+# Tasks still to be done; transferred ones are open work for their new assignee
+OPEN_STATUSES = (TaskStatus.PENDING.value, TaskStatus.IN_PROGRESS.value, TaskStatus.TRANSFERRED.value)
+
+# Shortlist ranking weights: a point of success rate, an open task and a
+# keyword of the task found in the employee's position
+SUCCESS_RATE_WEIGHT = 1.0
+OPEN_TASK_WEIGHT = 15.0
+POSITION_MATCH_WEIGHT = 25.0
+MAX_MATCH_KEYWORDS = 8
+# Availability window used for tasks without a due date
+DEFAULT_AVAILABILITY_DAYS = 7
+
+_STOPWORDS = {
+    "this", "that", "with", "from", "into", "have", "will", "should", "would", "task", "tasks",
+    "need", "needs", "make", "sure", "about", "their", "there", "which", "when", "what", "where"
+}
+
+def task_keywords(texts: Iterable[Optional[str]], limit: int = MAX_MATCH_KEYWORDS) -> List[str]:
+    """Distinct lowercase words (4+ letters, no stopwords) in order of appearance"""
+    words = re.findall(r"[a-z][a-z0-9+#]{3,}", " ".join(text or "" for text in texts).lower())
+    return [word for word in dict.fromkeys(words) if word not in _STOPWORDS][:limit]
+
+def _as_int(value) -> Optional[int]:
+    """Ids from model JSON may come back as numbers or numeric strings"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    return None
+
+class AssignmentService:
+    """AI task assignment against a locally ranked shortlist of employees.
+
+    Prompts never list the whole company. A SQL ranking stage (shortlist)
+    picks the top-k available candidates first. Batches send one shortlist
+    per chunk of tasks rather than once per task. Chunks run concurrently
+    through the async AI layer, which applies its own concurrency limit.
+    Valid assignments are written back with guarded executemany UPDATEs.
+    """
+
+    async def shortlist(self, db: AsyncSession, keywords: List[str], k: Optional[int] = None,
+                        available_from: Optional[datetime] = None,
+                        available_until: Optional[datetime] = None) -> List[Dict]:
+        """Top-k active employees for a task, ranked in SQL
+
+        The rank combines success rate, open workload (per-assignee aggregate
+        over ix_tasks_assigned_to_status) and keyword matches against the
+        position. Employees with approved leave overlapping the availability
+        window are excluded by one uncorrelated lookup on
+        ix_leave_requests_status_end_date. Only k rows
+        come back, whatever the headcount.
+        """
+        k = k or settings.ai_assignment_shortlist_size
+        available_from = available_from or datetime.utcnow()
+        available_until = available_until or available_from + timedelta(days=DEFAULT_AVAILABILITY_DAYS)
+
+        open_tasks = (
+            select(Task.assigned_to, func.count(Task.id).label("open_tasks"))
+            .filter(Task.assigned_to.is_not(None), Task.status.in_(OPEN_STATUSES))
+            .group_by(Task.assigned_to)
+            .subquery()
+        )
+        open_count = func.coalesce(open_tasks.c.open_tasks, 0)
+        position = func.lower(func.coalesce(EmployeeProfile.position, ""))
+        position_matches = sum(
+            (case((position.like(f"%{word}%"), 1), else_=0) for word in keywords), literal(0)
+        )
+        # Uncorrelated and NULL-free, as in TransferService.candidates: evaluated once
+        # on ix_leave_requests_status_end_date instead of once per employee
+        on_leave = (
+            select(LeaveRequest.employee_id)
+            .filter(
+                LeaveRequest.employee_id.is_not(None),
+                LeaveRequest.status == "approved",
+                LeaveRequest.end_date >= available_from,
+                LeaveRequest.start_date <= available_until
+            )
+        )
+        rank_score = (
+            func.coalesce(EmployeeProfile.success_rate, 0) * SUCCESS_RATE_WEIGHT
+            - open_count * OPEN_TASK_WEIGHT
+            + position_matches * POSITION_MATCH_WEIGHT
+        )
+
+        result = await db.execute(
+            select(EmployeeProfile, open_count, position_matches, rank_score)
+            .join(User, User.id == EmployeeProfile.user_id)
+            .outerjoin(open_tasks, open_tasks.c.assigned_to == EmployeeProfile.user_id)
+            .filter(User.is_active.is_not(False), EmployeeProfile.id.not_in(on_leave))
+            .order_by(rank_score.desc(), EmployeeProfile.user_id)
+            .limit(k)
+        )
+        return [
+            {
+                "user_id": emp.user_id,
+                "name": emp.name,
+                "position": emp.position,
+                "score": emp.score,
+                "success_rate": round(emp.success_rate or 0, 1),
+                "open_tasks": open_tasks_count,
+                "position_matches": matches,
+                "rank_score": round(float(score), 2)
+            }
+            for emp, open_tasks_count, matches, score in result.all()
+        ]
+
+    async def recommend(self, db: AsyncSession, task_id: int, k: Optional[int] = None, apply: bool = False) -> Dict:
+        """generate_task_assignment for one task against its top-k shortlist"""
+        task = await db.get(Task, task_id)
+        if task is None:
+            return {"status": "error", "error": "Task not found"}
+        # Finished tasks carry score for their assignee: moving them is a scoring change, not an assignment
+        if apply and task.status not in OPEN_STATUSES:
+            return {"status": "error", "error": f"Task is {task.status}"}
+
+        candidates = await self.shortlist(
+            db, task_keywords([task.title, task.description]), k, available_until=task.due_date
+        )
+        if not candidates:
+            return {"status": "error", "error": "No available employees", "candidates": []}
+
+        response = await async_ai_service.generate_task_assignment(
+            f"{task.title}\n{task.description or ''}".strip(), candidates, cache_tags=[f"task:{task_id}"]
+        )
+        if response.get("status") != "success":
+            return {**response, "candidates": candidates}
+        try:
+            item = parse_json_response(response["ai_response"])
+        except ValueError:
+            item = None
+        if not isinstance(item, dict):
+            return {"status": "error", "error": "Unparseable model response", "candidates": candidates}
+
+        employee_id = _as_int(item.get("recommended_employee_id"))
+        if employee_id is None:
+            by_name = {emp["name"].lower(): emp["user_id"] for emp in candidates}
+            employee_id = by_name.get(str(item.get("recommended_employee", "")).lower())
+        if employee_id not in {emp["user_id"] for emp in candidates}:
+            return {"status": "error", "error": "Model recommended someone outside the shortlist", "candidates": candidates}
+
+        values = self._task_values({**item, "employee_id": employee_id})
+        applied = False
+        if apply:
+            # Re-checked in the UPDATE: the task may have been finished during the model call
+            result = await db.execute(
+                update(Task)
+                .where(Task.id == task_id, Task.status.in_(OPEN_STATUSES))
+                .values(assigned_to=employee_id, updated_at=datetime.utcnow(), **values)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            applied = result.rowcount == 1
+        return {
+            "status": "success",
+            "task_id": task_id,
+            "employee_id": employee_id,
+            "applied": applied,
+            "estimated_hours": values.get("estimated_hours"),
+            "difficulty_level": values.get("ai_difficulty_assessment"),
+            "reasoning": values.get("ai_recommendations"),
+            "candidates": candidates,
+            "cached": response.get("cached", False)
+        }
+
+    async def assign_batch(self, db: AsyncSession, task_ids: List[int], chunk_size: Optional[int] = None,
+                           reassign: bool = False) -> Dict:
+        """Ask the model to assign the given tasks and write the results back in bulk"""
+        chunk_size = chunk_size or settings.ai_assignment_chunk_size
+        result = await db.execute(
+            select(Task.id, Task.title, Task.description, Task.priority, Task.assigned_to, Task.status, Task.due_date)
+            .filter(Task.id.in_(task_ids))
+        )
+        rows = {row.id: row for row in result.all()}
+
+        failed = []
+        tasks = []
+        for task_id in dict.fromkeys(task_ids):
+            row = rows.get(task_id)
+            if row is None:
+                failed.append({"task_id": task_id, "reason": "not found"})
+            elif row.status not in OPEN_STATUSES:
+                failed.append({"task_id": task_id, "reason": f"task is {row.status}"})
+            elif row.assigned_to is not None and not reassign:
+                failed.append({"task_id": task_id, "reason": "already assigned"})
+            else:
+                tasks.append({
+                    "id": row.id, "title": row.title, "description": row.description,
+                    "priority": row.priority, "due_date": row.due_date
+                })
+
+        chunks = [tasks[i:i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+        # Each chunk gets its own shortlist, with room for one candidate per task
+        rosters = []
+        for chunk in chunks:
+            due_dates = [task["due_date"] for task in chunk if task["due_date"]]
+            rosters.append(await self.shortlist(
+                db,
+                task_keywords([text for task in chunk for text in (task["title"], task["description"])]),
+                settings.ai_assignment_shortlist_size + len(chunk),
+                available_until=max(due_dates) if due_dates else None
+            ))
+
+        async def assign_chunk(chunk, roster):
+            if not roster:
+                return {"status": "error", "reason": "no_candidates", "error": "no available employees"}
+            prompt_tasks = [{key: value for key, value in task.items() if key != "due_date"} for task in chunk]
+            return await async_ai_service.generate_batch_assignment(
+                prompt_tasks, roster, cache_tags=[f"task:{task['id']}" for task in chunk]
+            )
+
+        responses = await asyncio.gather(*[assign_chunk(chunk, roster) for chunk, roster in zip(chunks, rosters)])
+
+        now = datetime.utcnow()
+        updates = []
+        assigned = []
+        for chunk, roster, response in zip(chunks, rosters, responses):
+            employee_ids = {emp["user_id"] for emp in roster}
+            parsed, error = self._parse_assignments(response)
+            for task in chunk:
+                item = parsed.get(task["id"]) if parsed else None
+                if item is None:
+                    failed.append({"task_id": task["id"], "reason": error or "missing from model response"})
+                    continue
+                employee_id = _as_int(item.get("employee_id"))
+                if employee_id not in employee_ids:
+                    failed.append({"task_id": task["id"], "reason": f"unknown employee {employee_id!r}"})
+                    continue
+
+                values = self._task_values(item)
+                updates.append({"id": task["id"], "assigned_to": employee_id, "updated_at": now, **values})
+                assigned.append({
+                    "task_id": task["id"],
+                    "employee_id": employee_id,
+                    "estimated_hours": values.get("estimated_hours"),
+                    "difficulty_level": values.get("ai_difficulty_assessment")
+                })
+
+        skipped = []
+        if updates:
+            written = await self._write_assignments(db, updates, reassign, now)
+            await db.commit()
+            skipped = [
+                {"task_id": item["task_id"], "reason": "task changed during the model call"}
+                for item in assigned if item["task_id"] not in written
+            ]
+            assigned = [item for item in assigned if item["task_id"] in written]
+
+        return {
+            "assigned": assigned,
+            "failed": failed,
+            "skipped": skipped,
+            "model_calls": sum(1 for response in responses if response.get("status") == "success" and not response.get("cached")),
+            "cached_calls": sum(1 for response in responses if response.get("cached"))
+        }
+
+    async def _write_assignments(self, db: AsyncSession, updates: List[Dict], reassign: bool,
+                                 now: datetime) -> set:
+        """Guarded executemany UPDATEs; returns the ids actually written (caller commits)
+
+        The tasks were read before the model call. Rows finished or assigned
+        since then no longer match the WHERE clause and are left alone.
+        """
+        table = Task.__table__
+        # Fixed binds, not an expanding IN list, which executemany cannot take
+        guard = [table.c.id == bindparam("task_id"), table.c.status.in_([literal(status) for status in OPEN_STATUSES])]
+        if not reassign:
+            guard.append(table.c.assigned_to.is_(None))
+        # One executemany per set of returned fields: every row in a call needs the same keys
+        by_fields: Dict[tuple, List[Dict]] = {}
+        for row in updates:
+            params = {("task_id" if key == "id" else key): value for key, value in row.items()}
+            by_fields.setdefault(tuple(sorted(params)), []).append(params)
+        for rows in by_fields.values():
+            await db.execute(update(table).where(*guard), rows)
+
+        # updated_at = now only on rows this call wrote (the transaction is still open)
+        result = await db.execute(
+            select(Task.id).filter(Task.id.in_([row["id"] for row in updates]), Task.updated_at == now)
+        )
+        return set(result.scalars().all())
+
+    def _parse_assignments(self, response: Dict):
+        """Map task_id -> assignment object, or (None, reason) when the chunk failed"""
+        if response.get("status") != "success":
+            return None, f"AI error ({response.get('reason', 'error')}): {response.get('error')}"
+        try:
+            items = parse_json_response(response["ai_response"])
+        except ValueError:
+            return None, "unparseable model response"
+        if isinstance(items, dict):
+            items = items.get("assignments", [items])
+        parsed = {}
+        for item in items if isinstance(items, list) else []:
+            if isinstance(item, dict) and _as_int(item.get("task_id")) is not None:
+                parsed[_as_int(item["task_id"])] = item
+        return parsed, None
+
+    def _task_values(self, item: Dict) -> Dict:
+        """Task columns from one model assignment
+
+        Only fields the model returned in a usable form are included, so a
+        sparse answer never blanks values the task already has.
+        """
+        values = {}
+        hours = item.get("estimated_hours")
+        if isinstance(hours, (int, float)) and not isinstance(hours, bool):
+            values["estimated_hours"] = float(hours)
+        probability = item.get("success_probability")
+        if isinstance(probability, (int, float)) and not isinstance(probability, bool):
+            values["risk_factor"] = round(1 - min(max(float(probability), 0), 100) / 100, 2)
+        if item.get("difficulty_level") is not None:
+            values["ai_difficulty_assessment"] = item["difficulty_level"]
+        if isinstance(item.get("risk_factors"), list):
+            values["ai_risk_factors"] = json.dumps(item["risk_factors"])
+        if item.get("reasoning") is not None:
+            values["ai_recommendations"] = item["reasoning"]
+        return values
+
+# Global assignment service instance
+assignment_service = AssignmentService()
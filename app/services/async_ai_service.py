@@ -0,0 +1,285 @@
+import asyncio
+import concurrent.futures
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterable, Optional, Tuple
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.config import settings
+from app.core.single_flight import SingleFlight
+from app.services.ai_cache import ai_cache
+from app.services.ai_service import AIService, ai_service
+
+def _is_upstream_failure(exc: Exception) -> bool:
+    """Whether an error means the model service is unhealthy rather than the request being bad"""
+    code = getattr(exc, "code", None)
+    if isinstance(code, int) and 400 <= code < 500 and code not in (408, 429):
+        return False
+    return True
+
+# Chunks buffered between the model thread and a slow streaming client; when
+# full the thread stops reading from upstream until the client catches up
+STREAM_BUFFER_CHUNKS = 16
+
+# How often a model thread blocked on a full buffer checks whether the client left
+STREAM_CANCEL_POLL_SECONDS = 0.25
+
+def _error(reason: str, message: str) -> dict:
+    return {"error": message, "status": "error", "reason": reason}
+
+class AsyncAIService:
+    """Runs AIService generations without blocking the event loop.
+
+    Each model gets a bounded thread pool, a semaphore, and a circuit breaker.
+    A call first waits for a semaphore slot, then streams in the pool, all
+    within one deadline. A slot is released only when its thread has really
+    finished, so timed-out generations still count against the limit until
+    they stop at their next chunk.
+
+    Failures are returned with a ``reason``:
+    - ``overloaded``: no slot within the deadline
+    - ``circuit_open``: the model is failing, so the call fails fast
+    - ``timeout``: the deadline passed mid-generation
+    - ``upstream``: a 5xx, 408, 429 or connection error
+    - ``rejected``: any other 4xx
+
+    Only ``timeout`` and ``upstream`` count towards opening the circuit.
+
+    Concurrent calls with the same cache key are coalesced: only the first
+    one reaches the model, and the others receive its result marked
+    ``coalesced``.
+    """
+
+    def __init__(self, service: AIService, max_concurrency: int, timeout_seconds: float,
+                 failure_threshold: int, reset_seconds: float):
+        self.service = service
+        self.max_concurrency = max_concurrency
+        self.timeout_seconds = timeout_seconds
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._single_flight = SingleFlight()
+
+    def _lane(self, model: str):
+        # Pools are created on first use so a preloading master never starts threads
+        with self._lock:
+            if model not in self._executors:
+                self._executors[model] = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix=f"ai-{model}"
+                )
+                self._semaphores[model] = asyncio.Semaphore(self.max_concurrency)
+                self._breakers[model] = CircuitBreaker(self.failure_threshold, self.reset_seconds)
+                self._in_flight[model] = 0
+            return self._executors[model], self._semaphores[model], self._breakers[model]
+
+    def breaker(self, model: Optional[str] = None) -> CircuitBreaker:
+        return self._lane(model or self.service.model)[2]
+
+    async def _run(self, method: str, prompt: str, cache_tags: Iterable[str] = (),
+                   timeout: Optional[float] = None) -> dict:
+        model = self.service.model
+        key = ai_cache.make_key(model, method, prompt)
+        cached = await ai_cache.aget(key)
+        if cached is not None:
+            return {"ai_response": cached, "status": "success", "cached": True}
+
+        # Identical prompts already in flight in this worker share one model call
+        result, shared = await self._single_flight.do(
+            key, lambda: self._call_model(model, method, prompt, key, cache_tags, timeout)
+        )
+        return {**result, "coalesced": True} if shared else result
+
+    async def _call_model(self, model: str, method: str, prompt: str, key: str,
+                          cache_tags: Iterable[str], timeout: Optional[float]) -> dict:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout or self.timeout_seconds)
+        lane, error = await self._acquire(model, loop, deadline)
+        if error:
+            return error
+        executor, semaphore, breaker = lane
+
+        cancel = threading.Event()
+        future = self._submit(model, loop, executor, semaphore, self._complete, prompt, cancel)
+        try:
+            response = await asyncio.wait_for(asyncio.shield(future), max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            cancel.set()
+            breaker.record_failure()
+            return _error("timeout", f"{model} did not finish within the deadline")
+        except asyncio.CancelledError:
+            # Every caller went away (e.g. client disconnect): stop streaming, no verdict on upstream
+            cancel.set()
+            breaker.abandon()
+            raise
+        except Exception as e:
+            if _is_upstream_failure(e):
+                breaker.record_failure()
+                return _error("upstream", str(e))
+            breaker.record_success()
+            return _error("rejected", str(e))
+
+        breaker.record_success()
+        await ai_cache.aset(key, model, method, response, cache_tags)
+        return {"ai_response": response, "status": "success", "cached": False}
+
+    async def _acquire(self, model: str, loop, deadline: float):
+        """Wait for a slot and pass the breaker; returns (lane, None) or (None, error)"""
+        executor, semaphore, breaker = self._lane(model)
+        try:
+            await asyncio.wait_for(semaphore.acquire(), max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            return None, _error("overloaded", f"No capacity for {model} within the deadline")
+
+        if not breaker.allow():
+            semaphore.release()
+            return None, _error("circuit_open", f"{model} is failing; not calling it until the circuit resets")
+        return (executor, semaphore, breaker), None
+
+    def _submit(self, model: str, loop, executor, semaphore, func, *args) -> asyncio.Future:
+        """Run func in the model's pool, holding the slot until the thread finishes"""
+        self._in_flight[model] += 1
+        future = loop.run_in_executor(executor, func, *args)
+
+        def _finished(done):
+            self._in_flight[model] -= 1
+            semaphore.release()
+            if not done.cancelled():
+                done.exception()  # mark retrieved when nobody awaits it after a timeout
+        future.add_done_callback(_finished)
+        return future
+
+    def _complete(self, prompt: str, cancel: threading.Event) -> str:
+        return "".join(self.service.stream(prompt, cancel))
+
+    async def generate_task_assignment(self, task_description: str, employees: list,
+                                       cache_tags: Iterable[str] = (), timeout: Optional[float] = None) -> dict:
+        prompt = self.service.task_assignment_prompt(task_description, employees)
+        return await self._run("generate_task_assignment", prompt, cache_tags, timeout)
+
+    async def generate_batch_assignment(self, tasks: list, employees: list,
+                                        cache_tags: Iterable[str] = (), timeout: Optional[float] = None) -> dict:
+        prompt = self.service.batch_assignment_prompt(tasks, employees)
+        return await self._run("generate_batch_assignment", prompt, cache_tags, timeout)
+
+    async def assess_task_risk(self, task_title: str, task_description: str, employee_profile: dict,
+                               cache_tags: Iterable[str] = (), timeout: Optional[float] = None) -> dict:
+        prompt = self.service.task_risk_prompt(task_title, task_description, employee_profile)
+        return await self._run("assess_task_risk", prompt, cache_tags, timeout)
+
+    async def provide_status_feedback(self, task_title: str, status_report: str, progress: int,
+                                      cache_tags: Iterable[str] = (), timeout: Optional[float] = None) -> dict:
+        prompt = self.service.status_feedback_prompt(task_title, status_report, progress)
+        return await self._run("provide_status_feedback", prompt, cache_tags, timeout)
+
+    async def chat_assistant(self, user_message: str, user_role: str,
+                             cache_tags: Iterable[str] = (), timeout: Optional[float] = None) -> dict:
+        prompt = self.service.chat_prompt(user_message, user_role)
+        return await self._run("chat_assistant", prompt, cache_tags, timeout)
+
+    async def stream_chat(self, user_message: str, user_role: str,
+                          timeout: Optional[float] = None) -> AsyncIterator[Tuple[str, dict]]:
+        """Yield ("chunk", {"text"}) events as the model produces them, then one "done" or "error" event
+
+        ``timeout`` bounds the wait for a slot and the gap between chunks,
+        not the whole generation. Closing the generator early (the client
+        disconnected) stops the model thread at its next chunk.
+        """
+        model = self.service.model
+        method = "chat_assistant"
+        prompt = self.service.chat_prompt(user_message, user_role)
+        key = ai_cache.make_key(model, method, prompt)
+        cached = await ai_cache.aget(key)
+        if cached is not None:
+            yield "chunk", {"text": cached}
+            yield "done", {"cached": True}
+            return
+
+        loop = asyncio.get_running_loop()
+        timeout = timeout or self.timeout_seconds
+        lane, error = await self._acquire(model, loop, loop.time() + timeout)
+        if error:
+            yield "error", error
+            return
+        executor, semaphore, breaker = lane
+
+        cancel = threading.Event()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_BUFFER_CHUNKS)
+        self._submit(model, loop, executor, semaphore, self._produce, prompt, cancel, loop, queue)
+        settled = False
+        try:
+            while True:
+                try:
+                    kind, value = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    settled = True
+                    breaker.record_failure()
+                    yield "error", _error("timeout", f"{model} sent nothing for {timeout}s")
+                    return
+                if kind == "chunk":
+                    yield "chunk", {"text": value}
+                    continue
+                settled = True
+                if kind == "done":
+                    breaker.record_success()
+                    await ai_cache.aset(key, model, method, value)
+                    yield "done", {"cached": False}
+                elif _is_upstream_failure(value):
+                    breaker.record_failure()
+                    yield "error", _error("upstream", str(value))
+                else:
+                    breaker.record_success()
+                    yield "error", _error("rejected", str(value))
+                return
+        finally:
+            cancel.set()
+            if not settled:
+                breaker.abandon()
+
+    def _produce(self, prompt: str, cancel: threading.Event, loop, queue: asyncio.Queue):
+        """Model thread side of stream_chat: blocks while the buffer is full"""
+        def put(item) -> bool:
+            # One put per item, waited on until it lands: cancelling a timed-out
+            # put and retrying could deliver the item twice if it landed meanwhile
+            future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+            while True:
+                try:
+                    future.result(timeout=STREAM_CANCEL_POLL_SECONDS)
+                    return True
+                except concurrent.futures.TimeoutError:
+                    if cancel.is_set():
+                        future.cancel()
+                        return False
+                except concurrent.futures.CancelledError:
+                    return False
+
+        chunks = []
+        try:
+            for text in self.service.stream(prompt, cancel):
+                chunks.append(text)
+                if not put(("chunk", text)):
+                    return
+            if not cancel.is_set():
+                put(("done", "".join(chunks)))
+        except Exception as e:
+            put(("error", e))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            models = {
+                model: {"in_flight": self._in_flight[model], "circuit": breaker.stats()}
+                for model, breaker in self._breakers.items()
+            }
+        # coalesced = model calls saved by sharing an identical in-flight request
+        return {"backend": self.service.backend.name, "models": models, "single_flight": self._single_flight.stats()}
+
+# Global async AI service instance
+async_ai_service = AsyncAIService(
+    service=ai_service,
+    max_concurrency=settings.ai_max_concurrency,
+    timeout_seconds=settings.ai_timeout_seconds,
+    failure_threshold=settings.ai_circuit_failure_threshold,
+    reset_seconds=settings.ai_circuit_reset_seconds
+)
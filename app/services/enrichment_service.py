@@ -0,0 +1,132 @@
+import json
+from typing import Dict, List, Optional
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.job import BackgroundJob, JobKind
+from app.models.task import Task, TaskStatusReport
+from app.models.user import EmployeeProfile
+from app.services.ai_cache import ai_cache
+from app.services.ai_service import ai_service, parse_json_response
+from app.services.async_ai_service import async_ai_service
+from app.services.job_queue import job_queue, PermanentJobError
+
+class EnrichmentService:
+    """Fills the ai_* columns of tasks and status reports (run by the job worker).
+
+    Results are written with Core UPDATEs so the ORM flush listeners do not
+    immediately invalidate the AI responses that were just cached.
+    """
+
+    def enabled(self) -> bool:
+        return settings.ai_enrichment_enabled and ai_service.configured()
+
+    async def enqueue_task(self, db: AsyncSession, task_id: int) -> Optional[BackgroundJob]:
+        """Queue enrichment of a task in the caller's transaction (None when disabled)"""
+        if not self.enabled():
+            return None
+        return await job_queue.enqueue(db, JobKind.ENRICH_TASK.value, task_id)
+
+    async def enqueue_tasks(self, db: AsyncSession, task_ids: List[int]) -> Dict[int, int]:
+        """Queue enrichment of many tasks in the caller's transaction ({task_id: job_id})"""
+        if not self.enabled():
+            return {}
+        return await job_queue.enqueue_many(db, JobKind.ENRICH_TASK.value, task_ids)
+
+    async def enqueue_report(self, db: AsyncSession, report_id: int) -> Optional[BackgroundJob]:
+        """Queue AI feedback for a status report in the caller's transaction (None when disabled)"""
+        if not self.enabled():
+            return None
+        return await job_queue.enqueue(db, JobKind.ENRICH_REPORT.value, report_id)
+
+    async def run(self, db: AsyncSession, kind: str, entity_id: int):
+        if kind == JobKind.ENRICH_TASK.value:
+            await self.enrich_task(db, entity_id)
+        elif kind == JobKind.ENRICH_REPORT.value:
+            await self.enrich_report(db, entity_id)
+        else:
+            raise PermanentJobError(f"Unknown job kind {kind!r}")
+
+    async def enrich_task(self, db: AsyncSession, task_id: int):
+        """Risk assessment for a task against its assignee (if any)"""
+        task = await db.get(Task, task_id)
+        if task is None:
+            raise PermanentJobError(f"Task {task_id} no longer exists")
+
+        profile = {}
+        if task.assigned_to is not None:
+            result = await db.execute(select(EmployeeProfile).filter(EmployeeProfile.user_id == task.assigned_to))
+            emp = result.scalars().first()
+            if emp:
+                profile = {
+                    "name": emp.name,
+                    "position": emp.position,
+                    "success_rate": emp.success_rate,
+                    "tasks_completed": emp.tasks_completed
+                }
+
+        tags = [f"task:{task_id}"] + ([f"employee:{task.assigned_to}"] if task.assigned_to else [])
+        response = await async_ai_service.assess_task_risk(task.title, task.description or "", profile, cache_tags=tags)
+        assessment = self._parse(response, f"task:{task_id}")
+
+        # Only what the model returned in a usable form: a sparse answer keeps the stored values
+        values = {}
+        risk_score = assessment.get("risk_score")
+        if isinstance(risk_score, (int, float)) and not isinstance(risk_score, bool):
+            values["risk_factor"] = min(max(float(risk_score), 0.0), 1.0)
+        if assessment.get("difficulty_level") is not None:
+            values["ai_difficulty_assessment"] = assessment["difficulty_level"]
+        if isinstance(assessment.get("risk_factors"), list):
+            values["ai_risk_factors"] = json.dumps(assessment["risk_factors"])
+        if isinstance(assessment.get("recommendations"), list):
+            values["ai_recommendations"] = json.dumps(assessment["recommendations"])
+        if not values:
+            return
+        await db.execute(
+            update(Task)
+            .where(Task.id == task_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+    async def enrich_report(self, db: AsyncSession, report_id: int):
+        """AI feedback on a status report"""
+        report = await db.get(TaskStatusReport, report_id)
+        if report is None:
+            raise PermanentJobError(f"Status report {report_id} no longer exists")
+        task = await db.get(Task, report.task_id)
+        if task is None:
+            raise PermanentJobError(f"Task {report.task_id} no longer exists")
+
+        response = await async_ai_service.provide_status_feedback(
+            task.title, report.report_text or "", report.progress_percentage or 0, cache_tags=[f"task:{task.id}"]
+        )
+        feedback = self._parse(response, f"task:{task.id}")
+        await db.execute(
+            update(TaskStatusReport)
+            .where(TaskStatusReport.id == report_id)
+            .values(ai_feedback=json.dumps(feedback))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+    def _parse(self, response: Dict, cache_tag: str) -> Dict:
+        """JSON object from a model response; raises so the job is retried or failed"""
+        if response.get("status") != "success":
+            error = f"AI error ({response.get('reason', 'error')}): {response.get('error')}"
+            if response.get("reason") == "rejected":
+                raise PermanentJobError(error)
+            raise RuntimeError(error)
+        try:
+            parsed = parse_json_response(response["ai_response"])
+        except ValueError:
+            parsed = None
+        if not isinstance(parsed, dict):
+            # Drop the cached reply so the retry asks the model again
+            ai_cache.invalidate_soon(cache_tag)
+            raise RuntimeError("Model response is not a JSON object")
+        return parsed
+
+# Global enrichment service instance
+enrichment_service = EnrichmentService()
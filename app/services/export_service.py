@@ -0,0 +1,59 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Sequence
+from sqlalchemy import Select
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+class ExportService:
+    """Streams query results as NDJSON or CSV with bounded memory.
+
+    Rows are read through a server-side cursor ``batch_size`` at a time
+    (``yield_per``) as plain Core tuples, never ORM objects or Pydantic
+    models. Each batch is serialized into one text chunk and handed to
+    the response before the next one is fetched, so an export of any size
+    holds at most one batch.
+    """
+
+    def __init__(self, batch_size: int = None):
+        self.batch_size = batch_size or settings.export_batch_size
+
+    async def stream(self, statement: Select, export_format: str) -> AsyncIterator[str]:
+        """Serialized chunks for ``statement``; column labels become the keys / CSV header"""
+        # Own session: the request's session may be closed before the body is sent
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(statement.execution_options(yield_per=self.batch_size))
+            columns = list(result.keys())
+            if export_format == "csv":
+                yield self._csv_chunk([columns])
+            async for rows in result.partitions():
+                if export_format == "csv":
+                    yield self._csv_chunk(rows)
+                else:
+                    yield self._ndjson_chunk(columns, rows)
+
+    def _ndjson_chunk(self, columns: Sequence[str], rows) -> str:
+        return "".join(
+            json.dumps({column: _json_value(value) for column, value in zip(columns, row)}) + "\n"
+            for row in rows
+        )
+
+    def _csv_chunk(self, rows) -> str:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([_csv_value(value) for value in row])
+        return buffer.getvalue()
+
+# Global export service instance
+export_service = ExportService()
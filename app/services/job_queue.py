@@ -0,0 +1,212 @@
+import os
+import random
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import select, insert, update, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.job import BackgroundJob, JobStatus
+
+class PermanentJobError(Exception):
+    """A job failure that retrying cannot fix (e.g. the entity was deleted)"""
+
+class JobQueue:
+    """Durable job queue stored in the application database.
+
+    Jobs are enqueued inside the caller's transaction, so a job exists if
+    and only if the row it enriches was committed. Workers claim a job
+    with a single UPDATE ... RETURNING that also takes a lease. A job whose
+    worker died becomes claimable again once its lease expires, unless that
+    was its last attempt, in which case it is marked failed. Failed
+    attempts are retried with exponential backoff and jitter until
+    ``max_attempts`` is reached.
+
+    Each claim gets its own lease token in ``locked_by``. complete and fail
+    only apply while that lease is current, so a worker whose lease expired
+    cannot overwrite the outcome of the worker that reclaimed the job.
+    """
+
+    def __init__(self, max_attempts: int, retry_base_seconds: float, lease_seconds: int):
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.lease_seconds = lease_seconds
+
+    async def enqueue(self, db: AsyncSession, kind: str, entity_id: int) -> BackgroundJob:
+        """Queue a job, reusing a queued job for the same entity (caller commits)"""
+        result = await db.execute(
+            select(BackgroundJob).filter(
+                BackgroundJob.kind == kind,
+                BackgroundJob.entity_id == entity_id,
+                BackgroundJob.status == JobStatus.QUEUED.value
+            ).limit(1)
+        )
+        job = result.scalars().first()
+        if job is not None:
+            return job
+
+        job = BackgroundJob(
+            kind=kind,
+            entity_id=entity_id,
+            status=JobStatus.QUEUED.value,
+            attempts=0,
+            max_attempts=self.max_attempts,
+            run_at=datetime.utcnow()
+        )
+        db.add(job)
+        await db.flush()
+        return job
+
+    async def enqueue_many(self, db: AsyncSession, kind: str, entity_ids: List[int]) -> Dict[int, int]:
+        """enqueue for many entities in two statements; returns {entity_id: job_id} (caller commits)"""
+        if not entity_ids:
+            return {}
+        result = await db.execute(
+            select(BackgroundJob.entity_id, BackgroundJob.id).filter(
+                BackgroundJob.kind == kind,
+                BackgroundJob.entity_id.in_(entity_ids),
+                BackgroundJob.status == JobStatus.QUEUED.value
+            )
+        )
+        jobs = dict(result.all())
+
+        now = datetime.utcnow()
+        missing = [entity_id for entity_id in dict.fromkeys(entity_ids) if entity_id not in jobs]
+        if missing:
+            result = await db.execute(
+                insert(BackgroundJob).returning(BackgroundJob.entity_id, BackgroundJob.id),
+                [
+                    {
+                        "kind": kind,
+                        "entity_id": entity_id,
+                        "status": JobStatus.QUEUED.value,
+                        "attempts": 0,
+                        "max_attempts": self.max_attempts,
+                        "run_at": now
+                    }
+                    for entity_id in missing
+                ]
+            )
+            jobs.update(result.all())
+        return jobs
+
+    def _claimable(self, now: datetime):
+        return or_(
+            and_(BackgroundJob.status == JobStatus.QUEUED.value, BackgroundJob.run_at <= now),
+            and_(
+                BackgroundJob.status == JobStatus.RUNNING.value,
+                BackgroundJob.locked_until < now,
+                BackgroundJob.attempts < BackgroundJob.max_attempts
+            )
+        )
+
+    async def claim(self, db: AsyncSession) -> Optional[Dict]:
+        """Lease the next due job, or None when nothing is due"""
+        now = datetime.utcnow()
+        # A job that kept killing its worker never reaches fail(): give up on it here
+        await db.execute(
+            update(BackgroundJob)
+            .where(
+                BackgroundJob.status == JobStatus.RUNNING.value,
+                BackgroundJob.locked_until < now,
+                BackgroundJob.attempts >= BackgroundJob.max_attempts
+            )
+            .values(
+                status=JobStatus.FAILED.value,
+                locked_until=None,
+                locked_by=None,
+                last_error="Lease expired on the last attempt (worker died or hung)",
+                finished_at=now,
+                updated_at=now
+            )
+            .execution_options(synchronize_session=False)
+        )
+        next_job = (
+            select(BackgroundJob.id)
+            .filter(self._claimable(now))
+            .order_by(BackgroundJob.run_at)
+            .limit(1)
+            .scalar_subquery()
+        )
+        lease = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:12]}"[-64:]
+        # Re-checking the claimable condition makes a lost race update zero rows
+        result = await db.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == next_job, self._claimable(now))
+            .values(
+                status=JobStatus.RUNNING.value,
+                attempts=BackgroundJob.attempts + 1,
+                locked_until=now + timedelta(seconds=self.lease_seconds),
+                locked_by=lease,
+                updated_at=now
+            )
+            .returning(BackgroundJob.id, BackgroundJob.kind, BackgroundJob.entity_id,
+                       BackgroundJob.attempts, BackgroundJob.max_attempts, BackgroundJob.locked_by)
+            .execution_options(synchronize_session=False)
+        )
+        row = result.first()
+        await db.commit()
+        return dict(row._mapping) if row else None
+
+    def _leased(self, job: Dict):
+        """The job is still running under the caller's lease"""
+        return and_(
+            BackgroundJob.id == job["id"],
+            BackgroundJob.status == JobStatus.RUNNING.value,
+            BackgroundJob.locked_by == job["locked_by"]
+        )
+
+    async def complete(self, db: AsyncSession, job: Dict) -> bool:
+        """Mark a claimed job succeeded; False when the lease was lost to another worker"""
+        now = datetime.utcnow()
+        result = await db.execute(
+            update(BackgroundJob)
+            .where(self._leased(job))
+            .values(status=JobStatus.SUCCEEDED.value, locked_until=None, locked_by=None, last_error=None,
+                    finished_at=now, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount == 1
+
+    async def fail(self, db: AsyncSession, job: Dict, error: str, permanent: bool = False) -> Optional[str]:
+        """Record a failed attempt; reschedules with backoff unless out of attempts
+
+        Returns the new status, or None when the lease was lost to another worker.
+        """
+        now = datetime.utcnow()
+        if permanent or job["attempts"] >= job["max_attempts"]:
+            values = {"status": JobStatus.FAILED.value, "finished_at": now}
+        else:
+            delay = self.retry_base_seconds * 2 ** (job["attempts"] - 1)
+            delay *= random.uniform(0.8, 1.2)  # jitter so failed jobs do not retry in lockstep
+            values = {"status": JobStatus.QUEUED.value, "run_at": now + timedelta(seconds=delay)}
+        result = await db.execute(
+            update(BackgroundJob)
+            .where(self._leased(job))
+            .values(locked_until=None, locked_by=None, last_error=error[:2000], updated_at=now, **values)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return values["status"] if result.rowcount == 1 else None
+
+    async def get(self, db: AsyncSession, job_id: int) -> Optional[BackgroundJob]:
+        return await db.get(BackgroundJob, job_id)
+
+    async def for_entity(self, db: AsyncSession, kind: str, entity_id: int, limit: int = 10) -> List[BackgroundJob]:
+        """Most recent jobs for an entity"""
+        result = await db.execute(
+            select(BackgroundJob)
+            .filter(BackgroundJob.kind == kind, BackgroundJob.entity_id == entity_id)
+            .order_by(BackgroundJob.id.desc())
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+# Global job queue instance
+job_queue = JobQueue(
+    max_attempts=settings.job_max_attempts,
+    retry_base_seconds=settings.job_retry_base_seconds,
+    lease_seconds=settings.job_lease_seconds
+)
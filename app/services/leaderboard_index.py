@@ -0,0 +1,87 @@
+import bisect
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.user import EmployeeProfile
+
+class LeaderboardIndex:
+    """In-memory ranked index of employee profiles.
+
+    Profiles are kept as a sorted list of ``(-score, profile_id)`` keys, so
+    rank lookups and page starts are a bisect (O(log n)) and neighbours are a
+    slice. Score changes made through ScoringService in this worker are
+    applied in place; the whole index is rebuilt from the database after
+    ``leaderboard_refresh_seconds`` to pick up writes from other workers.
+    """
+
+    def __init__(self, refresh_seconds: int):
+        self.refresh_seconds = refresh_seconds
+        self._keys: List[Tuple[int, int]] = []
+        self._key_by_profile: Dict[int, Tuple[int, int]] = {}
+        self._profile_by_user: Dict[int, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    async def ensure_fresh(self, db: AsyncSession):
+        """Rebuild the index if it was never loaded, invalidated or is stale"""
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+            return
+        await self.rebuild(db)
+
+    async def rebuild(self, db: AsyncSession):
+        result = await db.execute(select(EmployeeProfile.id, EmployeeProfile.user_id, EmployeeProfile.score))
+        rows = result.all()
+        keys = sorted((-(score or 0), profile_id) for profile_id, _, score in rows)
+        with self._lock:
+            self._keys = keys
+            self._key_by_profile = {key[1]: key for key in keys}
+            self._profile_by_user = {user_id: profile_id for profile_id, user_id, _ in rows}
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        """Force a rebuild on the next read (e.g. after a bulk recalculation)"""
+        self._loaded_at = None
+
+    def update(self, profile_id: int, user_id: int, score: int):
+        """Move one profile to its new score"""
+        if self._loaded_at is None:
+            return
+        key = (-(score or 0), profile_id)
+        with self._lock:
+            old_key = self._key_by_profile.get(profile_id)
+            if old_key == key:
+                return
+            if old_key is not None:
+                del self._keys[bisect.bisect_left(self._keys, old_key)]
+            bisect.insort(self._keys, key)
+            self._key_by_profile[profile_id] = key
+            self._profile_by_user[user_id] = profile_id
+
+    def __len__(self):
+        return len(self._keys)
+
+    def rank_of_user(self, user_id: int) -> Optional[int]:
+        """1-based rank of an employee by user id, None if unknown"""
+        with self._lock:
+            profile_id = self._profile_by_user.get(user_id)
+            if profile_id is None:
+                return None
+            return bisect.bisect_left(self._keys, self._key_by_profile[profile_id]) + 1
+
+    def slice(self, start_rank: int, count: int) -> List[Tuple[int, int, int]]:
+        """(rank, profile_id, score) for count entries starting at start_rank"""
+        start = max(start_rank, 1) - 1
+        with self._lock:
+            keys = self._keys[start:start + count]
+        return [(start + i + 1, profile_id, -neg_score) for i, (neg_score, profile_id) in enumerate(keys)]
+
+    def rank_after(self, score: int, profile_id: int) -> int:
+        """Rank of the first entry strictly after the (score, profile_id) cursor"""
+        with self._lock:
+            return bisect.bisect_right(self._keys, (-score, profile_id)) + 1
+
+# Global leaderboard index instance
+leaderboard_index = LeaderboardIndex(refresh_seconds=settings.leaderboard_refresh_seconds)
@@ -0,0 +1,168 @@
+import bisect
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.task import LeaveRequest
+from app.models.user import EmployeeProfile
+
+# Leave that makes someone unavailable; rejected requests are ignored
+BLOCKING_STATUSES = ("approved", "pending")
+
+class LeaveInterval(NamedTuple):
+    start: datetime
+    end: datetime
+    leave_request_id: int
+    employee_id: int  # employee_profiles.id
+    user_id: int
+    status: str
+
+def naive_utc(value: datetime) -> datetime:
+    """Leave dates are stored as naive UTC; normalise aware input to match"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+class LeaveIndex:
+    """In-memory interval index of approved and pending leave.
+
+    Intervals are sorted by start date, and a max-end segment tree is kept
+    over them. An overlap query bisects to the last interval starting before
+    the window ends. It then descends the tree, skipping every subtree whose
+    latest end is before the window starts. That costs O(log n + k) for k
+    matches, however much leave history there is.
+
+    Only leave ending within ``leave_index_lookback_days`` is held. Windows
+    starting earlier than that fall back to SQL over
+    ix_leave_requests_status_end_date. Changes made in this worker
+    invalidate the index straight away. Writes from other workers are picked
+    up after ``leave_index_refresh_seconds``.
+    """
+
+    def __init__(self, refresh_seconds: int, lookback_days: int):
+        self.refresh_seconds = refresh_seconds
+        self.lookback_days = lookback_days
+        self._intervals: List[LeaveInterval] = []
+        self._starts: List[datetime] = []
+        self._max_end: List[datetime] = []
+        self._size = 0
+        self._horizon: Optional[datetime] = None
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    async def ensure_fresh(self, db: AsyncSession):
+        """Rebuild the index if it was never loaded, invalidated or is stale"""
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+            return
+        await self.rebuild(db)
+
+    async def rebuild(self, db: AsyncSession):
+        horizon = datetime.utcnow() - timedelta(days=self.lookback_days)
+        result = await db.execute(
+            self._interval_query().filter(LeaveRequest.end_date >= horizon)
+        )
+        intervals = sorted(LeaveInterval(*row) for row in result.all())
+
+        size = 1
+        while size < len(intervals):
+            size *= 2
+        max_end = [datetime.min] * (2 * size)
+        for i, interval in enumerate(intervals):
+            max_end[size + i] = interval.end
+        for node in range(size - 1, 0, -1):
+            max_end[node] = max(max_end[2 * node], max_end[2 * node + 1])
+
+        with self._lock:
+            self._intervals = intervals
+            self._starts = [interval.start for interval in intervals]
+            self._max_end = max_end
+            self._size = size
+            self._horizon = horizon
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        """Force a rebuild on the next read (after a leave request is created or decided)"""
+        self._loaded_at = None
+
+    def _interval_query(self):
+        return (
+            select(
+                LeaveRequest.start_date, LeaveRequest.end_date, LeaveRequest.id,
+                LeaveRequest.employee_id, EmployeeProfile.user_id, LeaveRequest.status
+            )
+            .join(EmployeeProfile, EmployeeProfile.id == LeaveRequest.employee_id)
+            .filter(
+                LeaveRequest.status.in_(BLOCKING_STATUSES),
+                LeaveRequest.start_date.is_not(None),
+                LeaveRequest.end_date.is_not(None)
+            )
+        )
+
+    def _query(self, start: datetime, end: datetime) -> List[LeaveInterval]:
+        with self._lock:
+            intervals, max_end, size = self._intervals, self._max_end, self._size
+            stop = bisect.bisect_right(self._starts, end)
+
+        matches = []
+        stack = [(1, 0, size)]
+        while stack:
+            node, lo, width = stack.pop()
+            if lo >= stop or max_end[node] < start:
+                continue
+            if width == 1:
+                matches.append(intervals[lo])
+                continue
+            half = width // 2
+            stack.append((2 * node + 1, lo + half, half))
+            stack.append((2 * node, lo, half))
+        return matches
+
+    async def overlapping(self, db: AsyncSession, start: datetime, end: datetime,
+                          statuses: Iterable[str] = BLOCKING_STATUSES) -> List[LeaveInterval]:
+        """Leave intervals overlapping [start, end] (inclusive), ordered by start"""
+        start, end = naive_utc(start), naive_utc(end)
+        statuses = set(statuses)
+        await self.ensure_fresh(db)
+        if self._horizon is not None and start >= self._horizon:
+            matches = self._query(start, end)
+        else:
+            result = await db.execute(
+                self._interval_query()
+                .filter(LeaveRequest.end_date >= start, LeaveRequest.start_date <= end)
+                .order_by(LeaveRequest.start_date, LeaveRequest.id)
+            )
+            matches = [LeaveInterval(*row) for row in result.all()]
+        return [interval for interval in matches if interval.status in statuses]
+
+    async def employee_conflicts(self, db: AsyncSession, employee_id: int, start: datetime, end: datetime,
+                                 exclude_id: Optional[int] = None) -> List[LeaveInterval]:
+        """The employee's approved or pending leave overlapping [start, end]
+
+        Read from the database (ix_leave_requests_employee_id) rather than the
+        index, so requests just filed through another worker are seen too.
+        """
+        query = self._interval_query().filter(
+            LeaveRequest.employee_id == employee_id,
+            LeaveRequest.end_date >= naive_utc(start),
+            LeaveRequest.start_date <= naive_utc(end)
+        )
+        if exclude_id is not None:
+            query = query.filter(LeaveRequest.id != exclude_id)
+        result = await db.execute(query)
+        return [LeaveInterval(*row) for row in result.all()]
+
+    def stats(self) -> Dict:
+        return {
+            "intervals": len(self._intervals),
+            "horizon": self._horizon.isoformat() if self._horizon else None,
+            "loaded": self._loaded_at is not None
+        }
+
+# Global leave index instance
+leave_index = LeaveIndex(
+    refresh_seconds=settings.leave_index_refresh_seconds,
+    lookback_days=settings.leave_index_lookback_days
+)
@@ -1,55 +1,224 @@
-from sqlalchemy.orm import Session
+import time
+import uuid
+from sqlalchemy import select, update, func, case, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import AsyncSessionLocal
 from app.models.user import User, EmployeeProfile
 from app.models.task import Task, TaskStatus
-from typing import List, Dict
+from app.services.leaderboard_index import leaderboard_index
+from typing import Iterable, List, Dict, Optional, Tuple
+
+def _count_where(*conditions):
+    """Conditional COUNT usable inside a single aggregate SELECT"""
+    return func.coalesce(func.sum(case((and_(*conditions), 1), else_=0)), 0)
+
+def _score_contribution(status: Optional[str], score_value: Optional[int]) -> Tuple[int, int, int]:
+    """(points, completed, failed) a task in this status adds to its assignee"""
+    if status == TaskStatus.COMPLETED.value:
+        return score_value or 0, 1, 0
+    if status == TaskStatus.FAILED.value:
+        return -2 * (score_value or 0), 0, 1
+    return 0, 0, 0
 
 class ScoringService:
     
-    def calculate_employee_score(self, db: Session, employee_id: int) -> int:
-        """Calculate total score for an employee"""
-        employee = db.query(EmployeeProfile).filter(EmployeeProfile.user_id == employee_id).first()
+    def __init__(self):
+        # Background recalculation jobs by id (per worker process)
+        self.recalculation_jobs: Dict[str, Dict] = {}
+    
+    def task_snapshot(self, task: Task) -> Tuple[Optional[int], Optional[str], Optional[int]]:
+        """Capture the fields of a task that feed into its assignee's score"""
+        return task.assigned_to, task.status, task.score_value
+    
+    async def apply_task_change(self, db: AsyncSession, before: Optional[Tuple], after: Optional[Tuple]):
+        """Apply score deltas for a task change without rescanning tasks
+        
+        ``before``/``after`` are task_snapshot() tuples, or None when the task
+        is being created or deleted. The profile updates join the caller's
+        transaction; the caller commits.
+        """
+        await self.apply_task_changes(db, [(before, after)])
+    
+    async def apply_task_changes(self, db: AsyncSession, changes: Iterable[Tuple[Optional[Tuple], Optional[Tuple]]]):
+        """apply_task_change for many tasks: one profile UPDATE per affected employee"""
+        deltas: Dict[int, List[int]] = {}
+        for before, after in changes:
+            for snapshot, sign in ((before, -1), (after, 1)):
+                if snapshot is None or snapshot[0] is None:
+                    continue
+                assignee, task_status, score_value = snapshot
+                points, completed, failed = _score_contribution(task_status, score_value)
+                delta = deltas.setdefault(assignee, [0, 0, 0])
+                delta[0] += sign * points
+                delta[1] += sign * completed
+                delta[2] += sign * failed
+        
+        for assignee, (points, completed, failed) in deltas.items():
+            if points or completed or failed:
+                await self._apply_profile_delta(db, assignee, points, completed, failed)
+    
+    async def _apply_profile_delta(self, db: AsyncSession, employee_id: int, points: int, completed: int, failed: int):
+        """Shift an employee's score counters by the given deltas in one UPDATE"""
+        net_score = EmployeeProfile.net_score + points
+        tasks_completed = EmployeeProfile.tasks_completed + completed
+        tasks_failed = EmployeeProfile.tasks_failed + failed
+        finished = tasks_completed + tasks_failed
+        
+        result = await db.execute(
+            update(EmployeeProfile)
+            .where(EmployeeProfile.user_id == employee_id)
+            .values(
+                net_score=net_score,
+                score=case((net_score > 0, net_score), else_=0),
+                tasks_completed=tasks_completed,
+                tasks_failed=tasks_failed,
+                success_rate=case((finished > 0, tasks_completed * 100.0 / finished), else_=0.0)
+            )
+            .returning(EmployeeProfile.id, EmployeeProfile.user_id, EmployeeProfile.score)
+            .execution_options(synchronize_session=False)
+        )
+        for profile_id, user_id, score in result.all():
+            leaderboard_index.update(profile_id, user_id, score)
+    
+    async def calculate_employee_score(self, db: AsyncSession, employee_id: int) -> int:
+        """Recompute an employee's score from their tasks (repair path)"""
+        result = await db.execute(select(EmployeeProfile).filter(EmployeeProfile.user_id == employee_id))
+        employee = result.scalars().first()
         if not employee:
             return 0
         
-        # Get completed tasks
-        completed_tasks = db.query(Task).filter(
-            Task.assigned_to == employee_id,
-            Task.status == TaskStatus.COMPLETED.value
-        ).all()
-        
-        # Get failed tasks
-        failed_tasks = db.query(Task).filter(
-            Task.assigned_to == employee_id,
-            Task.status == TaskStatus.FAILED.value
-        ).all()
+        result = await db.execute(select(
+            func.coalesce(func.sum(case((Task.status == TaskStatus.COMPLETED.value, Task.score_value), else_=0)), 0),
+            func.coalesce(func.sum(case((Task.status == TaskStatus.FAILED.value, Task.score_value * 2), else_=0)), 0),
+            _count_where(Task.status == TaskStatus.COMPLETED.value),
+            _count_where(Task.status == TaskStatus.FAILED.value)
+        ).filter(Task.assigned_to == employee_id))
+        completed_points, failed_points, completed_count, failed_count = result.one()
         
         # Calculate score: +1000 for completed, -2000 for failed
-        score = sum(task.score_value for task in completed_tasks)
-        score -= sum(task.score_value * 2 for task in failed_tasks)
-        
-        # Update employee profile
-        employee.score = max(0, score)  # Don't allow negative scores
-        employee.tasks_completed = len(completed_tasks)
-        employee.tasks_failed = len(failed_tasks)
+        employee.net_score = completed_points - failed_points
+        employee.score = max(0, employee.net_score)  # Don't allow negative scores
+        employee.tasks_completed = completed_count
+        employee.tasks_failed = failed_count
         
         # Calculate success rate
-        total_tasks = len(completed_tasks) + len(failed_tasks)
+        total_tasks = completed_count + failed_count
         if total_tasks > 0:
-            employee.success_rate = (len(completed_tasks) / total_tasks) * 100
+            employee.success_rate = completed_count * 100.0 / total_tasks
         else:
             employee.success_rate = 0.0
         
-        db.commit()
+        await db.commit()
+        leaderboard_index.update(employee.id, employee.user_id, employee.score)
         return employee.score
     
-    def get_leaderboard(self, db: Session, limit: int = 10) -> List[Dict]:
-        """Get employee leaderboard"""
-        employees = db.query(EmployeeProfile).order_by(EmployeeProfile.score.desc()).limit(limit).all()
+    async def recalculate_all_scores(self, db: AsyncSession, progress: Optional[Dict] = None) -> int:
+        """Set-based repair of every employee's score
+        
+        One aggregate over tasks grouped by assignee feeds a single
+        UPDATE ... FROM on employee_profiles, after zeroing the profiles so
+        employees without finished tasks are reset too. Returns the number of
+        profiles recalculated. ``progress``, when given, is updated in place.
+        """
+        if progress is None:
+            progress = {}
+        completed = Task.status == TaskStatus.COMPLETED.value
+        failed = Task.status == TaskStatus.FAILED.value
+        
+        totals = (
+            select(
+                Task.assigned_to.label("user_id"),
+                (
+                    func.coalesce(func.sum(case((completed, Task.score_value), else_=0)), 0)
+                    - func.coalesce(func.sum(case((failed, Task.score_value * 2), else_=0)), 0)
+                ).label("net_score"),
+                _count_where(completed).label("tasks_completed"),
+                _count_where(failed).label("tasks_failed")
+            )
+            .filter(
+                Task.assigned_to.is_not(None),
+                Task.status.in_([TaskStatus.COMPLETED.value, TaskStatus.FAILED.value])
+            )
+            .group_by(Task.assigned_to)
+            .subquery()
+        )
+        
+        progress.update(stage="resetting", progress=0)
+        result = await db.execute(
+            update(EmployeeProfile)
+            .values(net_score=0, score=0, tasks_completed=0, tasks_failed=0, success_rate=0.0)
+            .execution_options(synchronize_session=False)
+        )
+        employee_count = result.rowcount
         
-        leaderboard = []
-        for i, emp in enumerate(employees, 1):
-            leaderboard.append({
-                "rank": i,
+        progress.update(stage="aggregating", progress=25, employees=employee_count)
+        await db.execute(
+            update(EmployeeProfile)
+            .where(EmployeeProfile.user_id == totals.c.user_id)
+            .values(
+                net_score=totals.c.net_score,
+                score=case((totals.c.net_score > 0, totals.c.net_score), else_=0),
+                tasks_completed=totals.c.tasks_completed,
+                tasks_failed=totals.c.tasks_failed,
+                success_rate=totals.c.tasks_completed * 100.0 / (totals.c.tasks_completed + totals.c.tasks_failed)
+            )
+            .execution_options(synchronize_session=False)
+        )
+        
+        progress.update(stage="committing", progress=90)
+        await db.commit()
+        leaderboard_index.invalidate()
+        progress.update(stage="completed", progress=100)
+        return employee_count
+    
+    def start_recalculation_job(self) -> Dict:
+        """Register a background recalculation and return its status record"""
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": "queued",
+            "stage": "queued",
+            "progress": 0,
+            "employees": None,
+            "duration_seconds": None,
+            "error": None
+        }
+        self.recalculation_jobs[job["job_id"]] = job
+        while len(self.recalculation_jobs) > 100:
+            self.recalculation_jobs.pop(next(iter(self.recalculation_jobs)))
+        return job
+    
+    async def run_recalculation_job(self, job_id: str):
+        """Background entry point; uses its own session since the request's is closed"""
+        job = self.recalculation_jobs[job_id]
+        job["status"] = "running"
+        started = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as db:
+                await self.recalculate_all_scores(db, progress=job)
+            job["status"] = "completed"
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+        job["duration_seconds"] = round(time.perf_counter() - started, 3)
+    
+    async def _ranked_entries(self, db: AsyncSession, ranked: List) -> List[Dict]:
+        """Attach profile details to (rank, profile_id, score) index entries"""
+        if not ranked:
+            return []
+        
+        result = await db.execute(
+            select(EmployeeProfile).filter(EmployeeProfile.id.in_([profile_id for _, profile_id, _ in ranked]))
+        )
+        profiles = {emp.id: emp for emp in result.scalars().all()}
+        
+        entries = []
+        for rank, profile_id, _ in ranked:
+            emp = profiles.get(profile_id)
+            if emp is None:
+                continue
+            entries.append({
+                "rank": rank,
+                "user_id": emp.user_id,
                 "name": emp.name,
                 "position": emp.position,
                 "score": emp.score,
@@ -57,12 +226,68 @@ class ScoringService:
                 "tasks_completed": emp.tasks_completed,
                 "leave_score": emp.leave_score
             })
+        return entries
+    
+    async def get_leaderboard(self, db: AsyncSession, limit: int = 10) -> List[Dict]:
+        """Get employee leaderboard"""
+        await leaderboard_index.ensure_fresh(db)
+        return await self._ranked_entries(db, leaderboard_index.slice(1, limit))
+    
+    async def get_rank(self, db: AsyncSession, employee_id: int) -> Optional[int]:
+        """1-based leaderboard rank of an employee (by user id)"""
+        await leaderboard_index.ensure_fresh(db)
+        rank = leaderboard_index.rank_of_user(employee_id)
+        if rank is None:
+            # One indexed lookup: unknown ids and managers must not cost a full rebuild
+            result = await db.execute(
+                select(EmployeeProfile.id, EmployeeProfile.score).filter(EmployeeProfile.user_id == employee_id)
+            )
+            profile = result.first()
+            if profile is None:
+                return None
+            # Profile created since the last rebuild
+            leaderboard_index.update(profile.id, employee_id, profile.score)
+            rank = leaderboard_index.rank_of_user(employee_id)
+        return rank
+    
+    async def get_leaderboard_neighbors(self, db: AsyncSession, employee_id: int, radius: int = 2) -> Optional[Dict]:
+        """Leaderboard entries within ``radius`` ranks of an employee"""
+        rank = await self.get_rank(db, employee_id)
+        if rank is None:
+            return None
+        
+        start = max(1, rank - radius)
+        entries = await self._ranked_entries(db, leaderboard_index.slice(start, rank + radius - start + 1))
+        return {"rank": rank, "total": len(leaderboard_index), "neighbors": entries}
+    
+    async def get_leaderboard_page(self, db: AsyncSession, cursor: Optional[str] = None, limit: int = 10) -> Dict:
+        """Keyset page of the leaderboard
+        
+        The cursor is the "score:profile_id" key of the last entry on the
+        previous page, so pages stay contiguous while ranks shift above them.
+        """
+        await leaderboard_index.ensure_fresh(db)
+        start_rank = 1
+        if cursor:
+            score, profile_id = (int(part) for part in cursor.split(":"))
+            start_rank = leaderboard_index.rank_after(score, profile_id)
+        
+        ranked = leaderboard_index.slice(start_rank, limit)
+        next_cursor = None
+        if ranked and ranked[-1][0] < len(leaderboard_index):
+            _, profile_id, score = ranked[-1]
+            next_cursor = f"{score}:{profile_id}"
         
-        return leaderboard
+        return {
+            "leaderboard": await self._ranked_entries(db, ranked),
+            "total": len(leaderboard_index),
+            "next_cursor": next_cursor
+        }
     
-    def update_leave_score(self, db: Session, employee_id: int, task_transferred: bool) -> int:
+    async def update_leave_score(self, db: AsyncSession, employee_id: int, task_transferred: bool) -> int:
         """Update leave score based on task transfer success"""
-        employee = db.query(EmployeeProfile).filter(EmployeeProfile.user_id == employee_id).first()
+        result = await db.execute(select(EmployeeProfile).filter(EmployeeProfile.user_id == employee_id))
+        employee = result.scalars().first()
         if not employee:
             return 0
         
@@ -71,16 +296,46 @@ class ScoringService:
             penalty = 10  # Configurable penalty
             employee.leave_score = max(0, employee.leave_score - penalty)
         
-        db.commit()
+        await db.commit()
         return employee.leave_score
     
-    def calculate_team_stats(self, db: Session) -> Dict:
-        """Calculate overall team statistics"""
-        from sqlalchemy import func
+    async def get_task_summary(self, db: AsyncSession, assigned_to: Optional[int] = None, include_team: bool = False) -> Dict:
+        """Every dashboard number in one conditional-aggregation query
         
-        total_employees = db.query(EmployeeProfile).count()
+        Task counts are scoped to ``assigned_to`` when given. With
+        ``include_team`` the employee profile aggregates are folded into the
+        same statement as scalar subqueries.
+        """
+        columns = [
+            func.count(Task.id).label("total_tasks"),
+            _count_where(Task.status == TaskStatus.COMPLETED.value).label("completed_tasks"),
+            _count_where(Task.status == TaskStatus.IN_PROGRESS.value).label("in_progress_tasks"),
+            # Transferred tasks wait for their new assignee to start them
+            _count_where(
+                Task.status.in_([TaskStatus.PENDING.value, TaskStatus.TRANSFERRED.value])
+            ).label("pending_tasks"),
+            _count_where(
+                Task.status != TaskStatus.COMPLETED.value,
+                Task.due_date < func.now()
+            ).label("overdue_tasks"),
+        ]
+        if include_team:
+            columns += [
+                select(func.count(EmployeeProfile.id)).scalar_subquery().label("total_employees"),
+                select(func.avg(EmployeeProfile.score)).scalar_subquery().label("average_score"),
+                select(func.avg(EmployeeProfile.success_rate)).scalar_subquery().label("average_success_rate"),
+            ]
         
-        if total_employees == 0:
+        query = select(*columns)
+        if assigned_to is not None:
+            query = query.filter(Task.assigned_to == assigned_to)
+        
+        result = await db.execute(query)
+        return dict(result.one()._mapping)
+    
+    def team_stats_from_summary(self, summary: Dict) -> Dict:
+        """Shape a get_task_summary(include_team=True) row as team statistics"""
+        if not summary["total_employees"]:
             return {
                 "total_employees": 0,
                 "average_score": 0,
@@ -89,26 +344,18 @@ class ScoringService:
                 "total_tasks_pending": 0
             }
         
-        # Average score
-        avg_score = db.query(func.avg(EmployeeProfile.score)).scalar() or 0
-        
-        # Average success rate
-        avg_success_rate = db.query(func.avg(EmployeeProfile.success_rate)).scalar() or 0
-        
-        # Total tasks
-        total_completed = db.query(Task).filter(Task.status == TaskStatus.COMPLETED.value).count()
-        total_pending = db.query(Task).filter(Task.status.in_([
-            TaskStatus.PENDING.value,
-            TaskStatus.IN_PROGRESS.value
-        ])).count()
-        
         return {
-            "total_employees": total_employees,
-            "average_score": round(float(avg_score), 2),
-            "average_success_rate": round(float(avg_success_rate), 2),
-            "total_tasks_completed": total_completed,
-            "total_tasks_pending": total_pending
+            "total_employees": summary["total_employees"],
+            "average_score": round(float(summary["average_score"] or 0), 2),
+            "average_success_rate": round(float(summary["average_success_rate"] or 0), 2),
+            "total_tasks_completed": summary["completed_tasks"],
+            "total_tasks_pending": summary["pending_tasks"] + summary["in_progress_tasks"]
         }
+    
+    async def calculate_team_stats(self, db: AsyncSession) -> Dict:
+        """Calculate overall team statistics"""
+        summary = await self.get_task_summary(db, include_team=True)
+        return self.team_stats_from_summary(summary)
 
 # Global scoring service instance
-scoring_service = ScoringService()
\ No newline at end of file
+scoring_service = ScoringService()
@@ -0,0 +1,181 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import select, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.task import Task, TaskStatus
+from app.models.user import User
+from app.schemas.task import TaskCreate
+from app.services.enrichment_service import enrichment_service
+from app.services.scoring_service import scoring_service
+
+# Ids per IN (...) list when reading many tasks or users
+LOOKUP_CHUNK_SIZE = 1000
+
+def validation_message(exc: ValidationError) -> str:
+    """One-line summary of a pydantic validation error for per-item results"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'item'}: {error['msg']}" for error in exc.errors()
+    )
+
+def chunks(items: List, size: int = LOOKUP_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+class TaskBulkService:
+    """Creates tasks and changes task statuses many at a time.
+
+    Every item is validated on its own and gets its own result, so one bad
+    row does not reject the batch. Valid rows are written in the caller's
+    single transaction:
+    - creates as one multi-row INSERT ... RETURNING
+    - status changes as one UPDATE per target status
+    Score deltas go through ScoringService.apply_task_changes, which makes
+    one UPDATE per affected employee.
+    """
+
+    async def existing_user_ids(self, db: AsyncSession, user_ids) -> set:
+        ids = list({user_id for user_id in user_ids if user_id is not None})
+        found = set()
+        for chunk in chunks(ids):
+            result = await db.execute(select(User.id).filter(User.id.in_(chunk)))
+            found.update(result.scalars().all())
+        return found
+
+    async def create_tasks(self, db: AsyncSession, items: List[Any], created_by: int,
+                           enrich: bool = True) -> Dict:
+        """Validate and insert tasks; results are in input order"""
+        results: List[Optional[Dict]] = [None] * len(items)
+        valid: List[Tuple[int, TaskCreate]] = []
+        for index, item in enumerate(items):
+            try:
+                valid.append((index, TaskCreate.model_validate(item)))
+            except ValidationError as e:
+                results[index] = {"index": index, "status": "error", "error": validation_message(e)}
+
+        known_users = await self.existing_user_ids(db, (task.assigned_to for _, task in valid))
+        rows = []
+        for index, task in valid:
+            if task.assigned_to is not None and task.assigned_to not in known_users:
+                results[index] = {"index": index, "status": "error", "error": f"assigned_to: unknown user {task.assigned_to}"}
+                continue
+            rows.append((index, self.task_row(task, created_by)))
+
+        ids = await self.insert_rows(db, [row for _, row in rows])
+        for (index, _), task_id in zip(rows, ids):
+            results[index] = {"index": index, "status": "created", "id": task_id}
+
+        if enrich:
+            jobs = await enrichment_service.enqueue_tasks(db, ids)
+            for result in results:
+                if result["status"] == "created" and result["id"] in jobs:
+                    result["enrichment_job"] = jobs[result["id"]]
+        await db.commit()
+
+        return {
+            "created": len(ids),
+            "failed": len(items) - len(ids),
+            "results": results
+        }
+
+    def task_row(self, task: TaskCreate, created_by: int) -> Dict:
+        """Column values for a validated TaskCreate, as create_task sets them"""
+        return {
+            "title": task.title,
+            "description": task.description,
+            "assigned_to": task.assigned_to,
+            "created_by": created_by,
+            "priority": task.priority.value,
+            "score_value": task.score_value,
+            "estimated_hours": task.estimated_hours,
+            "due_date": task.due_date
+        }
+
+    async def insert_rows(self, db: AsyncSession, rows: List[Dict]) -> List[int]:
+        """Multi-row INSERT ... RETURNING; ids come back in row order (caller commits)"""
+        if not rows:
+            return []
+        # Core insert on the table: batched as multi-row VALUES (the ORM bulk path here goes row by row)
+        table = Task.__table__
+        if db.bind.dialect.name == "sqlite":
+            # sort_by_parameter_order falls back to one INSERT per row on SQLite. Each
+            # statement assigns rowids in VALUES order, so sorted ids match the rows.
+            result = await db.execute(insert(table).returning(table.c.id), rows)
+            return sorted(result.scalars().all())
+        result = await db.execute(insert(table).returning(table.c.id, sort_by_parameter_order=True), rows)
+        return list(result.scalars().all())
+
+    async def update_statuses(self, db: AsyncSession, items: List[Any], current_user: User) -> Dict:
+        """Apply {"task_id", "status"} changes with the rules of POST /{task_id}/status"""
+        results: List[Optional[Dict]] = [None] * len(items)
+        wanted: List[Tuple[int, int, str]] = []
+        for index, item in enumerate(items):
+            task_id = item.get("task_id") if isinstance(item, dict) else None
+            try:
+                new_status = TaskStatus(item.get("status")).value if isinstance(item, dict) else None
+            except ValueError:
+                new_status = None
+            if not isinstance(task_id, int) or isinstance(task_id, bool):
+                results[index] = {"index": index, "status": "error", "error": "task_id: must be an integer"}
+            elif new_status is None:
+                results[index] = {"index": index, "task_id": task_id, "status": "error",
+                                  "error": f"status: must be one of {[status.value for status in TaskStatus]}"}
+            else:
+                wanted.append((index, task_id, new_status))
+
+        tasks = {}
+        for chunk in chunks(list({task_id for _, task_id, _ in wanted})):
+            result = await db.execute(
+                select(Task.id, Task.assigned_to, Task.status, Task.score_value).filter(Task.id.in_(chunk))
+            )
+            tasks.update({row.id: row for row in result.all()})
+
+        # Later items for the same task win, as if the requests had been sent in order
+        changes: Dict[int, Tuple[int, str]] = {}
+        for index, task_id, new_status in wanted:
+            task = tasks.get(task_id)
+            if task is None:
+                results[index] = {"index": index, "task_id": task_id, "status": "error", "error": "Task not found"}
+            elif current_user.role == "employee" and task.assigned_to != current_user.id:
+                results[index] = {"index": index, "task_id": task_id, "status": "error",
+                                  "error": "You can only update your own tasks"}
+            else:
+                if task_id in changes:
+                    superseded = changes[task_id][0]
+                    results[superseded] = {"index": superseded, "task_id": task_id, "status": "superseded"}
+                changes[task_id] = (index, new_status)
+                results[index] = {"index": index, "task_id": task_id, "status": "updated", "new_status": new_status}
+
+        by_status: Dict[str, List[int]] = {}
+        for task_id, (_, new_status) in changes.items():
+            by_status.setdefault(new_status, []).append(task_id)
+        now = datetime.now()
+        for new_status, task_ids in by_status.items():
+            values = {"status": new_status, "updated_at": now}
+            if new_status == TaskStatus.COMPLETED.value:
+                values["completed_at"] = now
+            for chunk in chunks(task_ids):
+                await db.execute(
+                    update(Task)
+                    .where(Task.id.in_(chunk))
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+
+        await scoring_service.apply_task_changes(db, [
+            (
+                (tasks[task_id].assigned_to, tasks[task_id].status, tasks[task_id].score_value),
+                (tasks[task_id].assigned_to, new_status, tasks[task_id].score_value)
+            )
+            for task_id, (_, new_status) in changes.items()
+        ])
+        await db.commit()
+
+        return {
+            "updated": len(changes),
+            "failed": sum(1 for result in results if result["status"] == "error"),
+            "results": results
+        }
+
+# Global bulk task service instance
+task_bulk_service = TaskBulkService()
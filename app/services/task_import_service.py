@@ -0,0 +1,166 @@
+import csv
+import io
+import json
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.models.user import User
+from app.schemas.task import TaskCreate
+from app.services.enrichment_service import enrichment_service
+from app.services.task_bulk_service import task_bulk_service, validation_message, chunks
+
+# (line number, parsed row or None, parse error or None)
+Record = Tuple[int, Optional[Dict], Optional[str]]
+
+class ImportFileError(ValueError):
+    """The upload cannot be read as the requested format at all"""
+
+def _take(records: Iterator[Record], count: int) -> List[Record]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == count:
+            break
+    return batch
+
+class TaskImportService:
+    """Imports tasks from a CSV or NDJSON upload in bounded batches.
+
+    The file is parsed lazily, ``batch_size`` rows at a time. Each batch is
+    validated against TaskCreate, has its assignee emails resolved with one
+    query, and is inserted and committed as its own transaction. Only the
+    current batch and the first ``max_reported`` rejections are held in
+    memory.
+    """
+
+    def __init__(self, batch_size: int = None, max_reported: int = None):
+        self.batch_size = batch_size or settings.import_batch_size
+        self.max_reported = max_reported or settings.import_max_reported_rejections
+
+    async def import_tasks(self, db: AsyncSession, file: BinaryIO, import_format: str,
+                           created_by: int, enrich: bool = True) -> Dict:
+        """Import every row of ``file``; returns counts and the rejected rows"""
+        text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+        report = {
+            "format": import_format,
+            "rows": 0,
+            "imported": 0,
+            "rejected": 0,
+            "batches": 0,
+            "rejected_rows": [],
+            "rejected_rows_truncated": False
+        }
+        try:
+            records = self._csv_records(text) if import_format == "csv" else self._ndjson_records(text)
+            while True:
+                # Parsing reads the spooled upload from disk: keep it off the event loop
+                try:
+                    batch = await run_in_threadpool(_take, records, self.batch_size)
+                except (UnicodeDecodeError, csv.Error) as e:
+                    if not report["rows"]:
+                        raise ImportFileError(f"Cannot parse file: {e}")
+                    # Earlier batches are committed; say where the import stopped
+                    report["error"] = f"Stopped after row {report['rows']}: {e}"
+                    break
+                if not batch:
+                    break
+                await self._import_batch(db, batch, created_by, enrich, report)
+        finally:
+            text.detach()
+        report["rejected_rows"].sort(key=lambda rejection: rejection["line"])
+        return report
+
+    def _csv_records(self, text: io.TextIOWrapper) -> Iterator[Record]:
+        reader = csv.DictReader(text)
+        if not reader.fieldnames or "title" not in [name.strip() for name in reader.fieldnames]:
+            raise ImportFileError("CSV header must include a title column")
+        line = reader.line_num
+        for row in reader:
+            start, line = line + 1, reader.line_num
+            if None in row:
+                yield start, None, "more fields than header columns"
+                continue
+            # Blank cells fall back to the TaskCreate defaults
+            yield start, {
+                key.strip(): value.strip()
+                for key, value in row.items()
+                if value is not None and value.strip() != ""
+            }, None
+
+    def _ndjson_records(self, text: io.TextIOWrapper) -> Iterator[Record]:
+        for line_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                yield line_number, None, f"invalid JSON: {e}"
+                continue
+            if not isinstance(item, dict):
+                yield line_number, None, "expected a JSON object"
+                continue
+            yield line_number, item, None
+
+    async def user_ids_by_email(self, db: AsyncSession, emails) -> Dict[str, int]:
+        found = {}
+        for chunk in chunks(list(set(emails))):
+            result = await db.execute(select(User.email, User.id).filter(User.email.in_(chunk)))
+            found.update(dict(result.all()))
+        return found
+
+    async def _import_batch(self, db: AsyncSession, batch: List[Record], created_by: int,
+                            enrich: bool, report: Dict):
+        report["rows"] += len(batch)
+        report["batches"] += 1
+
+        valid: List[Tuple[int, TaskCreate, Optional[str]]] = []
+        for line, item, error in batch:
+            if error is None:
+                email = item.pop("assignee_email", None)
+                if email is not None and item.get("assigned_to") is not None:
+                    error = "give either assigned_to or assignee_email, not both"
+                elif email is not None and not isinstance(email, str):
+                    error = "assignee_email: must be a string"
+                else:
+                    try:
+                        valid.append((line, TaskCreate.model_validate(item), email and email.strip()))
+                    except ValidationError as e:
+                        error = validation_message(e)
+            if error is not None:
+                self._reject(report, line, error)
+
+        # One lookup per batch for each way of naming the assignee
+        by_email = await self.user_ids_by_email(db, (email for _, _, email in valid if email))
+        known_users = await task_bulk_service.existing_user_ids(db, (task.assigned_to for _, task, _ in valid))
+
+        rows = []
+        for line, task, email in valid:
+            row = task_bulk_service.task_row(task, created_by)
+            if email:
+                if email not in by_email:
+                    self._reject(report, line, f"assignee_email: unknown user {email}")
+                    continue
+                row["assigned_to"] = by_email[email]
+            elif task.assigned_to is not None and task.assigned_to not in known_users:
+                self._reject(report, line, f"assigned_to: unknown user {task.assigned_to}")
+                continue
+            rows.append(row)
+
+        ids = await task_bulk_service.insert_rows(db, rows)
+        if enrich:
+            await enrichment_service.enqueue_tasks(db, ids)
+        await db.commit()
+        report["imported"] += len(ids)
+
+    def _reject(self, report: Dict, line: int, error: str):
+        report["rejected"] += 1
+        if len(report["rejected_rows"]) < self.max_reported:
+            report["rejected_rows"].append({"line": line, "error": error})
+        else:
+            report["rejected_rows_truncated"] = True
+
+# Global task import service instance
+task_import_service = TaskImportService()
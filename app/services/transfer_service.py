@@ -0,0 +1,160 @@
+import heapq
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import select, update, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.task import Task, TaskStatus, LeaveRequest
+from app.models.user import User, EmployeeProfile
+from app.services.assignment_service import OPEN_STATUSES
+
+# Workload of an open task: estimated hours (or a default) scaled by priority
+DEFAULT_TASK_HOURS = 4.0
+PRIORITY_WEIGHTS = {"low": 0.5, "medium": 1.0, "high": 1.5, "critical": 2.0}
+# Tasks moved per UPDATE statement (3 bound parameters each)
+TRANSFER_STATEMENT_SIZE = 1000
+
+def _task_load():
+    return (
+        func.coalesce(Task.estimated_hours, DEFAULT_TASK_HOURS)
+        * case(PRIORITY_WEIGHTS, value=Task.priority, else_=1.0)
+    )
+
+class TransferService:
+    """Moves an employee's open tasks to colleagues while they are on leave.
+
+    Recipients are the least-loaded active employees who have no approved
+    leave overlapping the leave window. Load means the weighted hours of
+    their open tasks, computed in one aggregate query. Tasks are handed out
+    heaviest first, each to whoever is least loaded at that moment. The move
+    itself is one UPDATE ... CASE statement per TRANSFER_STATEMENT_SIZE
+    tasks, and it sets each moved task's status to ``transferred``. Open
+    tasks carry no score, so no employee score changes.
+    """
+
+    async def candidates(self, db: AsyncSession, exclude_user_id: int, window_start: datetime,
+                         window_end: datetime, recipient_ids: Optional[List[int]] = None,
+                         limit: Optional[int] = None) -> List[Dict]:
+        """Available employees ordered by current load, least loaded first"""
+        load = (
+            select(Task.assigned_to, func.sum(_task_load()).label("load"), func.count(Task.id).label("open_tasks"))
+            .filter(Task.assigned_to.is_not(None), Task.status.in_(OPEN_STATUSES))
+            .group_by(Task.assigned_to)
+            .subquery()
+        )
+        current_load = func.coalesce(load.c.load, 0.0)
+        # Uncorrelated, so it runs once on ix_leave_requests_status_end_date. As a
+        # per-employee EXISTS SQLite scanned every approved leave for each employee.
+        on_leave = (
+            select(LeaveRequest.employee_id)
+            .filter(
+                # A NULL in a NOT IN list makes the test unknown and drops every candidate
+                LeaveRequest.employee_id.is_not(None),
+                LeaveRequest.status == "approved",
+                LeaveRequest.end_date >= window_start,
+                LeaveRequest.start_date <= window_end
+            )
+        )
+
+        query = (
+            select(EmployeeProfile.user_id, EmployeeProfile.name, current_load, func.coalesce(load.c.open_tasks, 0))
+            .join(User, User.id == EmployeeProfile.user_id)
+            .outerjoin(load, load.c.assigned_to == EmployeeProfile.user_id)
+            .filter(
+                User.is_active.is_not(False),
+                EmployeeProfile.user_id != exclude_user_id,
+                EmployeeProfile.id.not_in(on_leave)
+            )
+            .order_by(current_load, EmployeeProfile.user_id)
+        )
+        if recipient_ids is not None:
+            query = query.filter(EmployeeProfile.user_id.in_(recipient_ids))
+        if limit:
+            query = query.limit(limit)
+
+        result = await db.execute(query)
+        return [
+            {"user_id": user_id, "name": name, "load": float(current), "open_tasks": open_tasks}
+            for user_id, name, current, open_tasks in result.all()
+        ]
+
+    async def transfer_for_leave(self, db: AsyncSession, leave_request: LeaveRequest, from_user_id: int,
+                                 recipient_ids: Optional[List[int]] = None, max_recipients: Optional[int] = None,
+                                 dry_run: bool = False) -> Dict:
+        """Plan and (unless dry_run) apply the transfer of from_user_id's open tasks
+
+        ``recipient_ids`` restricts the pool to those users, otherwise the
+        ``max_recipients`` least-loaded available employees are used.
+        Returns the plan with per-recipient load before and after, or an
+        ``error`` when named recipients are unavailable or nobody is.
+        """
+        window_start = leave_request.start_date or datetime.utcnow()
+        window_end = leave_request.end_date or window_start
+
+        result = await db.execute(
+            select(Task.id, Task.title, _task_load().label("load"))
+            .filter(Task.assigned_to == from_user_id, Task.status.in_(OPEN_STATUSES))
+            .order_by(_task_load().desc(), Task.id)
+        )
+        tasks = result.all()
+
+        pool = await self.candidates(
+            db, from_user_id, window_start, window_end, recipient_ids,
+            None if recipient_ids is not None else max_recipients or settings.leave_transfer_max_recipients
+        )
+        if recipient_ids is not None:
+            unavailable = sorted(set(recipient_ids) - {emp["user_id"] for emp in pool})
+            if unavailable:
+                return {"error": "Recipients unavailable during the leave", "unavailable": unavailable}
+        if tasks and not pool:
+            return {"error": "No available employees to transfer tasks to", "unavailable": []}
+
+        # Heaviest task first to whoever is least loaded (greedy LPT balancing)
+        heap = [(emp["load"], emp["user_id"]) for emp in pool]
+        heapq.heapify(heap)
+        recipients = {emp["user_id"]: {**emp, "load_after": emp["load"], "tasks": []} for emp in pool}
+        assignments = []
+        for task in tasks:
+            load, user_id = heapq.heappop(heap)
+            heapq.heappush(heap, (load + float(task.load), user_id))
+            recipients[user_id]["load_after"] = round(load + float(task.load), 2)
+            recipients[user_id]["tasks"].append(task.id)
+            assignments.append({"task_id": task.id, "title": task.title, "to": user_id})
+
+        moved = 0
+        if assignments and not dry_run:
+            now = datetime.utcnow()
+            for start in range(0, len(assignments), TRANSFER_STATEMENT_SIZE):
+                batch = assignments[start:start + TRANSFER_STATEMENT_SIZE]
+                # The guard skips tasks reassigned or finished since they were read
+                result = await db.execute(
+                    update(Task)
+                    .where(
+                        Task.id.in_([item["task_id"] for item in batch]),
+                        Task.assigned_to == from_user_id,
+                        Task.status.in_(OPEN_STATUSES)
+                    )
+                    .values(
+                        assigned_to=case({item["task_id"]: item["to"] for item in batch}, value=Task.id),
+                        status=TaskStatus.TRANSFERRED.value,
+                        updated_at=now
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                moved += result.rowcount
+
+        if not dry_run:
+            leave_request.tasks_transferred = True
+            leave_request.transfer_successful = moved == len(assignments)
+            await db.commit()
+
+        return {
+            "dry_run": dry_run,
+            "planned": len(assignments),
+            "transferred": moved,
+            "assignments": assignments,
+            "recipients": [recipient for recipient in recipients.values() if recipient["tasks"]]
+        }
+
+# Global transfer service instance
+transfer_service = TransferService()
@@ -0,0 +1,88 @@
+"""
+Background job worker for AI enrichment.
+
+Runs next to the web processes (see the Procfile ``worker`` entry):
+
+    python -m app.worker                    # settings.job_worker_concurrency loops
+    python -m app.worker --concurrency 8
+    python -m app.worker --once             # drain due jobs and exit
+
+Each loop claims one job at a time from the ``background_jobs`` table, so
+several worker processes can share a queue. Model calls go through the
+async AI layer, so its concurrency limit, deadlines and circuit breaker
+apply here too.
+"""
+import argparse
+import asyncio
+import logging
+import signal
+import sys
+from typing import List
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.services.enrichment_service import enrichment_service
+from app.services.job_queue import job_queue, PermanentJobError
+
+logger = logging.getLogger("app.worker")
+
+async def run_one() -> bool:
+    """Claim and run a single job; False when nothing was due"""
+    async with AsyncSessionLocal() as db:
+        job = await job_queue.claim(db)
+    if job is None:
+        return False
+
+    try:
+        async with AsyncSessionLocal() as db:
+            await enrichment_service.run(db, job["kind"], job["entity_id"])
+    except Exception as e:
+        async with AsyncSessionLocal() as db:
+            outcome = await job_queue.fail(db, job, str(e), permanent=isinstance(e, PermanentJobError))
+        logger.warning("Job %s (%s %s) attempt %s failed, now %s: %s",
+                       job["id"], job["kind"], job["entity_id"], job["attempts"], outcome or "lease lost", e)
+    else:
+        async with AsyncSessionLocal() as db:
+            recorded = await job_queue.complete(db, job)
+        if recorded:
+            logger.info("Job %s (%s %s) succeeded", job["id"], job["kind"], job["entity_id"])
+        else:
+            logger.warning("Job %s (%s %s) finished after its lease expired; result dropped",
+                           job["id"], job["kind"], job["entity_id"])
+    return True
+
+async def work_loop(stop: asyncio.Event, once: bool = False):
+    while not stop.is_set():
+        try:
+            ran = await run_one()
+        except Exception:
+            logger.exception("Worker loop error")
+            ran = False
+        if not ran:
+            if once:
+                return
+            try:
+                await asyncio.wait_for(stop.wait(), settings.job_poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+async def main_async(concurrency: int, once: bool = False):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    await asyncio.gather(*[work_loop(stop, once) for _ in range(concurrency)])
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="AI enrichment job worker")
+    parser.add_argument("--concurrency", type=int, default=settings.job_worker_concurrency)
+    parser.add_argument("--once", action="store_true", help="exit when no job is due")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    asyncio.run(main_async(max(args.concurrency, 1), args.once))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
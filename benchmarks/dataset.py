@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Synthetic dataset generator for load tests and benchmarks.
+
+Writes users, employee and manager profiles, tasks, status reports and
+leave requests straight into an empty database with SQLAlchemy Core bulk
+inserts (no HTTP, no ORM objects). Everything is drawn from one seeded
+random generator and dated relative to --anchor, so the same seed, scale
+and anchor always produce the same rows.
+
+Shape of the data:
+- Tasks per employee follow a Zipf-like curve: a few people carry a lot
+  of work and a long tail carries little. About 8% of tasks are
+  unassigned.
+- Creation dates lean towards the recent past. Old tasks are mostly
+  completed or failed, recent ones mostly pending or in progress.
+- Due dates sit a log-normal number of days after creation (median about
+  a week, long tail), so some open tasks are overdue. 15% have no due
+  date.
+- Leave is sequential per employee (no self-overlap, as the API
+  enforces). About a third of it clusters around a few shared holiday
+  weeks, so many employees are out at the same time.
+- Employee scores and counters match the generated tasks, as if every
+  status change had gone through the scoring service.
+
+Every user's password is "bench". Emails are employee<n>@bench.test and
+manager<n>@bench.test.
+
+Usage:
+    python benchmarks/dataset.py --scale large               # 10k employees, 1M tasks
+    python benchmarks/dataset.py --scale small --seed 7
+    python benchmarks/dataset.py --employees 500 --tasks 50000 --database-url sqlite:///./load.db
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# name: (employees, tasks)
+SCALES = {
+    "small": (100, 10_000),
+    "medium": (1_000, 100_000),
+    "large": (10_000, 1_000_000),
+}
+
+PASSWORD = "bench"
+CHUNK_ROWS = 20_000
+
+POSITIONS = [
+    "Backend Engineer", "Frontend Engineer", "Data Engineer", "QA Engineer",
+    "DevOps Engineer", "Designer", "Product Analyst", "Technical Writer",
+]
+FIRST_NAMES = [
+    "Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie",
+    "Avery", "Quinn", "Robin", "Drew", "Kai", "Noor", "Ari", "Sasha",
+]
+LAST_NAMES = [
+    "Smith", "Garcia", "Chen", "Okafor", "Novak", "Silva", "Kim", "Patel",
+    "Müller", "Rossi", "Haddad", "Nguyen", "Cohen", "Ivanova", "Moreau", "Sato",
+]
+VERBS = ["Implement", "Fix", "Refactor", "Document", "Review", "Migrate", "Test", "Design"]
+SUBJECTS = [
+    "login flow", "billing export", "search index", "notification service", "audit log",
+    "onboarding wizard", "report builder", "rate limiter", "settings page", "data pipeline",
+]
+REPORT_TEXTS = [
+    "Started on the first part, no blockers so far.",
+    "Halfway through; waiting on review of the schema change.",
+    "Most of the work is done, tests still need updating.",
+    "Blocked on access to the staging environment.",
+    "Finished the implementation and opened a pull request.",
+]
+
+PRIORITIES = ["low", "medium", "high", "critical"]
+PRIORITY_WEIGHTS = [25, 45, 22, 8]
+PRIORITY_SCORES = {"low": 500, "medium": 1000, "high": 1500, "critical": 2500}
+UNASSIGNED_SHARE = 0.08
+NO_DUE_DATE_SHARE = 0.15
+ASSIGNEE_SKEW = 0.9  # Zipf exponent for tasks per employee
+
+
+def _task_status(rng: random.Random, age_days: float) -> str:
+    """Older tasks are more likely to be finished"""
+    finished = 1 - math.exp(-age_days / 30)
+    roll = rng.random()
+    if roll < finished:
+        return "failed" if rng.random() < 0.12 else "completed"
+    if rng.random() < 0.04:
+        return "transferred"
+    return "in_progress" if rng.random() < 0.4 else "pending"
+
+
+def generate(
+    engine,
+    employees: int,
+    tasks: int,
+    managers: Optional[int] = None,
+    reports_per_task: float = 0.5,
+    leaves_per_employee: float = 3.0,
+    days: int = 365,
+    seed: int = 42,
+    anchor: Optional[datetime] = None,
+    log=print,
+) -> Dict[str, int]:
+    """Fill an empty, migrated database; returns row counts per table"""
+    from sqlalchemy import func, insert, select
+    from app.models.task import Task, TaskStatusReport, LeaveRequest
+    from app.models.user import User, EmployeeProfile, ManagerProfile
+
+    rng = random.Random(seed)
+    anchor = anchor or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    managers = managers or max(1, employees // 50)
+    counts = {"users": 0, "employee_profiles": 0, "manager_profiles": 0,
+              "tasks": 0, "task_status_reports": 0, "leave_requests": 0}
+
+    with engine.begin() as conn:
+        if conn.execute(select(func.count(User.id))).scalar():
+            raise RuntimeError("Database already has users; generate into an empty database")
+        if conn.dialect.name == "sqlite":
+            # Throwaway load: skip the fsync per transaction
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+
+        started = time.perf_counter()
+        manager_ids = list(range(1, managers + 1))
+        employee_ids = list(range(managers + 1, managers + employees + 1))
+        conn.execute(insert(User.__table__), [
+            {"id": user_id, "email": f"manager{n}@bench.test", "password_hash": PASSWORD,
+             "role": "manager", "created_at": anchor - timedelta(days=days)}
+            for n, user_id in enumerate(manager_ids, start=1)
+        ] + [
+            {"id": user_id, "email": f"employee{n}@bench.test", "password_hash": PASSWORD,
+             "role": "employee", "created_at": anchor - timedelta(days=days)}
+            for n, user_id in enumerate(employee_ids, start=1)
+        ])
+        conn.execute(insert(ManagerProfile.__table__), [
+            {"user_id": user_id, "name": f"Manager {n}", "team_size": math.ceil(employees / managers)}
+            for n, user_id in enumerate(manager_ids, start=1)
+        ])
+        counts["users"] = managers + employees
+        counts["manager_profiles"] = managers
+
+        # Zipf-like weights over a shuffled roster: heavy hitters are spread over the id range
+        roster = employee_ids[:]
+        rng.shuffle(roster)
+        cum_weights = list(_accumulate(1 / (rank + 1) ** ASSIGNEE_SKEW for rank in range(employees)))
+        net = dict.fromkeys(employee_ids, 0)
+        completed = dict.fromkeys(employee_ids, 0)
+        failed = dict.fromkeys(employee_ids, 0)
+
+        task_table = Task.__table__
+        report_table = TaskStatusReport.__table__
+        task_id = 0
+        for chunk_start in range(0, tasks, CHUNK_ROWS):
+            size = min(CHUNK_ROWS, tasks - chunk_start)
+            assignees = rng.choices(roster, cum_weights=cum_weights, k=size)
+            task_rows, report_rows = [], []
+            for assignee in assignees:
+                task_id += 1
+                if rng.random() < UNASSIGNED_SHARE:
+                    assignee = None
+                # Squared uniform: creation dates bunch up towards the anchor
+                age_days = days * rng.random() ** 2
+                created_at = anchor - timedelta(days=age_days)
+                status = _task_status(rng, age_days) if assignee else "pending"
+                priority = rng.choices(PRIORITIES, weights=PRIORITY_WEIGHTS)[0]
+                score_value = PRIORITY_SCORES[priority]
+                estimated = round(rng.lognormvariate(1.6, 0.7), 1)
+                due_date = None
+                if rng.random() >= NO_DUE_DATE_SHARE:
+                    due_date = created_at + timedelta(days=min(rng.lognormvariate(2.0, 0.8), 180))
+                finished_at = None
+                if status in ("completed", "failed"):
+                    finished_at = min(anchor, created_at + timedelta(days=rng.uniform(0.2, max(0.3, age_days))))
+                task_rows.append({
+                    "id": task_id,
+                    "title": f"{rng.choice(VERBS)} {rng.choice(SUBJECTS)} #{task_id}",
+                    "description": f"Generated task {task_id}",
+                    "assigned_to": assignee,
+                    "created_by": rng.choice(manager_ids),
+                    "status": status,
+                    "priority": priority,
+                    "score_value": score_value,
+                    "risk_factor": round(rng.random() * 0.6, 2),
+                    "estimated_hours": estimated,
+                    "actual_hours": round(estimated * rng.uniform(0.6, 1.8), 1) if finished_at else None,
+                    "due_date": due_date,
+                    "created_at": created_at,
+                    "updated_at": finished_at or created_at,
+                    "completed_at": finished_at if status == "completed" else None,
+                })
+
+                if assignee is None:
+                    continue
+                if status == "completed":
+                    net[assignee] += score_value
+                    completed[assignee] += 1
+                elif status == "failed":
+                    net[assignee] -= 2 * score_value
+                    failed[assignee] += 1
+
+                if status != "pending":
+                    # Geometric number of reports with mean reports_per_task
+                    progress = 0
+                    while rng.random() < reports_per_task / (1 + reports_per_task):
+                        progress = min(100, progress + rng.randint(10, 40))
+                        report_rows.append({
+                            "task_id": task_id,
+                            "employee_id": assignee,
+                            "report_text": rng.choice(REPORT_TEXTS),
+                            "progress_percentage": progress,
+                            "created_at": min(anchor, created_at + timedelta(hours=rng.uniform(1, 24 * max(1, age_days)))),
+                        })
+
+            conn.execute(insert(task_table), task_rows)
+            if report_rows:
+                conn.execute(insert(report_table), report_rows)
+            counts["tasks"] += len(task_rows)
+            counts["task_status_reports"] += len(report_rows)
+            log(f"  tasks {counts['tasks']:,}/{tasks:,}  reports {counts['task_status_reports']:,}")
+
+        profile_rows = []
+        for n, user_id in enumerate(employee_ids, start=1):
+            finished = completed[user_id] + failed[user_id]
+            profile_rows.append({
+                "id": n,
+                "user_id": user_id,
+                "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                "position": rng.choice(POSITIONS),
+                "net_score": net[user_id],
+                "score": max(0, net[user_id]),
+                "leave_score": rng.choice([100, 100, 100, 90, 80]),
+                "tasks_completed": completed[user_id],
+                "tasks_failed": failed[user_id],
+                "success_rate": completed[user_id] * 100.0 / finished if finished else 0.0,
+            })
+        conn.execute(insert(EmployeeProfile.__table__), profile_rows)
+        counts["employee_profiles"] = employees
+
+        counts["leave_requests"] = _generate_leave(
+            conn, rng, insert(LeaveRequest.__table__), employees, manager_ids,
+            leaves_per_employee, days, anchor
+        )
+        log(f"Generated {counts} in {time.perf_counter() - started:.1f}s (seed {seed}, anchor {anchor:%Y-%m-%d})")
+    return counts
+
+
+def _accumulate(values):
+    total = 0.0
+    for value in values:
+        total += value
+        yield total
+
+
+def _generate_leave(conn, rng: random.Random, statement, employees: int, manager_ids: List[int],
+                    leaves_per_employee: float, days: int, anchor: datetime) -> int:
+    """Non-overlapping leave per employee; a share of it clustered on shared holiday weeks"""
+    window_start = anchor - timedelta(days=days)
+    window_days = days + 90
+    holidays = sorted(window_start + timedelta(days=rng.uniform(0, window_days)) for _ in range(6))
+    rows, total = [], 0
+    for profile_id in range(1, employees + 1):
+        starts = []
+        for _ in range(rng.randint(0, round(2 * leaves_per_employee))):
+            if rng.random() < 0.35:
+                starts.append(rng.choice(holidays) + timedelta(days=rng.uniform(-3, 3)))
+            else:
+                starts.append(window_start + timedelta(days=rng.uniform(0, window_days)))
+        busy_until = None
+        for start in sorted(starts):
+            start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+            if busy_until is not None and start <= busy_until:
+                continue
+            end = start + timedelta(days=rng.choice([0, 1, 2, 4, 4, 7, 9, 13]))
+            busy_until = end
+            requested = start - timedelta(days=rng.uniform(3, 30))
+            if start > anchor:
+                status = "approved" if rng.random() < 0.5 else "pending"
+            else:
+                status = "rejected" if rng.random() < 0.1 else "approved"
+            decided = status != "pending"
+            rows.append({
+                "employee_id": profile_id,
+                "start_date": start,
+                "end_date": end,
+                "reason": rng.choice(["Vacation", "Family event", "Medical appointment", "Conference", "Moving house"]),
+                "status": status,
+                "approved_by": rng.choice(manager_ids) if decided else None,
+                "approval_date": requested + timedelta(days=rng.uniform(0.1, 2)) if decided else None,
+                "created_at": requested,
+                "tasks_transferred": status == "approved" and start <= anchor,
+                "transfer_successful": status == "approved" and start <= anchor,
+            })
+            if len(rows) >= CHUNK_ROWS:
+                conn.execute(statement, rows)
+                total += len(rows)
+                rows = []
+    if rows:
+        conn.execute(statement, rows)
+        total += len(rows)
+    return total
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="large")
+    parser.add_argument("--employees", type=int, help="overrides --scale")
+    parser.add_argument("--tasks", type=int, help="overrides --scale")
+    parser.add_argument("--managers", type=int)
+    parser.add_argument("--reports-per-task", type=float, default=0.5)
+    parser.add_argument("--leaves-per-employee", type=float, default=3.0)
+    parser.add_argument("--days", type=int, default=365, help="history covered by the data")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--anchor", type=datetime.fromisoformat,
+                        help="date the data is generated around (default: today, UTC)")
+    parser.add_argument("--database-url", help="default: DATABASE_URL / settings")
+    args = parser.parse_args(argv)
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("DEBUG", "false")
+
+    from app.core.database import engine
+    from app.core.migrations import upgrade
+
+    upgrade(engine)
+    employees, tasks = SCALES[args.scale]
+    try:
+        generate(
+            engine,
+            employees=args.employees or employees,
+            tasks=args.tasks if args.tasks is not None else tasks,
+            managers=args.managers,
+            reports_per_task=args.reports_per_task,
+            leaves_per_employee=args.leaves_per_employee,
+            days=args.days,
+            seed=args.seed,
+            anchor=args.anchor,
+        )
+    except RuntimeError as e:
+        print(e)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark: blocking sync sessions vs the async session layer.
+
+Seeds a throwaway SQLite database, then drives the dashboard queries in-process
+through the ASGI app at several concurrency levels. "before" replays the old
+pattern (sync Session inside an async route), "after" uses the real
+/api/analytics/dashboard route backed by AsyncSession.
+
+Usage: python benchmarks/db_throughput.py [--tasks 200000] [--requests 1000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/bench.db"
+os.environ["DEBUG"] = "false"
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, func, insert
+from sqlalchemy.orm import sessionmaker
+from app.core.auth import create_access_token
+from app.core.config import settings
+from app.core.database import engine
+from app.core.migrations import upgrade
+from app.main import app
+from app.models.task import Task
+from app.models.user import User, EmployeeProfile, ManagerProfile
+
+
+def seed(task_count: int):
+    """Create one manager and task_count tasks"""
+    upgrade(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "email": "bench@manager", "password_hash": "x", "role": "manager"}])
+        conn.execute(insert(ManagerProfile), [{"user_id": 1, "name": "Bench Manager"}])
+        statuses = ["pending", "in_progress", "completed", "failed"]
+        now = datetime.utcnow()
+        rows = [
+            {
+                "title": f"Task {i}",
+                "created_by": 1,
+                "status": statuses[i % len(statuses)],
+                "due_date": now + timedelta(days=(i % 60) - 30),
+            }
+            for i in range(task_count)
+        ]
+        conn.execute(insert(Task), rows)
+
+
+def build_legacy_app(pool_size: int) -> FastAPI:
+    """Replica of the pre-async dashboard route: sync queries inside async def
+
+    The legacy engine gets one pooled connection per client. With the default
+    pool a blocking checkout stalls the event loop while the sessions holding
+    connections wait on that same loop to close, so the old code deadlocks
+    above 15 concurrent requests instead of producing a number.
+    """
+    legacy = FastAPI()
+    legacy_engine = create_engine(
+        settings.get_database_url(),
+        connect_args={"check_same_thread": False},
+        pool_size=pool_size
+    )
+    LegacySession = sessionmaker(autocommit=False, autoflush=False, bind=legacy_engine)
+
+    def get_sync_db():
+        db = LegacySession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @legacy.get("/api/analytics/dashboard")
+    async def dashboard(db=Depends(get_sync_db)):
+        # Same statements as the async route: principal lookup, counts, team stats
+        db.query(User).filter(User.email == "bench@manager").first()
+        db.query(EmployeeProfile).count()
+        db.query(func.avg(EmployeeProfile.score)).scalar()
+        db.query(func.avg(EmployeeProfile.success_rate)).scalar()
+        db.query(Task).filter(Task.status == "completed").count()
+        db.query(Task).filter(Task.status.in_(["pending", "in_progress"])).count()
+        return {
+            "totalTasks": db.query(Task).count(),
+            "completedTasks": db.query(Task).filter(Task.status == "completed").count(),
+            "inProgressTasks": db.query(Task).filter(Task.status == "in_progress").count(),
+            "pendingTasks": db.query(Task).filter(Task.status == "pending").count(),
+            "overdueTasks": db.query(Task).filter(Task.status != "completed", Task.due_date < func.now()).count(),
+        }
+
+    return legacy
+
+
+async def drive(asgi_app, concurrency: int, total: int, headers: dict) -> float:
+    """Send total requests with at most concurrency in flight, return requests/sec"""
+    transport = httpx.ASGITransport(app=asgi_app)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                response = await client.get("/api/analytics/dashboard", headers=headers)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return total / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=200000)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200])
+    args = parser.parse_args()
+
+    seed(args.tasks)
+    token = create_access_token({"sub": "bench@manager", "role": "manager"})
+    headers = {"Authorization": f"Bearer {token}"}
+    legacy = build_legacy_app(max(args.concurrency))
+
+    print(f"{'clients':>8} {'before req/s':>14} {'after req/s':>13}")
+    for concurrency in args.concurrency:
+        before = await drive(legacy, concurrency, args.requests, headers)
+        after = await drive(app, concurrency, args.requests, headers)
+        print(f"{concurrency:>8} {before:>14.1f} {after:>13.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
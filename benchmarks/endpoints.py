@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Endpoint benchmarks: drive the FastAPI app in-process against seeded datasets.
+
+For each scale a database is built once with benchmarks/dataset.py (cached
+in --data-dir under its scale, seed and anchor) and copied to a scratch
+file. The routes are then run in a fresh interpreter, because the engine,
+principal cache and in-memory indexes are bound when the app is imported.
+Requests go through httpx's ASGI transport, so no sockets are involved.
+
+Each route gets warm-up requests, then --requests timed requests with at
+most --concurrency in flight. For each route the report gives p50/p95/p99
+latency, requests per second and SQL statements per request (counted with
+a cursor-execute hook on the async engine). Everything is written to
+benchmarks/results/endpoints.json so runs can be diffed between commits.
+The exit status is non-zero if any timed request fails.
+
+Routes:
+  auth_token           POST /api/auth/token (form login, rotating employees)
+  task_list            GET  /api/tasks/ as a manager (first pages, a few filters)
+  task_list_employee   GET  /api/tasks/ as the busiest employees
+  task_detail          GET  /api/tasks/{id} (random ids)
+  dashboard            GET  /api/analytics/dashboard as a manager
+  dashboard_employee   GET  /api/analytics/dashboard as an employee
+  leaderboard          GET  /api/analytics/leaderboard
+  leave_listing        GET  /api/leave/leave-requests (pending queue and history)
+  leave_transfer_plan  POST /api/leave/leave-requests/{id}/transfer-tasks?dry_run=true
+  leave_transfer       POST /api/leave/leave-requests/{id}/transfer-tasks (each leave once)
+
+Usage: python benchmarks/endpoints.py [--scales small medium] [--requests 500] [--concurrency 4]
+       python benchmarks/endpoints.py --scales large --routes task_list dashboard
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+RESULTS = os.path.join(ROOT, "benchmarks", "results", "endpoints.json")
+DATASET = os.path.join(ROOT, "benchmarks", "dataset.py")
+ROUTES = [
+    "auth_token", "task_list", "task_list_employee", "task_detail", "dashboard",
+    "dashboard_employee", "leaderboard", "leave_listing", "leave_transfer_plan",
+    "leave_transfer",
+]
+# Routes that change the data run last, without warm-up and one request at a
+# time: concurrent writers on SQLite fail with "database is locked"
+MUTATING = {"leave_transfer"}
+
+
+def prepare_dataset(scale: str, seed: int, anchor: str, data_dir: str) -> str:
+    """Path to a cached dataset for scale/seed/anchor, generating it on first use"""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"{scale}-seed{seed}-{anchor}.db")
+    if not os.path.exists(path):
+        partial = path + ".partial"
+        if os.path.exists(partial):
+            os.remove(partial)
+        print(f"Generating {scale} dataset into {path}", file=sys.stderr)
+        subprocess.run(
+            [sys.executable, DATASET, "--scale", scale, "--seed", str(seed), "--anchor", anchor,
+             "--database-url", f"sqlite:///{partial}"],
+            cwd=ROOT, env=dict(os.environ, DEBUG="false"), check=True, stdout=sys.stderr
+        )
+        os.replace(partial, path)
+    return path
+
+
+def run_scale(database: str, routes: list, requests: int, concurrency: int, seed: int) -> dict:
+    """Benchmark one scale in a child interpreter bound to a scratch copy of database"""
+    scratch_dir = tempfile.mkdtemp()
+    try:
+        scratch = os.path.join(scratch_dir, "bench.db")
+        shutil.copyfile(database, scratch)
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{scratch}",
+            DEBUG="false",
+            AI_CACHE_PATH=os.path.join(scratch_dir, "ai_cache.db"),
+        )
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", "--routes", *routes,
+             "--requests", str(requests), "--concurrency", str(concurrency), "--seed", str(seed)],
+            cwd=ROOT, env=env, check=True, stdout=subprocess.PIPE, text=True
+        )
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def percentile(cuts: list, p: int) -> float:
+    return round(cuts[p - 1] * 1000, 2)
+
+
+async def drive(client, make_request, total: int, concurrency: int) -> dict:
+    """Send total requests with at most concurrency in flight; latency and error counts"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], []
+
+    async def one(i: int):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await make_request(client, i)
+            except Exception as e:
+                # ASGITransport re-raises unhandled app errors instead of returning a 500
+                response = None
+                errors.append(f"{type(e).__name__}: {str(e)[:200]}")
+            latencies.append(time.perf_counter() - started)
+            if response is not None and response.status_code >= 400:
+                errors.append(f"{response.status_code} {response.text[:200]}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+    return {"latencies": latencies, "errors": errors, "elapsed": elapsed}
+
+
+def build_scenarios(context: dict, seed: int) -> dict:
+    """name -> (request count override or None, async make_request(client, i))"""
+    from app.core.auth import create_access_token
+
+    def bearer(email: str, role: str) -> dict:
+        return {"Authorization": f"Bearer {create_access_token({'sub': email, 'role': role})}"}
+
+    rng = random.Random(seed)
+    manager = bearer(context["manager_email"], "manager")
+    busiest = [bearer(email, "employee") for email in context["busiest_employees"]]
+    employee_count = context["employees"]
+    task_ids = [rng.randint(1, context["max_task_id"]) for _ in range(1000)]
+    transfer_ids = context["transfer_leave_ids"]
+
+    task_list_queries = [
+        "?limit=50",
+        "?limit=50&status=pending&sort_by=due_date",
+        "?limit=50&status=in_progress",
+        "?limit=50&priority=critical&sort_by=due_date",
+    ]
+    leave_queries = ["?limit=50", "?limit=50&status=all", "?limit=50&status=approved"]
+
+    async def auth_token(client, i):
+        return await client.post("/api/auth/token", data={
+            "username": f"employee{i % employee_count + 1}@bench.test", "password": "bench"
+        })
+
+    async def task_list(client, i):
+        return await client.get(f"/api/tasks/{task_list_queries[i % len(task_list_queries)]}", headers=manager)
+
+    async def task_list_employee(client, i):
+        return await client.get("/api/tasks/?limit=50", headers=busiest[i % len(busiest)])
+
+    async def task_detail(client, i):
+        return await client.get(f"/api/tasks/{task_ids[i % len(task_ids)]}", headers=manager)
+
+    async def dashboard(client, i):
+        return await client.get("/api/analytics/dashboard", headers=manager)
+
+    async def dashboard_employee(client, i):
+        return await client.get("/api/analytics/dashboard", headers=busiest[i % len(busiest)])
+
+    async def leaderboard(client, i):
+        return await client.get("/api/analytics/leaderboard?limit=10", headers=manager)
+
+    async def leave_listing(client, i):
+        return await client.get(f"/api/leave/leave-requests{leave_queries[i % len(leave_queries)]}", headers=manager)
+
+    async def leave_transfer_plan(client, i):
+        leave_id = transfer_ids[i % len(transfer_ids)]
+        return await client.post(f"/api/leave/leave-requests/{leave_id}/transfer-tasks?dry_run=true", headers=manager)
+
+    async def leave_transfer(client, i):
+        return await client.post(f"/api/leave/leave-requests/{transfer_ids[i]}/transfer-tasks", headers=manager)
+
+    return {
+        "auth_token": (None, auth_token),
+        "task_list": (None, task_list),
+        "task_list_employee": (None, task_list_employee),
+        "task_detail": (None, task_detail),
+        "dashboard": (None, dashboard),
+        "dashboard_employee": (None, dashboard_employee),
+        "leaderboard": (None, leaderboard),
+        "leave_listing": (None, leave_listing),
+        "leave_transfer_plan": (None if transfer_ids else 0, leave_transfer_plan),
+        # One real transfer per leave request: a repeat would have nothing left to move
+        "leave_transfer": (len(transfer_ids), leave_transfer),
+    }
+
+
+def load_context() -> dict:
+    """Ids and accounts the scenarios need, read from the seeded database"""
+    from sqlalchemy import text
+    from app.core.database import engine
+
+    with engine.connect() as conn:
+        scalar = lambda sql: conn.execute(text(sql)).scalar()
+        counts = {
+            table: scalar(f"SELECT COUNT(*) FROM {table}")
+            for table in ("users", "employee_profiles", "tasks", "task_status_reports", "leave_requests")
+        }
+        busiest = conn.execute(text("""
+            SELECT u.email FROM users u JOIN tasks t ON t.assigned_to = u.id
+            GROUP BY u.id ORDER BY COUNT(*) DESC, u.id LIMIT 20
+        """)).scalars().all()
+        # Upcoming leave whose employee still has open work to hand over
+        transfer_leave_ids = conn.execute(text("""
+            SELECT lr.id FROM leave_requests lr
+            JOIN employee_profiles p ON p.id = lr.employee_id
+            WHERE lr.status IN ('approved', 'pending') AND lr.end_date >= :now
+              AND EXISTS (SELECT 1 FROM tasks t WHERE t.assigned_to = p.user_id
+                          AND t.status IN ('pending', 'in_progress'))
+            ORDER BY lr.id
+        """), {"now": datetime.utcnow()}).scalars().all()
+        return {
+            "counts": counts,
+            "employees": counts["employee_profiles"],
+            "manager_email": scalar("SELECT email FROM users WHERE role = 'manager' ORDER BY id LIMIT 1"),
+            "busiest_employees": list(busiest),
+            "max_task_id": scalar("SELECT MAX(id) FROM tasks"),
+            "transfer_leave_ids": list(transfer_leave_ids),
+        }
+
+
+async def child(args) -> dict:
+    import httpx
+    from sqlalchemy import event
+    from app.core.database import async_engine, engine
+    from app.core.migrations import upgrade
+    from app.main import app
+
+    upgrade(engine)
+    context = load_context()
+    scenarios = build_scenarios(context, args.seed)
+    statements = {"count": 0}
+
+    def count_statement(*_):
+        statements["count"] += 1
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count_statement)
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name in sorted(args.routes, key=lambda route: (route in MUTATING, ROUTES.index(route))):
+            override, make_request = scenarios[name]
+            total = args.requests if override is None else min(override, args.requests)
+            if total < 2:
+                results[name] = {"skipped": "not enough data for this route"}
+                continue
+            if name not in MUTATING:
+                await drive(client, make_request, max(5, total // 10), args.concurrency)
+
+            concurrency = 1 if name in MUTATING else args.concurrency
+            before = statements["count"]
+            run = await drive(client, make_request, total, concurrency)
+            cuts = statistics.quantiles(run["latencies"], n=100, method="inclusive")
+            results[name] = {
+                "requests": total,
+                "concurrency": concurrency,
+                "errors": len(run["errors"]),
+                "rps": round(total / run["elapsed"], 1),
+                "p50_ms": percentile(cuts, 50),
+                "p95_ms": percentile(cuts, 95),
+                "p99_ms": percentile(cuts, 99),
+                "mean_ms": round(statistics.fmean(run["latencies"]) * 1000, 2),
+                "sql_per_request": round((statements["count"] - before) / total, 2),
+            }
+            if run["errors"]:
+                results[name]["first_error"] = run["errors"][0]
+            print(f"  {name}: {results[name]}", file=sys.stderr)
+
+    return {"dataset": context["counts"], "routes": results}
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", default=["small", "medium"], choices=["small", "medium", "large"])
+    parser.add_argument("--routes", nargs="+", default=ROUTES, choices=ROUTES)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--anchor", default=datetime.utcnow().strftime("%Y-%m-%d"),
+                        help="dataset anchor date (default: today, UTC)")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "pm-bench-datasets"),
+                        help="where generated datasets are cached between runs")
+    parser.add_argument("--output", default=RESULTS)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(child(args))))
+        return
+
+    report = {
+        "commit": git_revision(),
+        "python": sys.version.split()[0],
+        "generated_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "seed": args.seed,
+        "anchor": args.anchor,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "scales": {},
+    }
+    for scale in args.scales:
+        database = prepare_dataset(scale, args.seed, args.anchor, args.data_dir)
+        print(f"Benchmarking {scale}", file=sys.stderr)
+        report["scales"][scale] = run_scale(database, args.routes, args.requests, args.concurrency, args.seed)
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+    print(f"{'scale':<8} {'route':<21} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'sql/req':>8}")
+    failed = False
+    for scale, result in report["scales"].items():
+        for route, stats in result["routes"].items():
+            if "skipped" in stats:
+                print(f"{scale:<8} {route:<21} skipped: {stats['skipped']}")
+                continue
+            failed = failed or stats["errors"] > 0
+            print(f"{scale:<8} {route:<21} {stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8} "
+                  f"{stats['rps']:>8} {stats['sql_per_request']:>8}")
+    if failed:
+        print("Some requests failed; see first_error in the report", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Local stand-in for the Gemini streaming API.
+
+Serves ``POST /v1beta/models/{model}:streamGenerateContent`` as server-sent
+events. Chunk count, the delay between chunks and a failure rate are all
+configurable, so the AI execution layer can be tested for timeouts,
+concurrency limits and the circuit breaker without network access:
+
+    python benchmarks/fake_model_server.py --port 8765 --chunk-delay 0.05
+    GEMINI_BASE_URL=http://127.0.0.1:8765 GEMINI_API_KEY=fake uvicorn app.main:app
+
+It can also run in-process with ``start(...)``, which returns the server.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class FakeModelHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        with server.lock:
+            server.requests += 1
+        if ":streamGenerateContent" not in self.path:
+            self._send_error(404, "NOT_FOUND")
+            return
+        if server.status != 200 or random.random() < server.fail_rate:
+            self._send_error(server.status if server.status != 200 else 503, "UNAVAILABLE")
+            return
+
+        prompt = json.loads(body or b"{}").get("contents", [{}])[0].get("parts", [{}])[0].get("text", "")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        words = f"Echo ({len(prompt.split())} words): {' '.join(prompt.split()[:20])}".split()
+        per_chunk = max(len(words) // server.chunks, 1)
+        try:
+            for start in range(0, len(words), per_chunk):
+                time.sleep(server.chunk_delay)
+                chunk = {"candidates": [{"content": {
+                    "role": "model", "parts": [{"text": " ".join(words[start:start + per_chunk]) + " "}]
+                }}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\r\n\r\n".encode())
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        self.close_connection = True
+
+    def _send_error(self, status: int, reason: str):
+        payload = json.dumps({"error": {"code": status, "message": "fake model error", "status": reason}}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+def start(port: int = 0, chunks: int = 5, chunk_delay: float = 0.05, fail_rate: float = 0.0,
+          status: int = 200) -> ThreadingHTTPServer:
+    """Serve on a background thread; ``server.server_address`` has the bound port"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeModelHandler)
+    server.daemon_threads = True
+    server.chunks = chunks
+    server.chunk_delay = chunk_delay
+    server.fail_rate = fail_rate
+    server.status = status
+    server.requests = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--chunks", type=int, default=5)
+    parser.add_argument("--chunk-delay", type=float, default=0.05)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--status", type=int, default=200, help="answer every request with this status")
+    args = parser.parse_args()
+    server = start(args.port, args.chunks, args.chunk_delay, args.fail_rate, args.status)
+    print(f"Fake model server on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Cold-start report for a worker importing the application.
+
+Runs `python -X importtime -c "import app.main"` in fresh interpreters,
+takes the median run, and lists the slowest top-level packages. The summary
+is written to benchmarks/results/import_time.json so it can be diffed
+between commits; the exit status is non-zero when the median exceeds the
+budget.
+
+Usage: python benchmarks/import_time.py [--runs 5] [--budget-ms 300]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RESULTS = os.path.join(ROOT, "benchmarks", "results", "import_time.json")
+TARGET = "app.main"
+
+
+def measure_once() -> list:
+    """Import the app in a new interpreter and return its (name, self_us, cumulative_us, depth) rows"""
+    env = dict(os.environ, DEBUG="false")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {TARGET}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def target_subtree(rows: list) -> list:
+    """Rows imported on behalf of TARGET (importtime prints children before parents)"""
+    end = next(i for i, row in enumerate(rows) if row[0] == TARGET)
+    start = end
+    while start > 0 and rows[start - 1][3] > rows[end][3]:
+        start -= 1
+    return rows[start:end + 1]
+
+
+def summarize(subtree: list, top: int) -> dict:
+    """Self time grouped by top-level package"""
+    by_package = defaultdict(int)
+    for name, self_us, _, _ in subtree:
+        by_package[name.split(".")[0]] += self_us
+    slowest = sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {package: round(us / 1000, 1) for package, us in slowest}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=300.0)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    measure_once()  # warm the bytecode cache so runs measure imports, not compilation
+    runs = [target_subtree(measure_once()) for _ in range(args.runs)]
+    totals = [run[-1][2] for run in runs]
+    median_run = runs[totals.index(sorted(totals)[len(totals) // 2])]
+    median_ms = round(statistics.median(totals) / 1000, 1)
+    loaded = {row[0] for row in median_run}
+
+    report = {
+        "target": TARGET,
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "median_ms": median_ms,
+        "min_ms": round(min(totals) / 1000, 1),
+        "budget_ms": args.budget_ms,
+        "modules_imported": len(median_run),
+        "heavy_modules_loaded": sorted(
+            name for name in ("google.genai", "sqlalchemy.dialects.postgresql", "httpx")
+            if name in loaded
+        ),
+        "slowest_packages_ms": summarize(median_run, args.top),
+    }
+
+    os.makedirs(os.path.dirname(RESULTS), exist_ok=True)
+    with open(RESULTS, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+    print(json.dumps(report, indent=2))
+    if median_ms > args.budget_ms:
+        print(f"Cold import {median_ms} ms exceeds budget {args.budget_ms} ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
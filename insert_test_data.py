@@ -115,17 +115,21 @@ def create_test_tasks(manager_token, employee_ids):
     headers = {"Authorization": f"Bearer {manager_token}"}
     created_tasks = []
     
-    for task_data in tasks:
-        try:
-            response = requests.post(f"{BASE_URL}/api/tasks/", json=task_data, headers=headers)
-            if response.status_code == 201:
-                created_task = response.json()
-                created_tasks.append(created_task)
-                print(f"✅ Created task: {task_data['title']} (ID: {created_task['id']})")
-            else:
-                print(f"❌ Failed to create task {task_data['title']}: {response.text}")
-        except Exception as e:
-            print(f"❌ Error creating task {task_data['title']}: {e}")
+    # One request and one transaction for the whole list
+    try:
+        response = requests.post(f"{BASE_URL}/api/tasks/bulk", json={"tasks": tasks}, headers=headers)
+        if response.status_code == 200:
+            for result in response.json()["results"]:
+                task_data = tasks[result["index"]]
+                if result["status"] == "created":
+                    created_tasks.append({**task_data, "id": result["id"]})
+                    print(f"✅ Created task: {task_data['title']} (ID: {result['id']})")
+                else:
+                    print(f"❌ Failed to create task {task_data['title']}: {result['error']}")
+        else:
+            print(f"❌ Failed to create tasks: {response.text}")
+    except Exception as e:
+        print(f"❌ Error creating tasks: {e}")
     
     return created_tasks
 
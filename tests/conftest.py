@@ -0,0 +1,36 @@
+"""
+Shared test setup: every test module runs against one throwaway SQLite
+database and AI response cache. The environment has to be set before the
+app's settings are first imported.
+"""
+import os
+import tempfile
+
+_db_dir = tempfile.mkdtemp(prefix="pm-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ["AI_CACHE_PATH"] = os.path.join(_db_dir, "ai_cache.db")
+os.environ["DEBUG"] = "false"
+
+import pytest
+from sqlalchemy import text
+from app.core.database import Base, engine
+from app.core.migrations import upgrade
+from app.core.principal_cache import principal_cache
+from app.services.leaderboard_index import leaderboard_index
+from app.services.leave_index import leave_index
+import app.models.job  # noqa: F401 - register every table for drop_all
+import app.models.task  # noqa: F401
+import app.models.user  # noqa: F401
+
+@pytest.fixture(scope="module", autouse=True)
+def database():
+    """Start every test module on an empty, fully migrated schema"""
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS schema_migrations"))
+    upgrade(engine)
+    # Per-process state still describing the previous module's rows
+    principal_cache.clear()
+    leaderboard_index.invalidate()
+    leave_index.invalidate()
+    yield engine
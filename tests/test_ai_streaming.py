@@ -0,0 +1,80 @@
+"""
+Handoff between the model thread and a streaming client.
+
+The model thread blocks on a full buffer and periodically checks whether
+the client went away. A slow client must still receive every chunk exactly
+once, in order.
+"""
+import asyncio
+import threading
+import time
+from typing import Iterator, Optional
+import pytest
+from app.services import async_ai_service as streaming
+from app.services.ai_backends import AIBackend
+from app.services.ai_service import AIService
+from app.services.async_ai_service import AsyncAIService
+
+CHUNKS = [f"chunk-{n:03d} " for n in range(60)]
+
+class ListBackend(AIBackend):
+    name = "list"
+    model = "list-model"
+
+    def stream(self, prompt: str, cancel: Optional[threading.Event] = None) -> Iterator[str]:
+        for text in CHUNKS:
+            if cancel is not None and cancel.is_set():
+                return
+            yield text
+
+def _service():
+    return AsyncAIService(AIService(backend=ListBackend()), max_concurrency=1, timeout_seconds=10,
+                          failure_threshold=5, reset_seconds=30)
+
+async def _consume(service, message: str, delay: float, block: float = 0.0):
+    received, last = [], None
+    async for kind, value in service.stream_chat(message, "employee"):
+        if kind == "chunk":
+            received.append(value["text"])
+            # Let the producer give up waiting on the full buffer between reads
+            await asyncio.sleep(delay)
+            # Hold the loop right after the woken put lands, before the thread hears about it
+            time.sleep(block)
+        else:
+            last = (kind, value)
+    return received, last
+
+@pytest.fixture
+def tight_buffer(monkeypatch):
+    monkeypatch.setattr(streaming, "STREAM_BUFFER_CHUNKS", 1)
+    monkeypatch.setattr(streaming, "STREAM_CANCEL_POLL_SECONDS", 0.001)
+
+@pytest.mark.parametrize("delay, block", [(0.001, 0.0), (0.003, 0.0), (0.0, 0.003)])
+def test_slow_consumer_gets_every_chunk_once(tight_buffer, delay, block):
+    received, last = asyncio.run(_consume(_service(), f"slow consumer {delay} {block}", delay, block))
+    assert received == CHUNKS
+    assert last == ("done", {"cached": False})
+
+def test_closing_the_stream_stops_the_model_thread(tight_buffer):
+    service = _service()
+
+    async def read_two():
+        stream = service.stream_chat("client leaves early", "employee")
+        received = [value["text"] async for kind, value in _take(stream, 2)]
+        await stream.aclose()
+        # The thread notices at its next poll and releases the slot
+        for _ in range(200):
+            if service.stats()["models"]["list-model"]["in_flight"] == 0:
+                break
+            await asyncio.sleep(0.005)
+        return received
+
+    assert asyncio.run(read_two()) == CHUNKS[:2]
+    assert service.stats()["models"]["list-model"]["in_flight"] == 0
+
+async def _take(stream, count: int):
+    async for event in stream:
+        yield event
+        count -= 1
+        if count == 0:
+            return
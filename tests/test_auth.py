@@ -0,0 +1,37 @@
+"""
+Login checks the account state, not just the password.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from app.core.auth import get_password_hash
+from app.core.database import SessionLocal
+from app.main import app
+from app.models.user import User
+
+@pytest.fixture(scope="module")
+def client():
+    with SessionLocal() as db:
+        db.add_all([
+            User(email="active@example.com", password_hash=get_password_hash("secret"), role="manager"),
+            User(email="inactive@example.com", password_hash=get_password_hash("secret"), role="manager",
+                 is_active=False),
+        ])
+        db.commit()
+    with TestClient(app) as test_client:
+        yield test_client
+
+def _login(client, email: str, password: str = "secret"):
+    return client.post("/api/auth/token", data={"username": email, "password": password})
+
+def test_login_active_user(client):
+    response = _login(client, "active@example.com")
+    assert response.status_code == 200
+    assert response.json()["access_token"]
+
+def test_login_rejects_wrong_password(client):
+    assert _login(client, "active@example.com", "wrong").status_code == 401
+
+def test_login_rejects_inactive_user(client):
+    response = _login(client, "inactive@example.com")
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Inactive user"
@@ -0,0 +1,101 @@
+"""
+Per-item results of the bulk task endpoints.
+
+One bad item must not reject the batch: every item gets a result at its
+input index, and only the valid ones are written.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from app.core.auth import create_access_token, get_password_hash
+from app.core.database import SessionLocal
+from app.main import app
+from app.models.task import Task
+from app.models.user import User, EmployeeProfile, ManagerProfile
+
+@pytest.fixture(scope="module")
+def scenario():
+    """User ids and one pending task per employee"""
+    with SessionLocal() as db:
+        manager = User(email="bulk-manager@example.com", password_hash=get_password_hash("secret"), role="manager")
+        mine = User(email="bulk-employee@example.com", password_hash=get_password_hash("secret"), role="employee")
+        other = User(email="bulk-other@example.com", password_hash=get_password_hash("secret"), role="employee")
+        db.add_all([manager, mine, other])
+        db.flush()
+        db.add(ManagerProfile(user_id=manager.id, name="Manager"))
+        db.add_all([EmployeeProfile(user_id=user.id, name=user.email) for user in (mine, other)])
+        tasks = [
+            Task(title=title, assigned_to=user.id, created_by=manager.id, status="pending", score_value=5)
+            for title, user in (("Mine", mine), ("Also mine", mine), ("Theirs", other))
+        ]
+        db.add_all(tasks)
+        db.commit()
+        return {"manager": manager.id, "mine": mine.id, "other": other.id, "tasks": [task.id for task in tasks]}
+
+@pytest.fixture(scope="module")
+def client(scenario):
+    with TestClient(app) as test_client:
+        yield test_client
+
+def _headers(email: str):
+    return {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+
+def _status(task_id: int) -> str:
+    with SessionLocal() as db:
+        return db.execute(select(Task.status).filter(Task.id == task_id)).scalar_one()
+
+def test_bulk_status_reports_each_row(client, scenario):
+    mine, also_mine, theirs = scenario["tasks"]
+    response = client.post("/api/tasks/bulk-status", headers=_headers("bulk-employee@example.com"), json={"updates": [
+        {"task_id": mine, "status": "in_progress"},
+        {"task_id": "1", "status": "completed"},
+        {"task_id": True, "status": "completed"},
+        {"task_id": also_mine, "status": "done"},
+        {"task_id": 999999, "status": "completed"},
+        {"task_id": theirs, "status": "completed"},
+        "not an object",
+        {"task_id": also_mine, "status": "failed"},
+        {"task_id": also_mine, "status": "completed"},
+    ]})
+    assert response.status_code == 200
+    data = response.json()
+    results = data["results"]
+    assert [result["index"] for result in results] == list(range(9))
+    assert [result["status"] for result in results] == [
+        "updated", "error", "error", "error", "error", "error", "error", "superseded", "updated"
+    ]
+    assert results[1]["error"] == results[2]["error"] == results[6]["error"] == "task_id: must be an integer"
+    assert results[3]["error"].startswith("status: must be one of")
+    assert results[4]["error"] == "Task not found"
+    assert results[5]["error"] == "You can only update your own tasks"
+    assert results[8]["new_status"] == "completed"
+    assert data["updated"] == 2
+    assert data["failed"] == 6
+
+    assert _status(mine) == "in_progress"
+    assert _status(also_mine) == "completed"
+    assert _status(theirs) == "pending"
+
+def test_bulk_create_reports_each_row(client, scenario):
+    response = client.post("/api/tasks/bulk", headers=_headers("bulk-manager@example.com"), json={"enrich": False, "tasks": [
+        {"title": "Valid", "assigned_to": scenario["mine"]},
+        {"description": "No title"},
+        {"title": "Unknown assignee", "assigned_to": 999999},
+        {"title": "Unassigned", "priority": "high"},
+    ]})
+    assert response.status_code == 200
+    data = response.json()
+    assert [result["status"] for result in data["results"]] == ["created", "error", "error", "created"]
+    assert data["results"][1]["error"].startswith("title:")
+    assert data["results"][2]["error"] == "assigned_to: unknown user 999999"
+    assert (data["created"], data["failed"]) == (2, 2)
+
+    with SessionLocal() as db:
+        titles = db.execute(
+            select(Task.title).filter(Task.id.in_([data["results"][0]["id"], data["results"][3]["id"]]))
+        ).scalars().all()
+    assert sorted(titles) == ["Unassigned", "Valid"]
+
+def test_bulk_status_size_limit(client):
+    response = client.post("/api/tasks/bulk-status", headers=_headers("bulk-manager@example.com"), json={"updates": []})
+    assert response.status_code == 400
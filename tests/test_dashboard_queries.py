@@ -0,0 +1,106 @@
+"""
+Statement budgets for the dashboard endpoints.
+
+The dashboard and my-stats responses are built from one aggregate over
+tasks (plus the caller's profile for my-stats). A regression to per-row
+counting or lazy loading shows up here as extra statements.
+
+Run with ``python -m pytest tests``.
+"""
+from datetime import datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.core.auth import create_access_token, get_password_hash
+from app.core.database import SessionLocal, async_engine
+from app.main import app
+from app.models.task import Task
+from app.models.user import User, EmployeeProfile, ManagerProfile
+
+MAX_STATEMENTS = 2
+
+@pytest.fixture(scope="module")
+def client():
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        manager = User(email="manager@example.com", password_hash=get_password_hash("secret"), role="manager")
+        employees = [
+            User(email=f"employee{n}@example.com", password_hash=get_password_hash("secret"), role="employee")
+            for n in range(3)
+        ]
+        db.add_all([manager, *employees])
+        db.flush()
+        db.add(ManagerProfile(user_id=manager.id, name="Manager"))
+        statuses = ["pending", "in_progress", "completed", "failed"]
+        for n, employee in enumerate(employees):
+            db.add(EmployeeProfile(user_id=employee.id, name=f"Employee {n}", position="Developer"))
+            for i in range(20):
+                db.add(Task(
+                    title=f"Task {n}-{i}",
+                    assigned_to=employee.id,
+                    created_by=manager.id,
+                    status=statuses[i % len(statuses)],
+                    priority="medium",
+                    score_value=5,
+                    due_date=now + timedelta(days=i - 10)
+                ))
+        # Moved to employee 0 by a leave transfer: still open work
+        for i in range(4):
+            db.add(Task(
+                title=f"Transferred {i}",
+                assigned_to=employees[0].id,
+                created_by=manager.id,
+                status="transferred",
+                priority="medium",
+                score_value=5,
+                due_date=now + timedelta(days=5)
+            ))
+        db.commit()
+    with TestClient(app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def statements():
+    executed = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count)
+    yield executed
+    event.remove(async_engine.sync_engine, "before_cursor_execute", count)
+
+def _headers(email: str):
+    return {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+
+def _get(client, statements, path: str, email: str):
+    headers = _headers(email)
+    # Warm the principal cache first: the budget is for the endpoint, not the login lookup
+    assert client.get(path, headers=headers).status_code == 200
+    statements.clear()
+    response = client.get(path, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+@pytest.mark.parametrize("path, email", [
+    ("/api/analytics/dashboard", "manager@example.com"),
+    ("/api/analytics/dashboard", "employee0@example.com"),
+    ("/api/analytics/my-stats", "manager@example.com"),
+    ("/api/analytics/my-stats", "employee0@example.com"),
+])
+def test_statement_budget(client, statements, path, email):
+    _get(client, statements, path, email)
+    assert 1 <= len(statements) <= MAX_STATEMENTS, "\n\n".join(statements)
+
+def test_manager_dashboard_totals(client, statements):
+    data = _get(client, statements, "/api/analytics/dashboard", "manager@example.com")
+    assert data["totalTasks"] == 64
+    assert data["completedTasks"] == 15
+    assert data["inProgressTasks"] == 15
+    assert data["pendingTasks"] == 19
+    assert data["teamStats"]["total_tasks_pending"] == 34
+
+def test_transferred_tasks_count_as_pending(client, statements):
+    data = _get(client, statements, "/api/analytics/dashboard", "employee0@example.com")
+    assert data["totalTasks"] == 24
+    assert data["pendingTasks"] == 9
@@ -0,0 +1,102 @@
+"""
+Leave task transfers only hand work to colleagues who are available.
+
+Recipients exclude anyone with approved leave overlapping the leaver's
+window, as well as inactive users. Rejected leave and leave outside the
+window do not count, and a leave row without an employee must not hide
+everyone.
+"""
+from datetime import datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from app.core.auth import create_access_token, get_password_hash
+from app.core.database import SessionLocal
+from app.main import app
+from app.models.task import Task, LeaveRequest
+from app.models.user import User, EmployeeProfile, ManagerProfile
+
+# Employees by role in the scenario
+LEAVER, ON_LEAVE, REJECTED_LEAVE, LATER_LEAVE, INACTIVE = range(5)
+OPEN_TASKS = 6
+
+@pytest.fixture(scope="module")
+def scenario():
+    """{"users": [user ids by role], "leave_request_id": the leaver's leave}"""
+    start = datetime.utcnow() + timedelta(days=1)
+    end = start + timedelta(days=9)
+    with SessionLocal() as db:
+        manager = User(email="transfer-manager@example.com", password_hash=get_password_hash("secret"), role="manager")
+        users = [
+            User(email=f"transfer{n}@example.com", password_hash=get_password_hash("secret"), role="employee",
+                 is_active=n != INACTIVE)
+            for n in range(5)
+        ]
+        db.add_all([manager, *users])
+        db.flush()
+        db.add(ManagerProfile(user_id=manager.id, name="Manager"))
+        profiles = [EmployeeProfile(user_id=user.id, name=f"Employee {n}") for n, user in enumerate(users)]
+        db.add_all(profiles)
+        db.flush()
+
+        leave = LeaveRequest(employee_id=profiles[LEAVER].id, start_date=start, end_date=end, status="approved")
+        db.add_all([
+            leave,
+            LeaveRequest(employee_id=profiles[ON_LEAVE].id, start_date=start + timedelta(days=3),
+                         end_date=end + timedelta(days=3), status="approved"),
+            LeaveRequest(employee_id=profiles[REJECTED_LEAVE].id, start_date=start, end_date=end, status="rejected"),
+            LeaveRequest(employee_id=profiles[LATER_LEAVE].id, start_date=end + timedelta(days=1),
+                         end_date=end + timedelta(days=5), status="approved"),
+            LeaveRequest(employee_id=None, start_date=start, end_date=end, status="approved"),
+        ])
+        for n in range(OPEN_TASKS):
+            db.add(Task(title=f"Open {n}", assigned_to=users[LEAVER].id, created_by=manager.id,
+                        status=("pending", "in_progress")[n % 2], priority="medium", estimated_hours=n + 1))
+        db.add(Task(title="Done", assigned_to=users[LEAVER].id, created_by=manager.id, status="completed"))
+        db.commit()
+        return {"users": [user.id for user in users], "leave_request_id": leave.id}
+
+@pytest.fixture(scope="module")
+def client(scenario):
+    with TestClient(app) as test_client:
+        yield test_client
+
+def _transfer(client, scenario, **params):
+    return client.post(
+        f"/api/leave/leave-requests/{scenario['leave_request_id']}/transfer-tasks",
+        params=params,
+        headers={"Authorization": f"Bearer {create_access_token({'sub': 'transfer-manager@example.com'})}"}
+    )
+
+def _tasks_of(user_id: int):
+    with SessionLocal() as db:
+        return db.execute(select(Task.title, Task.status).filter(Task.assigned_to == user_id)).all()
+
+def test_plan_skips_unavailable_employees(client, scenario):
+    users = scenario["users"]
+    response = _transfer(client, scenario, dry_run=True)
+    assert response.status_code == 200
+    plan = response.json()
+    assert plan["planned"] == OPEN_TASKS
+    assert plan["transferred"] == 0
+    assert {recipient["user_id"] for recipient in plan["recipients"]} == {users[REJECTED_LEAVE], users[LATER_LEAVE]}
+
+def test_named_recipient_on_leave_is_rejected(client, scenario):
+    users = scenario["users"]
+    response = _transfer(client, scenario, recipient_ids=[users[ON_LEAVE], users[LATER_LEAVE]])
+    assert response.status_code == 400
+    assert response.json()["detail"]["unavailable"] == [users[ON_LEAVE]]
+    assert len(_tasks_of(users[LEAVER])) == OPEN_TASKS + 1
+
+def test_transfer_moves_open_tasks_to_available_employees(client, scenario):
+    users = scenario["users"]
+    response = _transfer(client, scenario)
+    assert response.status_code == 200
+    assert response.json()["transferred"] == OPEN_TASKS
+
+    assert _tasks_of(users[LEAVER]) == [("Done", "completed")]
+    moved = _tasks_of(users[REJECTED_LEAVE]) + _tasks_of(users[LATER_LEAVE])
+    assert len(moved) == OPEN_TASKS
+    assert {status for _, status in moved} == {"transferred"}
+    for role in (ON_LEAVE, INACTIVE):
+        assert _tasks_of(users[role]) == []
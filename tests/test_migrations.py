@@ -0,0 +1,127 @@
+"""
+Schema migrations against a database created before they existed.
+
+The baseline is today's schema without everything the numbered
+migrations add: the multi-column indexes, employee_profiles.net_score
+and the background_jobs table. Upgrading it must give the current schema
+with backfilled scores, and applying the migrations again must change
+nothing.
+"""
+import pytest
+from sqlalchemy import create_engine, text
+from app.core import migrations
+from app.core.database import Base
+from app.core.migrations import MIGRATIONS, check_query_plans, current_version, upgrade
+
+# (user_id, stale score) per employee; the tasks below decide the real one
+PROFILES = [(2, 123), (3, 45), (4, 500)]
+TASKS = [(2, "completed", 10), (2, "completed", 5), (2, "failed", 3), (2, "pending", 8), (3, "failed", 4)]
+# user_id -> (net_score, score, tasks_completed, tasks_failed, success_rate)
+EXPECTED_SCORES = {
+    2: (9, 9, 2, 1, pytest.approx(200 / 3)),
+    3: (-8, 0, 0, 1, 0.0),
+    4: (0, 0, 0, 0, 0.0),
+}
+
+def _create_baseline(engine):
+    tables = [table for table in Base.metadata.sorted_tables if table.name != "background_jobs"]
+    Base.metadata.create_all(bind=engine, tables=tables)
+    with engine.begin() as conn:
+        for table in tables:
+            for index in table.indexes:
+                # The baseline only had the single-column index=True indexes
+                if len(index.columns) > 1:
+                    conn.execute(text(f"DROP INDEX {index.name}"))
+        conn.execute(text("ALTER TABLE employee_profiles DROP COLUMN net_score"))
+
+        conn.execute(text("INSERT INTO users (id, email, password_hash, role) VALUES (1, 'm@example.com', 'x', 'manager')"))
+        for user_id, score in PROFILES:
+            conn.execute(text(
+                "INSERT INTO users (id, email, password_hash, role) VALUES (:id, :email, 'x', 'employee')"
+            ), {"id": user_id, "email": f"e{user_id}@example.com"})
+            conn.execute(text(
+                "INSERT INTO employee_profiles (user_id, name, score, tasks_completed, tasks_failed, success_rate)"
+                " VALUES (:user_id, 'Employee', :score, 7, 7, 50.0)"
+            ), {"user_id": user_id, "score": score})
+        for assigned_to, status, score_value in TASKS:
+            conn.execute(text(
+                "INSERT INTO tasks (title, assigned_to, created_by, status, priority, score_value)"
+                " VALUES ('Task', :assigned_to, 1, :status, 'medium', :score_value)"
+            ), {"assigned_to": assigned_to, "status": status, "score_value": score_value})
+
+def _schema(engine):
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT type, name, sql FROM sqlite_master WHERE name NOT LIKE 'sqlite_%' ORDER BY type, name"
+        )).all()
+
+def _scores(engine):
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT user_id, net_score, score, tasks_completed, tasks_failed, success_rate"
+            " FROM employee_profiles ORDER BY user_id"
+        )).all()
+    return {row[0]: tuple(row[1:]) for row in rows}
+
+def _engine(directory):
+    engine = create_engine(f"sqlite:///{directory / 'baseline.db'}")
+    _create_baseline(engine)
+    return engine
+
+@pytest.fixture(scope="module")
+def baseline_engine(tmp_path_factory):
+    engine = _engine(tmp_path_factory.mktemp("migrations"))
+    yield engine
+    engine.dispose()
+
+def test_upgrade_from_baseline(baseline_engine):
+    assert current_version(baseline_engine) == 0
+    assert "ix_tasks_assigned_to_status" not in {name for _, name, _ in _schema(baseline_engine)}
+    assert upgrade(baseline_engine) == [version for version, _, _ in MIGRATIONS]
+
+    names = {name for _, name, _ in _schema(baseline_engine)}
+    for table in Base.metadata.sorted_tables:
+        assert table.name in names
+        assert {index.name for index in table.indexes} <= names
+    with baseline_engine.connect() as conn:
+        columns = {row[1] for row in conn.execute(text("PRAGMA table_info(background_jobs)"))}
+    assert "locked_by" in columns
+    assert _scores(baseline_engine) == EXPECTED_SCORES
+
+def test_upgrade_again_is_a_no_op(baseline_engine):
+    schema, scores = _schema(baseline_engine), _scores(baseline_engine)
+    assert upgrade(baseline_engine) == []
+    assert _schema(baseline_engine) == schema
+    assert _scores(baseline_engine) == scores
+
+def test_every_migration_can_run_twice(baseline_engine):
+    schema, scores = _schema(baseline_engine), _scores(baseline_engine)
+    for _, _, func in MIGRATIONS:
+        with baseline_engine.begin() as conn:
+            func(conn)
+    assert _schema(baseline_engine) == schema
+    assert _scores(baseline_engine) == scores
+
+def test_hot_queries_are_index_searches_once_upgraded(baseline_engine):
+    assert check_query_plans(baseline_engine) == []
+
+def test_plan_check_flags_a_missing_index(tmp_path):
+    engine = _engine(tmp_path)
+    upgrade(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_tasks_created_at_id"))
+    failures = check_query_plans(engine)
+    engine.dispose()
+    assert [failure.split(":")[0] for failure in failures] == ["task page"]
+
+@pytest.mark.parametrize("step, allowed, ok", [
+    ("SEARCH tasks USING INDEX ix_tasks_assigned_to_status (assigned_to=?)", (), True),
+    ("SCAN tasks", (), False),
+    ("SCAN tasks USING INDEX ix_tasks_created_at_id", ("tasks",), False),
+    ("SCAN tasks USING COVERING INDEX ix_tasks_assigned_to_status", (), False),
+    ("SCAN tasks USING COVERING INDEX ix_tasks_assigned_to_status", ("tasks",), True),
+    ("USE TEMP B-TREE FOR ORDER BY", ("tasks",), False),
+])
+def test_plan_steps(monkeypatch, step, allowed, ok):
+    monkeypatch.setattr(migrations, "COVERING_SCAN_TABLES", allowed)
+    assert migrations._plan_step_ok(step) is ok
@@ -0,0 +1,118 @@
+"""
+Incremental score maintenance against the full recalculation.
+
+Every task endpoint shifts the assignee's profile counters by a delta
+instead of rescanning their tasks. After each kind of change the stored
+profiles must equal what recalculate_all_scores derives from the tasks.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from app.core.auth import create_access_token, get_password_hash
+from app.core.database import SessionLocal
+from app.main import app
+from app.models.user import User, EmployeeProfile, ManagerProfile
+
+EMPLOYEES = 3
+
+@pytest.fixture(scope="module")
+def client():
+    with SessionLocal() as db:
+        manager = User(email="scoring-manager@example.com", password_hash=get_password_hash("secret"), role="manager")
+        employees = [
+            User(email=f"scoring{n}@example.com", password_hash=get_password_hash("secret"), role="employee")
+            for n in range(EMPLOYEES)
+        ]
+        db.add_all([manager, *employees])
+        db.flush()
+        db.add(ManagerProfile(user_id=manager.id, name="Manager"))
+        for n, employee in enumerate(employees):
+            db.add(EmployeeProfile(user_id=employee.id, name=f"Employee {n}", position="Developer"))
+        db.commit()
+    with TestClient(app) as test_client:
+        yield test_client
+
+@pytest.fixture(scope="module")
+def employee_ids(client):
+    with SessionLocal() as db:
+        return db.execute(
+            select(User.id).filter(User.role == "employee").order_by(User.id)
+        ).scalars().all()
+
+def _headers(email: str = "scoring-manager@example.com"):
+    return {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+
+def _profiles():
+    with SessionLocal() as db:
+        rows = db.execute(select(
+            EmployeeProfile.user_id, EmployeeProfile.net_score, EmployeeProfile.score,
+            EmployeeProfile.tasks_completed, EmployeeProfile.tasks_failed, EmployeeProfile.success_rate
+        ).order_by(EmployeeProfile.user_id)).all()
+    return [tuple(row) for row in rows]
+
+def _assert_matches_recalculation(client):
+    incremental = _profiles()
+    response = client.post("/api/analytics/recalculate-scores", headers=_headers())
+    assert response.status_code == 200
+    assert incremental == _profiles()
+
+def _create(client, assigned_to: int, score_value: int) -> int:
+    response = client.post("/api/tasks/", headers=_headers(), json={
+        "title": "Scored task", "assigned_to": assigned_to, "priority": "medium", "score_value": score_value
+    })
+    assert response.status_code == 200
+    return response.json()["id"]
+
+def _set_status(client, task_id: int, new_status: str):
+    response = client.post(f"/api/tasks/{task_id}/status", headers=_headers(), json={"status": new_status})
+    assert response.status_code == 200
+
+def test_single_updates(client, employee_ids):
+    first, second, _ = employee_ids
+    done = _create(client, first, 10)
+    failed = _create(client, first, 3)
+    moved = _create(client, second, 7)
+    _set_status(client, done, "completed")
+    _set_status(client, failed, "failed")
+    _set_status(client, moved, "completed")
+    assert _profiles()[0][1:] != (0, 0, 0, 0, 0.0)
+    _assert_matches_recalculation(client)
+
+    # Reopen, rescore and reassign finished tasks
+    _set_status(client, failed, "in_progress")
+    response = client.put(f"/api/tasks/{moved}", headers=_headers(), json={"assigned_to": first, "score_value": 12})
+    assert response.status_code == 200
+    _assert_matches_recalculation(client)
+
+def test_bulk_updates(client, employee_ids):
+    created = client.post("/api/tasks/bulk", headers=_headers(), json={"enrich": False, "tasks": [
+        {"title": f"Bulk {n}", "assigned_to": employee_ids[n % EMPLOYEES], "priority": "low", "score_value": n + 1}
+        for n in range(12)
+    ]}).json()
+    ids = [result["id"] for result in created["results"]]
+    response = client.post("/api/tasks/bulk-status", headers=_headers(), json={"updates": [
+        {"task_id": task_id, "status": ("completed", "failed", "in_progress")[n % 3]}
+        for n, task_id in enumerate(ids)
+    ] + [
+        # Several changes to one task: only the last one counts
+        {"task_id": ids[0], "status": "failed"},
+        {"task_id": ids[0], "status": "completed"},
+    ]})
+    assert response.status_code == 200
+    assert response.json()["updated"] == len(ids)
+    _assert_matches_recalculation(client)
+
+    response = client.post("/api/tasks/bulk-status", headers=_headers(), json={"updates": [
+        {"task_id": task_id, "status": "pending"} for task_id in ids[::2]
+    ]})
+    assert response.status_code == 200
+    _assert_matches_recalculation(client)
+
+def test_delete(client, employee_ids):
+    completed = _create(client, employee_ids[2], 9)
+    failed = _create(client, employee_ids[2], 4)
+    _set_status(client, completed, "completed")
+    _set_status(client, failed, "failed")
+    for task_id in (completed, failed):
+        assert client.delete(f"/api/tasks/{task_id}", headers=_headers()).status_code == 200
+    _assert_matches_recalculation(client)
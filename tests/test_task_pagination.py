@@ -0,0 +1,89 @@
+"""
+Keyset cursor pagination of GET /api/tasks/.
+
+Walking the X-Next-Cursor pages must return every matching task once, in
+the order of ``sort_by`` then id with NULLs first, whatever the page size.
+Due dates repeat and are often NULL, so ties and the NULL block both span
+page boundaries.
+"""
+from datetime import datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from app.core.auth import create_access_token, get_password_hash
+from app.core.database import SessionLocal
+from app.main import app
+from app.models.task import Task
+from app.models.user import User, ManagerProfile
+
+STATUSES = ["pending", "in_progress", "completed"]
+
+@pytest.fixture(scope="module")
+def tasks():
+    """(id, status, created_at, due_date) of every seeded task"""
+    base = datetime(2024, 1, 1, 9, 0)
+    with SessionLocal() as db:
+        manager = User(email="paging-manager@example.com", password_hash=get_password_hash("secret"), role="manager")
+        db.add(manager)
+        db.flush()
+        db.add(ManagerProfile(user_id=manager.id, name="Manager"))
+        rows = []
+        for n in range(45):
+            task = Task(
+                title=f"Task {n}",
+                created_by=manager.id,
+                status=STATUSES[n % len(STATUSES)],
+                priority="medium",
+                score_value=5,
+                # A third have no due date; the rest share 5 distinct dates
+                due_date=None if n % 3 == 1 else base + timedelta(days=n % 5),
+                created_at=base + timedelta(hours=n // 4)
+            )
+            db.add(task)
+            rows.append(task)
+        db.commit()
+        return [(task.id, task.status, task.created_at, task.due_date) for task in rows]
+
+@pytest.fixture(scope="module")
+def client(tasks):
+    with TestClient(app) as test_client:
+        yield test_client
+
+def _headers():
+    return {"Authorization": f"Bearer {create_access_token({'sub': 'paging-manager@example.com'})}"}
+
+def _walk(client, limit: int, **params):
+    ids, cursor, pages = [], None, 0
+    while True:
+        query = {**params, "limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/tasks/", params=query, headers=_headers())
+        assert response.status_code == 200
+        ids += [task["id"] for task in response.json()]
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return ids, pages
+
+def _expected(tasks, sort_by: str, status: str = None):
+    column = {"created_at": 2, "due_date": 3}[sort_by]
+    rows = [task for task in tasks if status is None or task[1] == status]
+    rows.sort(key=lambda task: (task[column] is not None, task[column] or datetime.min, task[0]))
+    return [task[0] for task in rows]
+
+@pytest.mark.parametrize("sort_by", ["due_date", "created_at"])
+@pytest.mark.parametrize("limit", [1, 4, 7, 100])
+def test_pages_follow_sql_order(client, tasks, sort_by, limit):
+    ids, pages = _walk(client, limit, sort_by=sort_by)
+    assert ids == _expected(tasks, sort_by)
+    assert pages == max(1, -(-len(tasks) // limit))
+
+@pytest.mark.parametrize("status", STATUSES)
+def test_filtered_pages(client, tasks, status):
+    ids, _ = _walk(client, 4, sort_by="due_date", status=status)
+    assert ids == _expected(tasks, "due_date", status)
+
+def test_cursor_is_bound_to_its_sort(client):
+    response = client.get("/api/tasks/", params={"limit": 2, "sort_by": "due_date"}, headers=_headers())
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get("/api/tasks/", params={"limit": 2, "sort_by": "created_at", "cursor": cursor},
+                          headers=_headers())
+    assert response.status_code == 400